@@ -12,5 +12,7 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "GOMWebProjectPt1.settings")
+# Route to the async views (see SERVER_INTERFACE in settings.py).
+os.environ.setdefault("SERVER_INTERFACE", "asgi")
 
 application = get_asgi_application()
@@ -24,6 +24,10 @@ try:
 except Exception:
     pass
 
+# Writable directory for small runtime state files shared by worker processes
+# (circuit breakers, counters, ...). Keep it outside the web root in production.
+RUNTIME_DIR = Path(os.getenv("RUNTIME_DIR", str(BASE_DIR / "var")))
+
 # Quick-start development settings - unsuitable for production
 # See https://docs.djangoproject.com/en/5.2/howto/deployment/checklist/
 
@@ -52,33 +56,61 @@ CSRF_TRUSTED_ORIGINS = (
 # Application definition
 
 INSTALLED_APPS = [
+    # Listed first so its collectstatic (which runs the asset build) overrides staticfiles'.
+    "sitecore",
     "django.contrib.admin",
     "django.contrib.auth",
     "django.contrib.contenttypes",
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
-    "sitecore",
 ]
 
 MIDDLEWARE = [
+    # Outermost, so its timings (Server-Timing, /metrics) cover the whole stack
+    "sitecore.metrics.TimingMiddleware",
+    # Samples the stacks of 1 in PROFILE_SAMPLE_RATE requests (and of token-carrying ones)
+    "sitecore.profiling.ProfilingMiddleware",
+    # Known scanner probes (/wp-login.php, /.env, ...) get a tiny 404 before anything else
+    "sitecore.scanners.ScannerRejectMiddleware",
+    # br/gzip for page HTML, memoized per body; above everything that sets the body
+    "sitecore.compression.CompressionMiddleware",
     "django.middleware.security.SecurityMiddleware",
-    "whitenoise.middleware.WhiteNoiseMiddleware",
+    # WhiteNoise, with hashed static files cached for a year as immutable
+    "sitecore.middleware.StaticFilesMiddleware",
+    # Header-only middleware sit above the stateless fast path so its responses get them too
+    "django.middleware.clickjacking.XFrameOptionsMiddleware",
+    # Adds explicit Permissions-Policy header to avoid noisy console warnings from embeds/extensions
+    "sitecore.middleware.PermissionsPolicyMiddleware",
+    # Content pages (cache_policy(..., stateless=True)) are served from here, without
+    # sessions, CSRF, auth or messages, so their responses stay cookie-free and cacheable
+    "sitecore.middleware.StatelessPageMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
-    "django.middleware.clickjacking.XFrameOptionsMiddleware",
-    # Adds explicit Permissions-Policy header to avoid noisy console warnings from embeds/extensions
-    "sitecore.middleware.PermissionsPolicyMiddleware",
 ]
 
+# Turn off to send content pages through the full middleware stack again.
+STATELESS_FAST_PATH = os.getenv("STATELESS_FAST_PATH", "True").lower() == "true"
+
 ROOT_URLCONF = "GOMWebProjectPt1.urls"
 
+# "wsgi" (Passenger, the default) or "asgi", which asgi.py sets. Under ASGI the sitecore
+# routes use the async views (sitecore/aviews.py), and a free-guide POST starts delivering
+# its GetResponse subscription on the event loop as soon as it is stored
+# (OUTBOX_DELIVER_ON_SUBMIT); drain_outbox still retries whatever that does not deliver.
+SERVER_INTERFACE = os.getenv("SERVER_INTERFACE", "wsgi").lower()
+OUTBOX_DELIVER_ON_SUBMIT = (
+    os.getenv("OUTBOX_DELIVER_ON_SUBMIT", "True").lower() == "true"
+)
+
 TEMPLATES = [
     {
-        "BACKEND": "django.template.backends.django.DjangoTemplates",
+        # Django's backend, timing renders for sitecore.metrics
+        "BACKEND": "sitecore.metrics.TimedDjangoTemplates",
+        "NAME": "django",
         "DIRS": [BASE_DIR / "templates"],
         "APP_DIRS": True,
         "OPTIONS": {
@@ -98,12 +130,27 @@ WSGI_APPLICATION = "GOMWebProjectPt1.wsgi.application"
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
+# SQLite shared by all Passenger workers. IMMEDIATE transactions take the write lock up
+# front, so concurrent atomic() blocks wait on the busy timeout instead of failing with
+# "database is locked" when a read lock can't be upgraded. Connections persist across
+# requests; sitecore/db.py applies SQLITE_PRAGMAS to each new one.
 DATABASES = {
     "default": {
         "ENGINE": "django.db.backends.sqlite3",
-        "NAME": BASE_DIR / "db.sqlite3",
+        "NAME": Path(os.getenv("SQLITE_PATH", str(BASE_DIR / "db.sqlite3"))),
+        "CONN_MAX_AGE": int(os.getenv("DB_CONN_MAX_AGE", "600")),
+        "CONN_HEALTH_CHECKS": True,
+        "OPTIONS": {"timeout": 20, "transaction_mode": "IMMEDIATE"},
     }
 }
+SQLITE_PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",  # safe with WAL; a power cut may drop only the last commits
+    "busy_timeout": 20000,  # ms; matches OPTIONS["timeout"]
+    "mmap_size": 64 * 1024 * 1024,
+    "temp_store": "MEMORY",
+    "cache_size": -8000,  # KiB
+}
 
 
 # Password validation
@@ -144,28 +191,161 @@ STATIC_URL = "static/"
 STATICFILES_DIRS = [BASE_DIR / "static"]
 # Where collectstatic will gather production assets
 STATIC_ROOT = BASE_DIR / "staticfiles"
-# WhiteNoise static files storage for compressed, hashed files
-STATICFILES_STORAGE = "whitenoise.storage.CompressedManifestStaticFilesStorage"
+# Generated assets (responsive image variants, ...) are written here by the asset build that
+# runs as part of collectstatic. It must live inside the first STATICFILES_DIRS entry.
+ASSET_BUILD_DIR = BASE_DIR / "static" / "build"
+# WhiteNoise's compressed manifest storage: collectstatic writes content-hashed copies and
+# templates get their URLs from the manifest (see sitecore/storage.py).
+STORAGES = {
+    "default": {"BACKEND": "django.core.files.storage.FileSystemStorage"},
+    "staticfiles": {"BACKEND": "sitecore.storage.HashedStaticFilesStorage"},
+}
+
+# Pre-rendered content pages (`manage.py prerender`). With PRERENDER_SERVE=True WhiteNoise
+# serves them at the site root, so only interactive routes (free guide, admin) reach Django.
+# Kept outside STATIC_ROOT, whose whole tree is public under /static/: only
+# PRERENDER_ROOT is served, never its manifest next to it in PRERENDER_DIR.
+PRERENDER_DIR = Path(os.getenv("PRERENDER_DIR", str(RUNTIME_DIR / "prerendered")))
+PRERENDER_ROOT = PRERENDER_DIR / "pages"
+PRERENDER_SERVE = os.getenv("PRERENDER_SERVE", "False").lower() == "true"
+if PRERENDER_SERVE and PRERENDER_ROOT.is_dir():
+    WHITENOISE_ROOT = PRERENDER_ROOT
+    WHITENOISE_INDEX_FILE = True
 
 # Marketing integrations (configure via environment variables)
 GETRESPONSE_API_KEY = os.getenv("GETRESPONSE_API_KEY", "")
 GETRESPONSE_LIST_ID = os.getenv("GETRESPONSE_LIST_ID", "")
+GETRESPONSE_API_URL = os.getenv("GETRESPONSE_API_URL", "https://api.getresponse.com/v3")
+# Circuit breaker: open after this many consecutive failures, probe again after RESET seconds.
+# State lives in a small SQLite file so every Passenger worker sees the same breaker.
+GETRESPONSE_BREAKER_THRESHOLD = int(os.getenv("GETRESPONSE_BREAKER_THRESHOLD", "5"))
+GETRESPONSE_BREAKER_RESET = float(os.getenv("GETRESPONSE_BREAKER_RESET", "30"))
+GETRESPONSE_BREAKER_PATH = RUNTIME_DIR / "getresponse-breaker.sqlite3"
+# ASGI mode only: GetResponse requests the async client keeps in flight per process.
+GETRESPONSE_ASYNC_CONCURRENCY = int(os.getenv("GETRESPONSE_ASYNC_CONCURRENCY", "20"))
 CALENDLY_URL = os.getenv("CALENDLY_URL", "https://calendly.com/your-scheduling-link")
 # Post-purchase onboarding form (embed URL, e.g., a Typeform, Tally, Jotform, or Google Form)
 ONBOARDING_EMBED_URL = os.getenv("ONBOARDING_EMBED_URL", "")
 # Branding
 # If not provided via env, default to the local static path where you can place your file
 LOGO_URL = os.getenv("LOGO_URL", "/static/img/logo.png")
-# Static asset version for cache-busting. Prefer setting via env (STATIC_VERSION) on deploy.
-# Fallback uses UTC timestamp at process start, so each app reload updates the version.
-try:
-    from datetime import datetime
+# In-process cache of rendered content pages (sitecore.pagecache). Entries are keyed by
+# path, the static manifest hash and template mtimes, so deploys and template edits
+# invalidate them.
+PAGE_CACHE_ENABLED = os.getenv("PAGE_CACHE_ENABLED", "True").lower() == "true"
+PAGE_CACHE_MAX_ENTRIES = int(os.getenv("PAGE_CACHE_MAX_ENTRIES", "128"))
+# Also share rendered pages between workers through the default cache (below).
+PAGE_CACHE_SHARED = os.getenv("PAGE_CACHE_SHARED", "True").lower() == "true"
+
+# Cache shared by all Passenger workers on the host: one SQLite file (sitecore.cache).
+# Sessions are read through it and written to the database as well (cached_db), so a
+# culled entry never logs anyone out.
+CACHES = {
+    "default": {
+        "BACKEND": "sitecore.cache.SQLiteCache",
+        "LOCATION": str(RUNTIME_DIR / "cache.sqlite3"),
+        "TIMEOUT": 300,
+        "OPTIONS": {
+            "MAX_ENTRIES": int(os.getenv("CACHE_MAX_ENTRIES", "5000")),
+        },
+    }
+}
+SESSION_ENGINE = "django.contrib.sessions.backends.cached_db"
+
+# Write-behind for free-guide submissions (sitecore.leads): queue them in memory and write
+# them in batches of up to MAX_ROWS, at most MAX_DELAY_MS after the first one. Off by
+# default because queued submissions are lost if a worker is killed before a flush.
+LEAD_WRITE_BEHIND = os.getenv("LEAD_WRITE_BEHIND", "False").lower() == "true"
+LEAD_WRITE_BEHIND_MAX_ROWS = int(os.getenv("LEAD_WRITE_BEHIND_MAX_ROWS", "50"))
+LEAD_WRITE_BEHIND_MAX_DELAY_MS = int(os.getenv("LEAD_WRITE_BEHIND_MAX_DELAY_MS", "200"))
+# `manage.py archive_leads` writes compressed NDJSON archives of old leads here.
+LEAD_ARCHIVE_DIR = Path(os.getenv("LEAD_ARCHIVE_DIR", str(RUNTIME_DIR / "archive")))
+# Free-guide load shedding (sitecore.shedding): per-IP token buckets shared by all
+# workers through a SQLite file, and a shared Bloom filter of recent submissions
+# (email, name and consent) so exact repeats skip the database.
+LEAD_SHED_ENABLED = os.getenv("LEAD_SHED_ENABLED", "True").lower() == "true"
+LEAD_RATE_PER_MINUTE = float(os.getenv("LEAD_RATE_PER_MINUTE", "6"))
+LEAD_RATE_BURST = int(os.getenv("LEAD_RATE_BURST", "10"))
+LEAD_SHED_PATH = RUNTIME_DIR / "shedding.sqlite3"
+LEAD_DEDUPE_PATH = RUNTIME_DIR / "recent-emails.bloom"
+LEAD_DEDUPE_WINDOW_HOURS = float(os.getenv("LEAD_DEDUPE_WINDOW_HOURS", "24"))
+
+# Request instrumentation (sitecore.metrics): Server-Timing headers and Prometheus
+# metrics at /metrics, aggregated across workers through per-process files in
+# METRICS_DIR. /metrics requires `Authorization: Bearer <METRICS_TOKEN>` and is a 404
+# while METRICS_TOKEN is unset.
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "True").lower() == "true"
+METRICS_SERVER_TIMING = os.getenv("METRICS_SERVER_TIMING", "True").lower() == "true"
+METRICS_DIR = RUNTIME_DIR / "metrics"
+METRICS_TOKEN = os.getenv("METRICS_TOKEN", "")
+
+# Response compression (sitecore.compression): br (with the optional brotli package) or
+# gzip for text bodies of at least MIN_BYTES. Compressed public pages are memoized by
+# body hash in an LRU of CACHE_ENTRIES entries / CACHE_BYTES bytes per worker.
+COMPRESSION_ENABLED = os.getenv("COMPRESSION_ENABLED", "True").lower() == "true"
+COMPRESSION_MIN_BYTES = int(os.getenv("COMPRESSION_MIN_BYTES", "512"))
+COMPRESSION_GZIP_LEVEL = int(os.getenv("COMPRESSION_GZIP_LEVEL", "6"))
+COMPRESSION_BROTLI_QUALITY = int(os.getenv("COMPRESSION_BROTLI_QUALITY", "5"))
+COMPRESSION_CACHE_ENTRIES = int(os.getenv("COMPRESSION_CACHE_ENTRIES", "256"))
+COMPRESSION_CACHE_BYTES = int(
+    os.getenv("COMPRESSION_CACHE_BYTES", str(4 * 1024 * 1024))
+)
 
-    STATIC_VERSION = os.getenv(
-        "STATIC_VERSION", datetime.utcnow().strftime("%Y%m%d%H%M")
-    )
-except Exception:
-    STATIC_VERSION = os.getenv("STATIC_VERSION", "1")
+# Scanner probes (sitecore.scanners): paths on these lists, lower-cased, get a small
+# cacheable SCANNER_REJECT_STATUS (404 or 410) before sessions, the database or URL
+# resolving. Real routes are never rejected. Comma-separated to override.
+SCANNER_REJECT_ENABLED = os.getenv("SCANNER_REJECT_ENABLED", "True").lower() == "true"
+SCANNER_REJECT_STATUS = int(os.getenv("SCANNER_REJECT_STATUS", "404"))
+
+SCANNER_BLOCK_PATHS = [
+    p.strip()
+    for p in os.getenv(
+        "SCANNER_BLOCK_PATHS",
+        "/wp-login.php,/xmlrpc.php,/wp-config.php,/.env,/config.json,/phpinfo.php,"
+        "/server-status,/.ds_store,/sftp-config.json,/owa/auth/logon.aspx",
+    ).split(",")
+    if p.strip()
+]
+SCANNER_BLOCK_PREFIXES = [
+    p.strip()
+    for p in os.getenv(
+        "SCANNER_BLOCK_PREFIXES",
+        "/wp-admin,/wp-content,/wp-includes,/wp-json,/wordpress,/wp/,/.git,/.svn,/.hg,"
+        "/.aws,/.env.,/.vscode,/cgi-bin,/phpmyadmin,/pma/,/vendor/,/actuator,/boaform,"
+        "/hnap1,/solr/,/telescope",
+    ).split(",")
+    if p.strip()
+]
+SCANNER_BLOCK_SUFFIXES = [
+    p.strip()
+    for p in os.getenv(
+        "SCANNER_BLOCK_SUFFIXES", ".php,.asp,.aspx,.jsp,.cgi,.env,.sql,.bak,.old,.swp"
+    ).split(",")
+    if p.strip()
+]
+
+# Sampling profiler (sitecore.profiling): profile 1 in PROFILE_SAMPLE_RATE requests
+# (0: only requests with an X-Profile-Token from `manage.py profile_report --token`),
+# reading the stack every PROFILE_INTERVAL_MS. Collapsed stacks go to PROFILE_DIR;
+# the newest PROFILE_MAX_FILES are kept.
+PROFILE_SAMPLE_RATE = int(os.getenv("PROFILE_SAMPLE_RATE", "0"))
+PROFILE_INTERVAL_MS = float(os.getenv("PROFILE_INTERVAL_MS", "5"))
+PROFILE_DIR = RUNTIME_DIR / "profiles"
+PROFILE_MAX_FILES = int(os.getenv("PROFILE_MAX_FILES", "500"))
+PROFILE_TOKEN_MAX_AGE = int(os.getenv("PROFILE_TOKEN_MAX_AGE", "3600"))
+
+# CRM feed (GET /api/leads/, sitecore.api): comma-separated bearer tokens; the endpoint
+# rejects every request while this is empty. Leads younger than SETTLE_SECONDS are held
+# back so a concurrent insert can't land behind a cursor a poller already passed.
+LEADS_API_TOKENS = [
+    t.strip() for t in os.getenv("LEADS_API_TOKENS", "").split(",") if t.strip()
+]
+LEADS_API_SETTLE_SECONDS = float(os.getenv("LEADS_API_SETTLE_SECONDS", "2"))
+
+# Worker warm-up (sitecore.warmup): with True, wsgi.py/passenger_wsgi.py resolve every
+# URL, compile the views' templates and load the static manifests before the worker
+# takes its first request. `manage.py startup_profile` shows what it saves.
+WARMUP_ON_START = os.getenv("WARMUP_ON_START", "False").lower() == "true"
 
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
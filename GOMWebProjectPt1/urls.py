@@ -15,10 +15,17 @@ Including another URLconf
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
 
+from django.conf import settings
 from django.contrib import admin
 from django.urls import include, path
 
 urlpatterns = [
     path("admin/", admin.site.urls),
-    path("", include("sitecore.urls")),
+    # Same routes, async views, when served by asgi.py
+    path(
+        "",
+        include(
+            "sitecore.aurls" if settings.SERVER_INTERFACE == "asgi" else "sitecore.urls"
+        ),
+    ),
 ]
@@ -11,3 +11,8 @@ os.environ.setdefault("DJANGO_SETTINGS_MODULE", "GOMWebProjectPt1.settings")
 from django.core.wsgi import get_wsgi_application  # noqa: E402
 
 application = get_wsgi_application()
+
+# Opt-in (WARMUP_ON_START): pay the first request's one-off costs before serving.
+from sitecore.warmup import warm_up_if_enabled  # noqa: E402
+
+warm_up_if_enabled()
@@ -1,3 +1,94 @@
-from django.contrib import admin  # noqa: F401
+from typing import Any
 
-# Register your models here.
+from django.contrib import admin
+from django.contrib.admin.views.main import ChangeList
+from django.db.models import QuerySet
+from django.http import HttpRequest, StreamingHttpResponse
+from django.utils import timezone
+
+from . import exports
+from .models import Lead
+
+CURSOR_VAR = "before"
+
+
+class KeysetChangeList(ChangeList):
+    """Newest-first listing paged by ``id < cursor`` instead of COUNT + OFFSET.
+
+    Each page costs one index range scan however deep into a large table it is, at
+    the price of only offering "older" and "newest" links instead of page numbers.
+    """
+
+    def __init__(self, request: HttpRequest, *args: Any, **kwargs: Any) -> None:
+        raw = request.GET.get(CURSOR_VAR, "")
+        self.cursor = int(raw) if raw.isdigit() else None
+        super().__init__(request, *args, **kwargs)
+
+    def get_filters_params(self, params: Any = None) -> dict[str, Any]:
+        lookup_params = super().get_filters_params(params)
+        lookup_params.pop(CURSOR_VAR, None)
+        return lookup_params
+
+    def get_results(self, request: HttpRequest) -> None:
+        queryset = self.queryset.order_by("-pk")
+        if self.cursor is not None:
+            queryset = queryset.filter(pk__lt=self.cursor)
+        rows = list(queryset[: self.list_per_page + 1])
+        self.result_list = rows[: self.list_per_page]
+        self.result_count = len(self.result_list)
+        self.full_result_count = None
+        self.show_full_result_count = False
+        self.can_show_all = False
+        # The stock page-number links need a paginator; the template links by cursor.
+        self.multi_page = False
+        self.paginator = None
+        self.older_url = (
+            self.get_query_string({CURSOR_VAR: self.result_list[-1].pk})
+            if len(rows) > self.list_per_page
+            else None
+        )
+        self.newest_url = (
+            self.get_query_string(remove=[CURSOR_VAR])
+            if self.cursor is not None
+            else None
+        )
+
+
+def _export(queryset: QuerySet[Lead], fmt: str) -> StreamingHttpResponse:
+    generate, content_type, extension = exports.FORMATS[fmt]
+    response = StreamingHttpResponse(generate(queryset), content_type=content_type)
+    stamp = timezone.localtime().strftime("%Y%m%d-%H%M%S")
+    response["Content-Disposition"] = (
+        f'attachment; filename="leads-{stamp}.{extension}"'
+    )
+    return response
+
+
+@admin.register(Lead)
+class LeadAdmin(admin.ModelAdmin):
+    list_display = ("email", "name", "consent", "created_at", "synced_at")
+    list_filter = ("consent", ("synced_at", admin.EmptyFieldListFilter))
+    search_fields = ("email", "name")
+    ordering = ("-pk",)
+    # Sorting by another column would break the id cursor.
+    sortable_by = ()
+    show_full_result_count = False
+    readonly_fields = ("created_at", "synced_at", "sync_error")
+    actions = ["export_csv", "export_ndjson"]
+
+    def get_changelist(
+        self, request: HttpRequest, **kwargs: Any
+    ) -> type[KeysetChangeList]:
+        return KeysetChangeList
+
+    @admin.action(description="Export selected leads as CSV")
+    def export_csv(
+        self, request: HttpRequest, queryset: QuerySet[Lead]
+    ) -> StreamingHttpResponse:
+        return _export(queryset, "csv")
+
+    @admin.action(description="Export selected leads as NDJSON")
+    def export_ndjson(
+        self, request: HttpRequest, queryset: QuerySet[Lead]
+    ) -> StreamingHttpResponse:
+        return _export(queryset, "ndjson")
@@ -0,0 +1,144 @@
+"""Incremental JSON feed of leads for CRM pulls (``GET /api/leads/``).
+
+Clients authenticate with ``Authorization: Bearer <token>`` (one of
+``LEADS_API_TOKENS``) and page forward with an opaque cursor: every response carries
+``next``, the position after its last lead, and passing it back as ``?cursor=`` returns
+only leads created since. The cursor encodes ``(created_at, id)``, so a page is one range
+scan of the ``(created_at, id)`` index however large the table is, and ties on
+``created_at`` are never skipped or repeated.
+
+Leads younger than ``LEADS_API_SETTLE_SECONDS`` are held back: a transaction that
+stamped ``created_at`` just before another one committed could otherwise appear behind
+a cursor a poller has already moved past.
+
+The ETag hashes the request and the ids on the page, which come from the index alone;
+a poller repeating ``If-None-Match`` gets a 304 without any lead row being read. Rows
+are reported once, when created; later updates (e.g. ``synced_at``) are not re-sent.
+"""
+
+import base64
+import binascii
+import datetime
+import hashlib
+import hmac
+import json
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+from django.http import HttpRequest, HttpResponse, JsonResponse
+from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.views.decorators.http import require_GET
+
+from .models import Lead
+
+FIELDS = ("id", "email", "name", "consent", "created_at", "synced_at")
+DEFAULT_LIMIT = 100
+MAX_LIMIT = 1000
+
+
+class BadRequest(ValueError):
+    pass
+
+
+def encode_cursor(created_at: datetime.datetime, pk: int) -> str:
+    raw = f"{created_at.isoformat()}|{pk}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime.datetime, int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        created, pk = raw.rsplit("|", 1)
+        created_at = datetime.datetime.fromisoformat(created)
+        if settings.USE_TZ and timezone.is_naive(created_at):
+            raise ValueError("naive timestamp")
+        return created_at, int(pk)
+    except (binascii.Error, UnicodeDecodeError, ValueError) as e:
+        raise BadRequest("invalid cursor") from e
+
+
+def _authorized(request: HttpRequest) -> bool:
+    scheme, _, token = request.headers.get("Authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return False
+    # Compare against every token so timing does not reveal which one nearly matched.
+    matches = [
+        hmac.compare_digest(token.strip().encode(), allowed.encode())
+        for allowed in settings.LEADS_API_TOKENS
+    ]
+    return any(matches)
+
+
+def _parse(request: HttpRequest) -> tuple[list[str], int, str]:
+    fields = [f for f in request.GET.get("fields", "").split(",") if f]
+    unknown = set(fields) - set(FIELDS)
+    if unknown:
+        raise BadRequest(f"unknown fields: {', '.join(sorted(unknown))}")
+    try:
+        limit = int(request.GET.get("limit", DEFAULT_LIMIT))
+    except ValueError as e:
+        raise BadRequest("limit must be an integer") from e
+    if not 1 <= limit <= MAX_LIMIT:
+        raise BadRequest(f"limit must be between 1 and {MAX_LIMIT}")
+    return fields or list(FIELDS), limit, request.GET.get("cursor", "")
+
+
+def _error(status: int, message: str) -> JsonResponse:
+    response = JsonResponse({"error": message}, status=status)
+    if status == 401:
+        response["WWW-Authenticate"] = 'Bearer realm="leads"'
+    patch_cache_control(response, no_store=True)
+    return response
+
+
+@require_GET
+def leads_feed(request: HttpRequest) -> HttpResponse:
+    if not _authorized(request):
+        return _error(401, "authentication required")
+    try:
+        fields, limit, cursor = _parse(request)
+        position = decode_cursor(cursor) if cursor else None
+    except BadRequest as e:
+        return _error(400, str(e))
+
+    settled = timezone.now() - datetime.timedelta(
+        seconds=settings.LEADS_API_SETTLE_SECONDS
+    )
+    queryset = Lead.objects.filter(created_at__lt=settled)
+    if position is not None:
+        created_at, pk = position
+        # created_at >= X keeps the range scan on the index; the OR only breaks ties.
+        queryset = queryset.filter(created_at__gte=created_at).filter(
+            Q(created_at__gt=created_at) | Q(pk__gt=pk)
+        )
+    queryset = queryset.order_by("created_at", "pk")
+    page = list(queryset.values_list("created_at", "pk")[:limit])
+
+    digest = hashlib.sha256(f"{','.join(fields)}|{limit}|{cursor}".encode())
+    for _, pk in page:
+        digest.update(b"%d," % pk)
+    etag = f'"{digest.hexdigest()[:32]}"'
+    not_modified = get_conditional_response(request, etag=etag)
+    if not_modified is not None:
+        patch_cache_control(not_modified, private=True, no_cache=True)
+        return not_modified
+
+    if page:
+        rows = Lead.objects.filter(pk__in=[pk for _, pk in page]).order_by(
+            "created_at", "pk"
+        )
+        results = list(rows.values(*fields))
+        next_cursor = encode_cursor(*page[-1])
+    else:
+        results, next_cursor = [], cursor
+    body = json.dumps(
+        {"results": results, "next": next_cursor},
+        cls=DjangoJSONEncoder,
+        separators=(",", ":"),
+    )
+    response = HttpResponse(body, content_type="application/json")
+    response["ETag"] = etag
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
@@ -1,6 +1,14 @@
 from django.apps import AppConfig
+from django.db.backends.signals import connection_created
 
 
 class SitecoreConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "sitecore"
+
+    def ready(self) -> None:
+        from .db import configure_sqlite
+
+        connection_created.connect(
+            configure_sqlite, dispatch_uid="sitecore.configure_sqlite"
+        )
@@ -0,0 +1,6 @@
+"""Routes for ASGI mode (``SERVER_INTERFACE=asgi``): the same URLs, async views."""
+
+from . import aviews
+from .urls import build_urlpatterns
+
+urlpatterns = build_urlpatterns(aviews)
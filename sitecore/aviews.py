@@ -0,0 +1,114 @@
+"""Async versions of ``sitecore.views``, routed by ``sitecore/aurls.py`` under ASGI.
+
+The free-guide POST never blocks the event loop on the network: the lead and its
+outbox message are written in one transaction (in Django's sync thread), then its
+GetResponse subscription is delivered on the loop by ``outbox.deliver_soon`` while the
+visitor is already being redirected. A slow API therefore ties up sockets, not
+workers. Content pages come from the page cache on the loop; only a cache miss
+renders, in a thread, because the messages context processor may read the session
+through the (sync-only) ORM.
+"""
+
+from typing import Any
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib import messages
+from django.http import HttpRequest, HttpResponse
+from django.shortcuts import redirect, render
+
+from . import leads, outbox, shedding
+from .forms import LeadMagnetForm
+from .pagecache import cache_page_response
+
+
+async def _render(
+    request: HttpRequest, template: str, context: dict[str, Any] | None = None
+) -> HttpResponse:
+    return await sync_to_async(render)(request, template, context)
+
+
+@cache_page_response
+async def home(request: HttpRequest) -> HttpResponse:
+    return await _render(
+        request, "sitecore/home.html", {"calendly_url": settings.CALENDLY_URL}
+    )
+
+
+@cache_page_response
+async def pricing(request: HttpRequest) -> HttpResponse:
+    return await _render(request, "sitecore/pricing.html")
+
+
+@cache_page_response
+async def book(request: HttpRequest) -> HttpResponse:
+    return await _render(
+        request, "sitecore/book.html", {"calendly_url": settings.CALENDLY_URL}
+    )
+
+
+@shedding.shed_abuse
+async def lead_magnet(request: HttpRequest) -> HttpResponse:
+    if request.method == "POST":
+        form = LeadMagnetForm(request.POST)
+        if form.is_valid():
+            name = form.cleaned_data["name"]
+            email = form.cleaned_data["email"]
+            consent = form.cleaned_data["consent"]
+            shedder = shedding.get_shedder() if settings.LEAD_SHED_ENABLED else None
+            normalized = leads.normalize_email(email)
+            if shedder is not None and shedder.seen_recently(normalized, name, consent):
+                shedder.counters.incr("duplicate")
+            else:
+                outbox.deliver_soon(await leads.asubmit(name, email, consent))
+                if shedder is not None:
+                    shedder.remember(normalized, name, consent)
+            messages.success(
+                request,
+                "Thanks! Check your inbox shortly. Your free guide is on its way.",
+            )
+            return redirect("free_guide_thanks")
+    else:
+        form = LeadMagnetForm()
+    return await _render(request, "sitecore/lead_magnet.html", {"form": form})
+
+
+async def lead_thanks(request: HttpRequest) -> HttpResponse:
+    return await _render(request, "sitecore/lead_thanks.html")
+
+
+free_guide = lead_magnet
+free_guide_thanks = lead_thanks
+
+
+@cache_page_response
+async def terms(request: HttpRequest) -> HttpResponse:
+    return await _render(request, "sitecore/terms.html")
+
+
+@cache_page_response
+async def privacy(request: HttpRequest) -> HttpResponse:
+    return await _render(request, "sitecore/privacy.html")
+
+
+@cache_page_response
+async def start(request: HttpRequest) -> HttpResponse:
+    return await _render(
+        request,
+        "sitecore/start.html",
+        {"embed_url": getattr(settings, "ONBOARDING_EMBED_URL", "")},
+    )
+
+
+@cache_page_response
+async def gom_onboarding(request: HttpRequest) -> HttpResponse:
+    return await _render(request, "gom-onboarding.html")
+
+
+@cache_page_response
+async def smartpro_agreement(request: HttpRequest) -> HttpResponse:
+    return await _render(request, "smartpro-agreement.html")
+
+
+async def healthz(request: HttpRequest) -> HttpResponse:
+    return HttpResponse("ok", content_type="text/plain")
@@ -0,0 +1,621 @@
+"""In-process load benchmark for every route in ``sitecore/urls.py``.
+
+Requests go straight into the WSGI ``application`` from ``GOMWebProjectPt1/wsgi.py``
+(no sockets, so the numbers are the application's own cost), or with
+``transport="socket"`` through a local ``wsgiref`` server to include HTTP parsing.
+Every route is requested ``requests`` times after ``warmup`` unmeasured requests,
+with the same middleware, caches and settings as production (``DEBUG=False``).
+
+``free_guide_post`` submits the form (fetching a CSRF token first) with a fresh
+address and client IP each time, so neither the dedupe filter nor the rate limiter
+short-circuits it. ``outbox_drain`` then delivers the queued subscriptions one at a
+time to a stub GetResponse server on localhost.
+
+Reports compare against ``benchmarks/baseline.json``. A route regresses when its
+p50 or p95 is more than ``threshold`` (a fraction) above the baseline, plus
+``slack_ms`` so sub-millisecond routes don't fail on timer noise.
+
+``run_cache_benchmarks`` (``manage.py cache_benchmark``) times the cache backends
+instead: Django's locmem and ``FileBasedCache`` against ``sitecore.cache.SQLiteCache``,
+per operation in one process, then with several processes incrementing one counter
+at once to show which backends are shared and which lose updates.
+
+``run_compression_benchmarks`` (``manage.py compression_benchmark``) renders every page
+and weighs the CPU time of each encoding and level against the bytes it saves, next to
+the cost of a memoized response (hashing the body and an LRU lookup).
+"""
+
+import contextlib
+import json
+import multiprocessing
+import os
+import platform
+import re
+import statistics
+import tempfile
+import threading
+import time
+from collections.abc import Callable, Iterator
+from dataclasses import dataclass, field
+from http.client import HTTPConnection
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from io import BytesIO
+from pathlib import Path
+from typing import Any
+from urllib.parse import urlencode
+from wsgiref.simple_server import WSGIRequestHandler, WSGIServer, make_server
+
+from django.conf import settings
+from django.core.cache.backends.base import BaseCache
+from django.test import override_settings
+from django.urls import URLPattern
+from django.utils.module_loading import import_string
+
+from . import outbox
+from . import urls as sitecore_urls
+
+BASELINE_PATH = Path(settings.BASE_DIR) / "benchmarks" / "baseline.json"
+API_TOKEN = "benchmark"
+_CSRF_RE = re.compile(r'name="csrfmiddlewaretoken" value="([^"]+)"')
+
+
+@dataclass
+class Request:
+    method: str
+    path: str
+    headers: dict[str, str] = field(default_factory=dict)
+    body: bytes = b""
+    remote_addr: str = "127.0.0.1"
+
+
+@dataclass
+class RouteResult:
+    name: str
+    latencies: list[float] = field(default_factory=list, repr=False)
+    seconds: float = 0.0
+    statuses: set[int] = field(default_factory=set)
+
+    @property
+    def throughput(self) -> float:
+        return len(self.latencies) / self.seconds if self.seconds else 0.0
+
+    def percentile(self, pct: float) -> float:
+        """Latency in milliseconds at the given percentile (0-100)."""
+        if not self.latencies:
+            return 0.0
+        ordered = sorted(self.latencies)
+        index = min(len(ordered) - 1, round(pct / 100 * (len(ordered) - 1)))
+        return ordered[index] * 1000
+
+    def summary(self) -> dict[str, float]:
+        return {
+            "rps": round(self.throughput, 1),
+            "mean_ms": round(statistics.fmean(self.latencies) * 1000, 3),
+            "p50_ms": round(self.percentile(50), 3),
+            "p95_ms": round(self.percentile(95), 3),
+            "p99_ms": round(self.percentile(99), 3),
+        }
+
+
+@dataclass
+class BenchmarkReport:
+    transport: str
+    requests: int
+    routes: dict[str, RouteResult] = field(default_factory=dict)
+
+    def to_json(self) -> dict[str, Any]:
+        return {
+            "transport": self.transport,
+            "requests": self.requests,
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "routes": {name: r.summary() for name, r in sorted(self.routes.items())},
+        }
+
+
+@dataclass
+class Regression:
+    route: str
+    metric: str
+    baseline: float
+    current: float
+
+    def __str__(self) -> str:
+        return (
+            f"{self.route} {self.metric}: {self.current:.3f} ms "
+            f"(baseline {self.baseline:.3f} ms)"
+        )
+
+
+class WSGITransport:
+    """Calls the WSGI application in-process."""
+
+    name = "wsgi"
+
+    def __init__(self, application: Callable[..., Any]) -> None:
+        self.application = application
+
+    def __call__(self, request: Request) -> tuple[int, dict[str, str], bytes]:
+        path, _, query = request.path.partition("?")
+        environ = {
+            "REQUEST_METHOD": request.method,
+            "PATH_INFO": path,
+            "QUERY_STRING": query,
+            "SERVER_NAME": "testserver",
+            "SERVER_PORT": "80",
+            "SERVER_PROTOCOL": "HTTP/1.1",
+            "REMOTE_ADDR": request.remote_addr,
+            "HTTP_HOST": "testserver",
+            "CONTENT_LENGTH": str(len(request.body)),
+            "wsgi.input": BytesIO(request.body),
+            "wsgi.errors": BytesIO(),
+            "wsgi.url_scheme": "http",
+            "wsgi.version": (1, 0),
+            "wsgi.multithread": False,
+            "wsgi.multiprocess": True,
+            "wsgi.run_once": False,
+        }
+        for key, value in request.headers.items():
+            name = key.upper().replace("-", "_")
+            if name == "CONTENT_TYPE":
+                environ[name] = value
+            else:
+                environ[f"HTTP_{name}"] = value
+        captured: dict[str, Any] = {}
+
+        def start_response(
+            status: str, headers: list[tuple[str, str]], *_: Any
+        ) -> None:
+            captured["status"] = int(status.split(" ", 1)[0])
+            captured["headers"] = {k.lower(): v for k, v in headers}
+
+        result = self.application(environ, start_response)
+        try:
+            body = b"".join(result)
+        finally:
+            if hasattr(result, "close"):
+                result.close()
+        return captured["status"], captured["headers"], body
+
+    def close(self) -> None:
+        pass
+
+
+class _QuietHandler(WSGIRequestHandler):
+    def log_message(self, *args: Any) -> None:
+        pass
+
+    def address_string(self) -> str:
+        return str(self.client_address[0])
+
+
+class SocketTransport:
+    """Serves the application from a local wsgiref server and requests it over TCP.
+
+    Every request comes from 127.0.0.1 here, so ``benchmark_settings`` raises the
+    rate-limit burst high enough never to trigger.
+    """
+
+    name = "socket"
+
+    def __init__(self, application: Callable[..., Any]) -> None:
+        self.server: WSGIServer = make_server(
+            "127.0.0.1", 0, application, handler_class=_QuietHandler
+        )
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+
+    def __call__(self, request: Request) -> tuple[int, dict[str, str], bytes]:
+        host, port = self.server.server_address[:2]
+        conn = HTTPConnection(str(host), int(port), timeout=30)
+        try:
+            headers = {"Host": "testserver", **request.headers}
+            conn.request(
+                request.method, request.path, body=request.body or None, headers=headers
+            )
+            response = conn.getresponse()
+            body = response.read()
+            return (
+                response.status,
+                {k.lower(): v for k, v in response.getheaders()},
+                body,
+            )
+        finally:
+            conn.close()
+
+    def close(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class _StubGetResponseHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self) -> None:
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        self.server.contacts += 1  # type: ignore[attr-defined]
+        self.send_response(202)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def log_message(self, *args: Any) -> None:
+        pass
+
+
+@contextlib.contextmanager
+def stub_getresponse() -> Iterator[ThreadingHTTPServer]:
+    """A local server that accepts every contact, like GetResponse on a good day."""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _StubGetResponseHandler)
+    server.contacts = 0  # type: ignore[attr-defined]
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield server
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+@contextlib.contextmanager
+def benchmark_settings() -> Iterator[ThreadingHTTPServer]:
+    """Production-like settings with all runtime state in a scratch directory.
+
+    The database is whatever is configured; run inside a test database.
+    """
+    with (
+        tempfile.TemporaryDirectory() as tmp,
+        stub_getresponse() as stub,
+    ):
+        runtime = Path(tmp)
+        with override_settings(
+            DEBUG=False,
+            ALLOWED_HOSTS=["testserver"],
+            LEADS_API_TOKENS=[API_TOKEN],
+            METRICS_TOKEN=API_TOKEN,
+            GETRESPONSE_API_KEY="benchmark",
+            GETRESPONSE_LIST_ID="benchmark",
+            GETRESPONSE_API_URL=f"http://127.0.0.1:{stub.server_port}/v3",
+            GETRESPONSE_BREAKER_PATH=runtime / "breaker.sqlite3",
+            LEAD_SHED_PATH=runtime / "shedding.sqlite3",
+            LEAD_DEDUPE_PATH=runtime / "recent-emails.bloom",
+            LEAD_WRITE_BEHIND=False,
+            LEAD_RATE_BURST=10**9,
+            METRICS_DIR=runtime / "metrics",
+        ):
+            yield stub
+
+
+def route_requests() -> dict[str, Request]:
+    """One GET per pattern in ``sitecore.urls``, named by URL name (or path)."""
+    found = {}
+    for pattern in sitecore_urls.urlpatterns:
+        if not isinstance(pattern, URLPattern) or pattern.pattern.converters:
+            continue
+        path = "/" + str(pattern.pattern)
+        headers = {}
+        if pattern.name in ("api_leads", "metrics"):
+            headers["Authorization"] = f"Bearer {API_TOKEN}"
+        found[pattern.name or path] = Request("GET", path, headers)
+    return found
+
+
+class _LeadPoster:
+    """Builds free-guide POSTs with a valid CSRF token, unique emails and client IPs."""
+
+    def __init__(
+        self, transport: Callable[[Request], tuple[int, dict[str, str], bytes]]
+    ):
+        status, headers, body = transport(Request("GET", "/free-guide/"))
+        cookie = headers.get("set-cookie", "")
+        match = _CSRF_RE.search(body.decode())
+        if status != 200 or match is None or "csrftoken=" not in cookie:
+            raise RuntimeError("could not obtain a CSRF token from /free-guide/")
+        self.cookie = cookie.split(";", 1)[0]
+        self.token = match.group(1)
+        self.count = 0
+
+    def __call__(self) -> Request:
+        self.count += 1
+        n = self.count
+        body = urlencode(
+            {
+                "csrfmiddlewaretoken": self.token,
+                "name": "Benchmark",
+                "email": f"bench-{time.time_ns()}-{n}@example.com",
+                "consent": "on",
+            }
+        ).encode()
+        return Request(
+            "POST",
+            "/free-guide/",
+            {
+                "Content-Type": "application/x-www-form-urlencoded",
+                "Cookie": self.cookie,
+            },
+            body,
+            remote_addr=f"10.{n >> 16 & 255}.{n >> 8 & 255}.{n & 255}",
+        )
+
+
+def _measure(
+    name: str,
+    transport: Callable[[Request], tuple[int, dict[str, str], bytes]],
+    make_request: Callable[[], Request],
+    requests: int,
+    warmup: int,
+) -> RouteResult:
+    result = RouteResult(name)
+    for _ in range(warmup):
+        transport(make_request())
+    started = time.perf_counter()
+    for _ in range(requests):
+        request = make_request()
+        t0 = time.perf_counter()
+        status, _, _ = transport(request)
+        result.latencies.append(time.perf_counter() - t0)
+        result.statuses.add(status)
+    result.seconds = time.perf_counter() - started
+    return result
+
+
+def _measure_drain(requests: int) -> RouteResult:
+    result = RouteResult("outbox_drain")
+    started = time.perf_counter()
+    for _ in range(requests):
+        t0 = time.perf_counter()
+        drained = outbox.drain(batch_size=1)
+        if not drained.sent:
+            break
+        result.latencies.append(time.perf_counter() - t0)
+        result.statuses.add(200)
+    result.seconds = time.perf_counter() - started
+    return result
+
+
+def run_benchmarks(
+    requests: int = 200,
+    warmup: int = 20,
+    transport: str = "wsgi",
+    routes: list[str] | None = None,
+) -> BenchmarkReport:
+    """Benchmark every route (or only ``routes``). Call inside ``benchmark_settings``."""
+    from GOMWebProjectPt1.wsgi import application
+
+    client = (
+        SocketTransport(application)
+        if transport == "socket"
+        else WSGITransport(application)
+    )
+    report = BenchmarkReport(transport=client.name, requests=requests)
+    try:
+        for name, request in route_requests().items():
+            if routes and name not in routes:
+                continue
+
+            def same(r: Request = request) -> Request:
+                return r
+
+            report.routes[name] = _measure(name, client, same, requests, warmup)
+        if not routes or "free_guide_post" in routes or "outbox_drain" in routes:
+            poster = _LeadPoster(client)
+            report.routes["free_guide_post"] = _measure(
+                "free_guide_post", client, poster, requests, warmup
+            )
+            # Deliver the warm-up submissions unmeasured, then time the rest.
+            for _ in range(warmup):
+                outbox.drain(batch_size=1)
+            report.routes["outbox_drain"] = _measure_drain(requests)
+    finally:
+        client.close()
+    return report
+
+
+def load_baseline(path: Path = BASELINE_PATH) -> dict[str, Any]:
+    try:
+        data: dict[str, Any] = json.loads(path.read_text())
+    except (OSError, ValueError):
+        return {}
+    return data
+
+
+def write_baseline(report: BenchmarkReport, path: Path = BASELINE_PATH) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(report.to_json(), indent=2, sort_keys=True) + "\n")
+
+
+def compare(
+    report: BenchmarkReport,
+    baseline: dict[str, Any],
+    threshold: float = 0.5,
+    slack_ms: float = 1.0,
+) -> list[Regression]:
+    """Routes whose p50 or p95 exceed the baseline by more than ``threshold``."""
+    regressions = []
+    known = baseline.get("routes", {})
+    for name, result in sorted(report.routes.items()):
+        if name not in known or not result.latencies:
+            continue
+        current = result.summary()
+        for metric in ("p50_ms", "p95_ms"):
+            limit = known[name][metric] * (1 + threshold) + slack_ms
+            if current[metric] > limit:
+                regressions.append(
+                    Regression(name, metric, known[name][metric], current[metric])
+                )
+    return regressions
+
+
+# --- cache backends (manage.py cache_benchmark) ------------------------------------
+
+CACHE_BACKENDS = {
+    "locmem": "django.core.cache.backends.locmem.LocMemCache",
+    "filebased": "django.core.cache.backends.filebased.FileBasedCache",
+    "sqlite": "sitecore.cache.SQLiteCache",
+}
+CACHE_OPERATIONS = ("set", "get", "get_miss", "incr")
+
+
+@dataclass
+class CacheResult:
+    backend: str
+    micros: dict[str, float] = field(default_factory=dict)  # operation -> us per call
+    expected: int = 0  # increments made by all processes together
+    counted: int = 0  # the counter's value afterwards, as this process sees it
+
+    @property
+    def shared(self) -> bool:
+        return self.counted > 0
+
+    @property
+    def lost(self) -> int:
+        return self.expected - self.counted if self.shared else 0
+
+
+def _make_cache(backend: str, directory: Path, max_entries: int) -> BaseCache:
+    location = {
+        "locmem": f"benchmark-{directory}",
+        "filebased": str(directory / "filebased"),
+        "sqlite": str(directory / "cache.sqlite3"),
+    }[backend]
+    cls = import_string(CACHE_BACKENDS[backend])
+    return cls(location, {"OPTIONS": {"MAX_ENTRIES": max_entries}})
+
+
+def _time_each(operations: int, call: Callable[[int], object]) -> float:
+    started = time.perf_counter()
+    for i in range(operations):
+        call(i)
+    return (time.perf_counter() - started) / operations * 1e6
+
+
+def _increment_worker(
+    backend: str, directory: Path, increments: int, barrier: Any
+) -> None:
+    cache = _make_cache(backend, directory, 10_000)
+    barrier.wait()
+    for _ in range(increments):
+        with contextlib.suppress(ValueError):  # locmem: not this process's counter
+            cache.incr("shared-counter")
+    os._exit(0)
+
+
+def _time_operations(
+    cache: BaseCache, operations: int, value: bytes
+) -> dict[str, float]:
+    micros = {
+        "set": _time_each(operations, lambda i: cache.set(f"k{i}", value)),
+        "get": _time_each(operations, lambda i: cache.get(f"k{i}")),
+        "get_miss": _time_each(operations, lambda i: cache.get(f"missing{i}")),
+    }
+    cache.set("counter", 0)
+    micros["incr"] = _time_each(operations, lambda i: cache.incr("counter"))
+    return micros
+
+
+def _count_concurrent_increments(
+    backend: str, directory: Path, processes: int, increments: int
+) -> int:
+    ctx = multiprocessing.get_context("fork")
+    _make_cache(backend, directory, 10_000).set("shared-counter", 0)
+    barrier = ctx.Barrier(processes)
+    workers = [
+        ctx.Process(
+            target=_increment_worker, args=(backend, directory, increments, barrier)
+        )
+        for _ in range(processes)
+    ]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    # A fresh instance: locmem only sees this process's 0, so it reports as unshared.
+    return int(_make_cache(backend, directory, 10_000).get("shared-counter", 0))
+
+
+def run_cache_benchmarks(
+    operations: int = 2000,
+    value_bytes: int = 1024,
+    processes: int = 4,
+    increments: int = 200,
+    backends: list[str] | None = None,
+) -> list[CacheResult]:
+    value = os.urandom(value_bytes)
+    results = []
+    for backend in backends or list(CACHE_BACKENDS):
+        with tempfile.TemporaryDirectory() as tmp:
+            directory = Path(tmp)
+            # Room for every key, so no backend pays for culling while it is timed.
+            cache = _make_cache(backend, directory, operations * 4)
+            results.append(
+                CacheResult(
+                    backend,
+                    micros=_time_operations(cache, operations, value),
+                    expected=processes * increments,
+                    counted=_count_concurrent_increments(
+                        backend, directory, processes, increments
+                    ),
+                )
+            )
+    return results
+
+
+# --- response compression (manage.py compression_benchmark) -------------------------
+
+# (encoding, level): gzip's fastest/default/best, brotli's fast/default/best.
+COMPRESSION_VARIANTS = [
+    ("gzip", 1),
+    ("gzip", 6),
+    ("gzip", 9),
+    ("br", 4),
+    ("br", 5),
+    ("br", 11),
+]
+
+
+@dataclass
+class CompressionResult:
+    route: str
+    encoding: str
+    level: int
+    bytes: int
+    compressed_bytes: int
+    micros: float  # per compression
+    memoized_micros: float  # per response once memoized
+
+    @property
+    def saved(self) -> float:
+        return 1 - self.compressed_bytes / self.bytes
+
+
+def run_compression_benchmarks(
+    rounds: int = 50, routes: list[str] | None = None
+) -> list[CompressionResult]:
+    from .compression import available_encodings, compress, compressed_body
+    from .critical_css import html_routes, render_route
+
+    variants = [v for v in COMPRESSION_VARIANTS if v[0] in available_encodings()]
+    results = []
+    for route in routes or html_routes():
+        content = render_route(route).encode()
+        for encoding, level in variants:
+            compressed = compress(content, encoding, level)
+            started = time.perf_counter()
+            for _ in range(rounds):
+                compress(content, encoding, level)
+            micros = (time.perf_counter() - started) / rounds * 1e6
+            compressed_body(content, encoding)
+            started = time.perf_counter()
+            for _ in range(rounds):
+                compressed_body(content, encoding)
+            results.append(
+                CompressionResult(
+                    route,
+                    encoding,
+                    level,
+                    len(content),
+                    len(compressed),
+                    micros,
+                    (time.perf_counter() - started) / rounds * 1e6,
+                )
+            )
+    return results
@@ -0,0 +1,250 @@
+"""Build-time CSS/JS bundling and minification.
+
+``BUNDLES`` maps a public asset name to the static source files it is built from. The
+build concatenates and minifies each bundle into ``ASSET_BUILD_DIR`` and records the
+output path in ``ASSET_BUILD_DIR/bundles.json``; ``collectstatic`` then gives the output a
+content-hashed name like any other static file. The ``{% stylesheet %}`` and
+``{% script %}`` tags in ``sitecore.templatetags.assets`` link the built file when there
+is one and fall back to the individual sources otherwise (e.g. before the first build).
+
+The minifiers are deliberately conservative and dependency-free: comments and
+redundant whitespace go, everything else (including JavaScript line breaks, so
+automatic semicolon insertion is unaffected) stays as written.
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import re
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+from django.conf import settings
+from django.templatetags.static import static
+
+BUNDLES: dict[str, list[str]] = {
+    "css/site.css": ["css/site.css"],
+    # Not linked by any template; built on its own so it can't override the theme toggle.
+    "css/site.light.css": ["css/site.light.css"],
+    "js/site.js": ["js/theme.js", "js/messages.js"],
+    # Linked by {% embed %}, so only pages with a third-party embed load it.
+    "js/embeds.js": ["js/embeds.js"],
+}
+MANIFEST_NAME = "bundles.json"
+
+_CSS_COMMENT_RE = re.compile(r"/\*.*?\*/", re.S)
+_CSS_STRING_RE = re.compile(r"""("(?:[^"\\]|\\.)*"|'(?:[^'\\]|\\.)*')""")
+# Whitespace around punctuation that never needs it. "+", "-" and "~" are left alone
+# (calc() requires the spaces around + and -), as is ":" (".a :hover" != ".a:hover").
+_CSS_PUNCT_RE = re.compile(r"\s*([{};,>])\s*")
+_JS_REGEX_PRECEDERS = set("(,=:[!&|?{};+-*%<>~^") | {""}
+
+
+def minify_css(css: str) -> str:
+    css = _CSS_COMMENT_RE.sub("", css)
+    out = []
+    # Odd-numbered parts are string literals, which are copied verbatim.
+    for i, part in enumerate(_CSS_STRING_RE.split(css)):
+        if i % 2:
+            out.append(part)
+            continue
+        part = " ".join(part.split())
+        part = _CSS_PUNCT_RE.sub(r"\1", part)
+        part = re.sub(r":\s+", ":", part)
+        out.append(part.replace(";}", "}"))
+    return "".join(out).strip()
+
+
+def minify_js(js: str) -> str:
+    """Strip comments and indentation; keep every newline that separates code."""
+    out: list[str] = []
+    i, n = 0, len(js)
+    last = ""  # last significant character emitted, to tell a regex from a division
+
+    def space(newline: bool) -> None:
+        # Runs of whitespace (and removed comments) become one space or one newline.
+        if not out:
+            return
+        if out[-1] in (" ", "\n"):
+            if newline:
+                out[-1] = "\n"
+        else:
+            out.append("\n" if newline else " ")
+
+    while i < n:
+        ch = js[i]
+        nxt = js[i + 1] if i + 1 < n else ""
+        if ch.isspace():
+            end = i
+            while end < n and js[end].isspace():
+                end += 1
+            space("\n" in js[i:end])
+            i = end
+        elif ch in "\"'`":
+            end = i + 1
+            while end < n and js[end] != ch:
+                end += 2 if js[end] == "\\" else 1
+            out.append(js[i : end + 1])
+            i, last = end + 1, ch
+        elif ch == "/" and nxt == "/":
+            while i < n and js[i] != "\n":
+                i += 1
+        elif ch == "/" and nxt == "*":
+            end = js.find("*/", i + 2)
+            space("\n" in js[i:end])
+            i = n if end < 0 else end + 2
+        elif ch == "/" and last in _JS_REGEX_PRECEDERS:
+            end, in_class = i + 1, False
+            while end < n and (js[end] != "/" or in_class):
+                if js[end] == "\\":
+                    end += 1
+                elif js[end] == "[":
+                    in_class = True
+                elif js[end] == "]":
+                    in_class = False
+                end += 1
+            out.append(js[i : end + 1])
+            i, last = end + 1, "/"
+        else:
+            out.append(ch)
+            last = ch
+            i += 1
+    return "".join(out).strip()
+
+
+MINIFIERS = {".css": minify_css, ".js": minify_js}
+
+
+@dataclass
+class BundleResult:
+    name: str
+    output: str
+    source_bytes: int
+    bytes: int
+    gzip_bytes: int
+
+
+@dataclass
+class BundleBuildResult:
+    bundles: list[BundleResult] = field(default_factory=list)
+
+    @property
+    def source_bytes(self) -> int:
+        return sum(b.source_bytes for b in self.bundles)
+
+    @property
+    def bytes(self) -> int:
+        return sum(b.bytes for b in self.bundles)
+
+
+def manifest_path() -> Path:
+    return Path(settings.ASSET_BUILD_DIR) / MANIFEST_NAME
+
+
+def load_manifest() -> dict[str, Any]:
+    try:
+        data: dict[str, Any] = json.loads(manifest_path().read_text())
+    except (OSError, ValueError):
+        return {}
+    return data
+
+
+def files_for(name: str, manifest: dict[str, Any]) -> list[str]:
+    """Static paths to link for asset ``name``: its built bundle, else its sources."""
+    entry = manifest.get(name)
+    if entry is not None:
+        return [entry["output"]]
+    return list(BUNDLES.get(name, [name]))
+
+
+def _source_root() -> Path:
+    return Path(settings.STATICFILES_DIRS[0])
+
+
+def build_bundles() -> BundleBuildResult:
+    """Concatenate and minify every bundle and write the manifest."""
+    root = _source_root()
+    build_dir = Path(settings.ASSET_BUILD_DIR)
+    result = BundleBuildResult()
+    manifest: dict[str, dict[str, object]] = {}
+    for name, sources in BUNDLES.items():
+        minify = MINIFIERS[Path(name).suffix]
+        texts = [(root / source).read_text(encoding="utf-8") for source in sources]
+        # JS files are joined with ";" so a missing trailing semicolon can't merge them.
+        joiner = ";\n" if name.endswith(".js") else "\n"
+        data = (minify(joiner.join(texts)) + "\n").encode()
+        target = build_dir / name
+        target.parent.mkdir(parents=True, exist_ok=True)
+        if not target.exists() or target.read_bytes() != data:
+            tmp = target.with_name(target.name + ".tmp")
+            tmp.write_bytes(data)
+            os.replace(tmp, target)
+        output = target.relative_to(root).as_posix()
+        manifest[name] = {
+            "output": output,
+            "sources": sources,
+            "sha256": hashlib.sha256(data).hexdigest()[:16],
+        }
+        result.bundles.append(
+            BundleResult(
+                name=name,
+                output=output,
+                source_bytes=sum(len(t.encode()) for t in texts),
+                bytes=len(data),
+                gzip_bytes=len(gzip.compress(data, mtime=0)),
+            )
+        )
+    manifest_path().write_text(json.dumps(manifest, indent=2, sort_keys=True))
+    return result
+
+
+@dataclass
+class PageSizes:
+    route: str
+    html_before: int
+    html_after: int
+    assets_before: int
+    assets_after: int
+
+
+_LINKED_ASSET_RE = re.compile(r"""<(?:script|link)\b[^>]*?(?:src|href)="([^"]+)\"""")
+
+
+def page_report() -> list[PageSizes]:
+    """Bytes per page before and after bundling.
+
+    "Before" is the page with the JS sources inlined (as base.html used to ship them)
+    plus the unminified CSS sources; "after" is the rendered page plus the built files
+    it links, which browsers cache across pages.
+    """
+    from .critical_css import html_routes, render_route  # renders pages via urls
+
+    root = _source_root()
+    manifest = load_manifest()
+    by_url = {}
+    for name, entry in manifest.items():
+        output = static(entry["output"]).split("?", 1)[0]
+        sources = sum((root / s).stat().st_size for s in entry["sources"])
+        by_url[output] = (name, sources, (root / entry["output"]).stat().st_size)
+    report = []
+    for route in html_routes():
+        html = render_route(route).encode()
+        inlined = assets_before = assets_after = 0
+        for url in set(_LINKED_ASSET_RE.findall(html.decode())):
+            found = by_url.get(url.split("?", 1)[0])
+            if found is None:
+                continue
+            name, source_bytes, built_bytes = found
+            if name.endswith(".js"):
+                inlined += source_bytes
+            else:
+                assets_before += source_bytes
+            assets_after += built_bytes
+        report.append(
+            PageSizes(
+                route, len(html) + inlined, len(html), assets_before, assets_after
+            )
+        )
+    return report
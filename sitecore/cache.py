@@ -0,0 +1,293 @@
+"""Cache backend shared by every worker process on the host.
+
+Django's locmem cache is per process, so each Passenger worker starts cold and keeps
+its own copy; ``FileBasedCache`` is shared but writes one file per key, culls by
+listing the directory and increments with an unlocked read-modify-write. There is no
+Redis or memcached on the shared hosting plan, so ``SQLiteCache`` keeps entries in
+one SQLite file (``CACHES["default"]["LOCATION"]``) in WAL mode:
+
+* Reads never block writers or each other. A hit is one indexed ``SELECT``.
+* Every write is a single statement (``INSERT ... ON CONFLICT DO UPDATE``), so
+  concurrent writers from any number of processes serialize on SQLite's lock and
+  none is lost. ``add`` and ``incr`` are atomic too: integers are stored as SQLite
+  integers and incremented in place with ``UPDATE ... RETURNING``.
+* Entries expire by TTL and are evicted least-recently-used. Recency is updated at
+  most every ``TOUCH_INTERVAL`` seconds per entry so hot reads stay read-only, and
+  the size is checked every ``CULL_EVERY`` writes per process rather than on each
+  one, so the cache can briefly exceed ``MAX_ENTRIES``.
+
+Values are pickled, like Django's other backends. ``manage.py cache_benchmark``
+compares it with locmem and ``FileBasedCache``.
+"""
+
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from collections.abc import Iterable, Iterator
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any
+
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entry (
+    key TEXT PRIMARY KEY,
+    value BLOB NOT NULL,
+    expires REAL,
+    used REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entry_used ON entry (used);
+"""
+
+_LIVE = "(expires IS NULL OR expires > :now)"
+
+_SET = """
+INSERT INTO entry (key, value, expires, used) VALUES (:key, :value, :expires, :now)
+ON CONFLICT(key) DO UPDATE SET
+    value = excluded.value, expires = excluded.expires, used = excluded.used
+"""
+
+# Seconds between recency updates for an entry that keeps being read.
+TOUCH_INTERVAL = 30
+
+_INT64 = range(-(2**63), 2**63)
+
+
+def _encode(value: Any) -> Any:
+    # Plain ints are stored natively so incr() can run in SQL; bool is not a plain int.
+    if type(value) is int and value in _INT64:
+        return value
+    return pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+
+
+def _decode(stored: Any) -> Any:
+    return stored if isinstance(stored, int) else pickle.loads(stored)
+
+
+class SQLiteCache(BaseCache):
+    def __init__(self, location: str, params: dict[str, Any]) -> None:
+        super().__init__(params)
+        options = params.get("OPTIONS", {})
+        self.path = Path(location)
+        self.busy_timeout = float(options.get("BUSY_TIMEOUT", 1.0))
+        self.cull_every = max(int(options.get("CULL_EVERY", 64)), 1)
+        self._local = threading.local()
+        self._writes = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        conn: sqlite3.Connection | None = getattr(self._local, "conn", None)
+        # Connections must not cross a fork; reopen in the child.
+        if conn is None or getattr(self._local, "pid", None) != os.getpid():
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(
+                self.path, timeout=self.busy_timeout, isolation_level=None
+            )
+            conn.execute("PRAGMA journal_mode=WAL")
+            # A cache may lose its last writes in a power cut, but never its integrity.
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA mmap_size=67108864")
+            conn.executescript(_SCHEMA)
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    @contextmanager
+    def _write_lock(self) -> Iterator[sqlite3.Connection]:
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    def _expires(self, timeout: float | None | object) -> float | None:
+        return self.get_backend_timeout(timeout)  # type: ignore[no-any-return]
+
+    def _wrote(self, conn: sqlite3.Connection, now: float, count: int = 1) -> None:
+        self._writes += count
+        if self._writes >= self.cull_every:
+            self._writes = 0
+            self._cull(conn, now)
+
+    def _cull(self, conn: sqlite3.Connection, now: float) -> None:
+        conn.execute(
+            "DELETE FROM entry WHERE expires IS NOT NULL AND expires <= ?", (now,)
+        )
+        (count,) = conn.execute("SELECT COUNT(*) FROM entry").fetchone()
+        if count <= self._max_entries:
+            return
+        if self._cull_frequency == 0:
+            conn.execute("DELETE FROM entry")
+            return
+        conn.execute(
+            "DELETE FROM entry WHERE key IN "
+            "(SELECT key FROM entry ORDER BY used LIMIT ?)",
+            (max(count // self._cull_frequency, count - self._max_entries),),
+        )
+
+    def get(self, key: str, default: Any = None, version: int | None = None) -> Any:
+        key = self.make_and_validate_key(key, version=version)
+        now = time.time()
+        conn = self._connect()
+        row = conn.execute(
+            f"SELECT value, used FROM entry WHERE key = :key AND {_LIVE}",
+            {"key": key, "now": now},
+        ).fetchone()
+        if row is None:
+            return default
+        if row[1] < now - TOUCH_INTERVAL:
+            conn.execute("UPDATE entry SET used = ? WHERE key = ?", (now, key))
+        return _decode(row[0])
+
+    def get_many(
+        self, keys: Iterable[str], version: int | None = None
+    ) -> dict[str, Any]:
+        by_key = {self.make_and_validate_key(k, version=version): k for k in keys}
+        if not by_key:
+            return {}
+        params: dict[str, Any] = {f"k{i}": k for i, k in enumerate(by_key)}
+        placeholders = ", ".join(f":{name}" for name in params)
+        params["now"] = time.time()
+        rows = self._connect().execute(
+            f"SELECT key, value FROM entry WHERE key IN ({placeholders}) AND {_LIVE}",
+            params,
+        )
+        return {by_key[key]: _decode(value) for key, value in rows}
+
+    def has_key(self, key: str, version: int | None = None) -> bool:
+        key = self.make_and_validate_key(key, version=version)
+        row = (
+            self._connect()
+            .execute(
+                f"SELECT 1 FROM entry WHERE key = :key AND {_LIVE}",
+                {"key": key, "now": time.time()},
+            )
+            .fetchone()
+        )
+        return row is not None
+
+    def set(
+        self,
+        key: str,
+        value: Any,
+        timeout: float | None | object = DEFAULT_TIMEOUT,
+        version: int | None = None,
+    ) -> None:
+        key = self.make_and_validate_key(key, version=version)
+        now = time.time()
+        conn = self._connect()
+        conn.execute(
+            _SET,
+            {
+                "key": key,
+                "value": _encode(value),
+                "expires": self._expires(timeout),
+                "now": now,
+            },
+        )
+        self._wrote(conn, now)
+
+    def set_many(
+        self,
+        data: dict[str, Any],
+        timeout: float | None | object = DEFAULT_TIMEOUT,
+        version: int | None = None,
+    ) -> list[str]:
+        now = time.time()
+        expires = self._expires(timeout)
+        rows = [
+            {
+                "key": self.make_and_validate_key(key, version=version),
+                "value": _encode(value),
+                "expires": expires,
+                "now": now,
+            }
+            for key, value in data.items()
+        ]
+        with self._write_lock() as conn:
+            conn.executemany(_SET, rows)
+        self._wrote(conn, now, len(rows))
+        return []
+
+    def add(
+        self,
+        key: str,
+        value: Any,
+        timeout: float | None | object = DEFAULT_TIMEOUT,
+        version: int | None = None,
+    ) -> bool:
+        key = self.make_and_validate_key(key, version=version)
+        now = time.time()
+        conn = self._connect()
+        # Insert, or take over an expired entry; a live one is left alone.
+        cur = conn.execute(
+            _SET + "WHERE entry.expires IS NOT NULL AND entry.expires <= :now",
+            {
+                "key": key,
+                "value": _encode(value),
+                "expires": self._expires(timeout),
+                "now": now,
+            },
+        )
+        self._wrote(conn, now)
+        return bool(cur.rowcount == 1)
+
+    def touch(
+        self,
+        key: str,
+        timeout: float | None | object = DEFAULT_TIMEOUT,
+        version: int | None = None,
+    ) -> bool:
+        key = self.make_and_validate_key(key, version=version)
+        cur = self._connect().execute(
+            f"UPDATE entry SET expires = :expires WHERE key = :key AND {_LIVE}",
+            {"key": key, "expires": self._expires(timeout), "now": time.time()},
+        )
+        return bool(cur.rowcount == 1)
+
+    def incr(self, key: str, delta: int = 1, version: int | None = None) -> Any:
+        key = self.make_and_validate_key(key, version=version)
+        now = time.time()
+        conn = self._connect()
+        row = conn.execute(
+            "UPDATE entry SET value = value + :delta "
+            f"WHERE key = :key AND typeof(value) = 'integer' AND {_LIVE} "
+            "RETURNING value",
+            {"key": key, "delta": delta, "now": now},
+        ).fetchone()
+        if row is not None:
+            return row[0]
+        # Missing, or not a native integer (e.g. a pickled float): read-modify-write
+        # under the write lock, which is still atomic across processes.
+        with self._write_lock() as conn:
+            row = conn.execute(
+                f"SELECT value FROM entry WHERE key = :key AND {_LIVE}",
+                {"key": key, "now": now},
+            ).fetchone()
+            if row is None:
+                raise ValueError(f"Key '{key}' not found")
+            value = _decode(row[0]) + delta
+            conn.execute(
+                "UPDATE entry SET value = ? WHERE key = ?", (_encode(value), key)
+            )
+        return value
+
+    def delete(self, key: str, version: int | None = None) -> bool:
+        key = self.make_and_validate_key(key, version=version)
+        cur = self._connect().execute("DELETE FROM entry WHERE key = ?", (key,))
+        return bool(cur.rowcount == 1)
+
+    def delete_many(self, keys: Iterable[str], version: int | None = None) -> None:
+        rows = [(self.make_and_validate_key(k, version=version),) for k in keys]
+        with self._write_lock() as conn:
+            conn.executemany("DELETE FROM entry WHERE key = ?", rows)
+
+    def clear(self) -> None:
+        self._connect().execute("DELETE FROM entry")
+
+    # close() (called after every request) keeps the connection; it is reused.
@@ -0,0 +1,186 @@
+"""Circuit breaker whose state is shared by every worker process on the host.
+
+State is kept in a tiny SQLite file (one row per breaker), so once one Passenger
+worker has seen the upstream fail, all of them fail fast. While the breaker is
+open each process also remembers the reopen time in memory, so rejected calls
+cost a float comparison and no I/O at all.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+CLOSED = "closed"
+OPEN = "open"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS breaker (
+    name TEXT PRIMARY KEY,
+    failures INTEGER NOT NULL DEFAULT 0,
+    open_until REAL NOT NULL DEFAULT 0,
+    probe_until REAL NOT NULL DEFAULT 0
+)
+"""
+
+
+@dataclass(frozen=True)
+class BreakerState:
+    failures: int = 0
+    open_until: float = 0.0
+    probe_until: float = 0.0
+
+    def state(self, now: float) -> str:
+        return OPEN if self.open_until > now else CLOSED
+
+
+class BreakerStore:
+    """SQLite-backed breaker rows, safe for concurrent processes and threads."""
+
+    def __init__(self, path: str | os.PathLike[str], busy_timeout: float = 0.5) -> None:
+        self.path = Path(path)
+        self.busy_timeout = busy_timeout
+        self._local = threading.local()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn: sqlite3.Connection | None = getattr(self._local, "conn", None)
+        # Connections must not cross a fork; reopen in the child.
+        if conn is None or getattr(self._local, "pid", None) != os.getpid():
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(
+                self.path, timeout=self.busy_timeout, isolation_level=None
+            )
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(_SCHEMA)
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def load(self, name: str) -> BreakerState:
+        row = (
+            self._connect()
+            .execute(
+                "SELECT failures, open_until, probe_until FROM breaker WHERE name = ?",
+                (name,),
+            )
+            .fetchone()
+        )
+        return BreakerState(*row) if row else BreakerState()
+
+    def claim_probe(self, name: str, now: float, probe_timeout: float) -> bool:
+        """Let exactly one caller through to test an open breaker whose cooldown expired."""
+        cur = self._connect().execute(
+            "UPDATE breaker SET probe_until = ? "
+            "WHERE name = ? AND open_until <= ? AND probe_until <= ?",
+            (now + probe_timeout, name, now, now),
+        )
+        return cur.rowcount == 1
+
+    def record_success(self, name: str) -> None:
+        self._connect().execute(
+            "UPDATE breaker SET failures = 0, open_until = 0, probe_until = 0 WHERE name = ?",
+            (name,),
+        )
+
+    def record_failure(
+        self, name: str, threshold: int, reset_timeout: float
+    ) -> BreakerState:
+        now = time.time()
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                "SELECT failures, open_until, probe_until FROM breaker WHERE name = ?",
+                (name,),
+            ).fetchone()
+            current = BreakerState(*row) if row else BreakerState()
+            failures = current.failures + 1
+            # A failed probe (failures already past the threshold) reopens immediately.
+            open_until = (
+                now + reset_timeout if failures >= threshold else current.open_until
+            )
+            conn.execute(
+                "INSERT INTO breaker (name, failures, open_until, probe_until) "
+                "VALUES (?, ?, ?, 0) ON CONFLICT(name) DO UPDATE SET "
+                "failures = excluded.failures, open_until = excluded.open_until, "
+                "probe_until = 0",
+                (name, failures, open_until),
+            )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return BreakerState(failures, open_until, 0.0)
+
+
+class CircuitBreaker:
+    """Classic closed -> open -> half-open breaker on top of a shared BreakerStore."""
+
+    def __init__(
+        self,
+        name: str,
+        store: BreakerStore,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+        probe_timeout: float = 15.0,
+    ) -> None:
+        self.name = name
+        self.store = store
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.probe_timeout = probe_timeout
+        self._open_until = 0.0
+        self._dirty = True
+
+    @property
+    def retry_after(self) -> float:
+        """Seconds until this process will next consider calling the upstream."""
+        return max(self._open_until - time.time(), 0.0)
+
+    def allow(self) -> bool:
+        now = time.time()
+        if self._open_until > now:
+            return False
+        try:
+            state = self.store.load(self.name)
+        except sqlite3.Error:
+            # A broken state file must never take the integration down with it.
+            return True
+        if state.failures < self.failure_threshold:
+            self._dirty = state.failures > 0
+            return True
+        if state.open_until > now:
+            self._open_until = state.open_until
+            return False
+        # Cooldown elapsed: half-open, one probe at a time across all processes.
+        try:
+            allowed = self.store.claim_probe(self.name, now, self.probe_timeout)
+        except sqlite3.Error:
+            return True
+        if not allowed:
+            self._open_until = now + min(self.probe_timeout, self.reset_timeout)
+        self._dirty = True
+        return allowed
+
+    def record_success(self) -> None:
+        self._open_until = 0.0
+        if not self._dirty:
+            return
+        try:
+            self.store.record_success(self.name)
+            self._dirty = False
+        except sqlite3.Error:
+            pass
+
+    def record_failure(self) -> None:
+        try:
+            state = self.store.record_failure(
+                self.name, self.failure_threshold, self.reset_timeout
+            )
+        except sqlite3.Error:
+            return
+        self._dirty = True
+        self._open_until = state.open_until
@@ -0,0 +1,216 @@
+"""Brotli/gzip compression for responses rendered by the views.
+
+WhiteNoise serves static files precompressed, but pages come out of Django as plain
+text. ``CompressionMiddleware`` picks ``br`` (when the optional ``brotli`` package is
+installed) or ``gzip`` from ``Accept-Encoding`` and compresses text bodies of at least
+``COMPRESSION_MIN_BYTES``. Streaming responses, bodies that already have a
+``Content-Encoding`` and non-text types are left alone.
+
+Most of the site is a handful of public pages whose bytes only change on deploy, so the
+compressed bytes are memoized by a hash of the body and the encoding, in an LRU bounded
+by entries and bytes: a popular page is compressed once per worker, and each later
+request only pays for hashing it. ``private``/``no-store`` responses (forms, thanks
+pages) are compressed per request and never memoized, since their bodies differ per
+visitor; their CSRF tokens are masked per response, which blunts BREACH-style attacks.
+
+A strong ``ETag`` becomes weak on a compressed response, as with Django's
+``GZipMiddleware``; ``If-None-Match`` is compared weakly, so revalidation still gets a
+304. That 304 has no body to go by, but a 304 must carry the ``Vary`` and ``ETag`` of
+the 200 it stands for: on ``cache_policy`` content pages, which are always compressed
+when an encoding is negotiated, it gets the same ``Vary`` and weakened ``ETag``.
+``manage.py compression_benchmark`` shows the CPU time against bytes saved per
+page.
+"""
+
+import gzip
+import hashlib
+import re
+import threading
+from collections import OrderedDict
+from collections.abc import Callable
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.http import HttpRequest, HttpResponse
+from django.utils.cache import patch_vary_headers
+
+try:
+    import brotli
+except ImportError:  # optional dependency
+    brotli = None
+
+_COMPRESSIBLE_RE = re.compile(
+    r"^(text/|application/(json|javascript|xml|xhtml\+xml|manifest\+json)|image/svg\+xml)"
+)
+
+
+def available_encodings() -> tuple[str, ...]:
+    """Encodings this process can produce, in order of preference."""
+    return ("br", "gzip") if brotli is not None else ("gzip",)
+
+
+def negotiate(accept_encoding: str) -> str | None:
+    """The preferred encoding the client accepts (``q`` > 0), or None."""
+    accepted: dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        coding, _, params = part.strip().partition(";")
+        q = 1.0
+        name, _, value = params.strip().partition("=")
+        if name.strip() == "q":
+            try:
+                q = float(value)
+            except ValueError:
+                q = 0.0
+        if coding:
+            accepted[coding.strip().lower()] = q
+    for encoding in available_encodings():
+        if accepted.get(encoding, accepted.get("*", 0.0)) > 0:
+            return encoding
+    return None
+
+
+def compress(content: bytes, encoding: str, level: int | None = None) -> bytes:
+    """``level`` defaults to COMPRESSION_BROTLI_QUALITY / COMPRESSION_GZIP_LEVEL."""
+    if encoding == "br":
+        quality = settings.COMPRESSION_BROTLI_QUALITY if level is None else level
+        return bytes(brotli.compress(content, mode=brotli.MODE_TEXT, quality=quality))
+    if level is None:
+        level = settings.COMPRESSION_GZIP_LEVEL
+    return gzip.compress(content, compresslevel=level, mtime=0)
+
+
+class CompressedCache:
+    """Thread-safe LRU of compressed bodies bounded by entry count and total bytes."""
+
+    def __init__(
+        self, max_entries: int = 256, max_bytes: int = 4 * 1024 * 1024
+    ) -> None:
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[tuple[bytes, str], bytes] = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: tuple[bytes, str]) -> bytes | None:
+        with self._lock:
+            body = self._entries.get(key)
+            if body is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return body
+
+    def set(self, key: tuple[bytes, str], body: bytes) -> None:
+        if len(body) > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= len(old)
+            self._entries[key] = body
+            self._bytes += len(body)
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= len(evicted)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            self.hits = self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+compressed_cache = CompressedCache(
+    max_entries=getattr(settings, "COMPRESSION_CACHE_ENTRIES", 256),
+    max_bytes=getattr(settings, "COMPRESSION_CACHE_BYTES", 4 * 1024 * 1024),
+)
+
+
+def _memoizable(response: HttpResponse) -> bool:
+    cache_control = response.get("Cache-Control", "")
+    return "private" not in cache_control and "no-store" not in cache_control
+
+
+def compressed_body(content: bytes, encoding: str, memoize: bool = True) -> bytes:
+    """``compress``, through ``compressed_cache`` when ``memoize``."""
+    if not memoize:
+        return compress(content, encoding)
+    key = (hashlib.blake2b(content, digest_size=16).digest(), encoding)
+    body = compressed_cache.get(key)
+    if body is None:
+        body = compress(content, encoding)
+        compressed_cache.set(key, body)
+    return body
+
+
+def _weaken_etag(response: HttpResponse) -> None:
+    etag = response.get("ETag")
+    if etag and etag.startswith('"'):
+        response["ETag"] = "W/" + etag
+
+
+def _validated_page(request: HttpRequest) -> bool:
+    """Whether the request went to a content page with a template-based cache policy."""
+    view = getattr(request.resolver_match, "func", None)
+    policy = getattr(view, "cache_policy", None)
+    return policy is not None and policy.validated
+
+
+def compress_response(request: HttpRequest, response: HttpResponse) -> HttpResponse:
+    if response.status_code == 304:
+        if _validated_page(request):
+            patch_vary_headers(response, ("Accept-Encoding",))
+            if negotiate(request.headers.get("Accept-Encoding", "")) is not None:
+                _weaken_etag(response)
+        return response
+    if (
+        response.streaming
+        or response.has_header("Content-Encoding")
+        or len(response.content) < settings.COMPRESSION_MIN_BYTES
+        or not _COMPRESSIBLE_RE.match(response.get("Content-Type", ""))
+    ):
+        return response
+    patch_vary_headers(response, ("Accept-Encoding",))
+    encoding = negotiate(request.headers.get("Accept-Encoding", ""))
+    if encoding is None:
+        return response
+    body = compressed_body(response.content, encoding, _memoizable(response))
+    if len(body) >= len(response.content):
+        return response
+    response.content = body
+    response["Content-Length"] = str(len(body))
+    response["Content-Encoding"] = encoding
+    _weaken_etag(response)
+    return response
+
+
+class CompressionMiddleware:
+    """Compress text responses; see the module docstring."""
+
+    async_capable = True
+    sync_capable = True
+
+    def __init__(self, get_response: Callable[[HttpRequest], HttpResponse]):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request: HttpRequest) -> HttpResponse:
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        response = self.get_response(request)
+        if not settings.COMPRESSION_ENABLED:
+            return response
+        return compress_response(request, response)
+
+    async def __acall__(self, request: HttpRequest) -> HttpResponse:
+        response = await self.get_response(request)
+        if not settings.COMPRESSION_ENABLED:
+            return response
+        return compress_response(request, response)
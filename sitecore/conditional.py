@@ -0,0 +1,217 @@
+"""Per-route HTTP caching policy and conditional GET (ETag / Last-Modified / 304).
+
+Routes declare their policy in ``sitecore/urls.py`` by wrapping the view with
+:func:`cache_policy`. For content routes the validators are derived *without
+rendering*: a strong ETag hashes the source of the template and every template it
+extends or includes, the settings the view reads, the ``branding`` context, the static
+manifest and the code version. Last-Modified is the newest mtime among the files those
+inputs come from: the templates, the static manifest, and the Python sources and
+``.env`` file behind the settings and code. It is the same in every worker and across
+restarts, and moves forward whenever a setting, asset or code change ships, so a client
+revalidating with ``If-Modified-Since`` alone never keeps a page built from older
+inputs. (Settings set only in the process environment have no file; a change to them
+comes with a restart after which only the ETag differs.) A matching ``If-None-Match`` /
+``If-Modified-Since`` is answered with 304 before the view runs.
+"""
+
+import contextlib
+import hashlib
+import os
+import threading
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.http import HttpRequest, HttpResponse
+from django.template import engines
+from django.template.base import Template
+from django.template.loader_tags import ExtendsNode, IncludeNode
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+
+from .context_processors import branding
+from .pagecache import (
+    code_fingerprint,
+    code_modified,
+    has_pending_messages,
+    template_fingerprint,
+)
+from .storage import manifest_fingerprint, manifest_modified
+
+
+@dataclass(frozen=True)
+class CachePolicy:
+    template: str | None = None
+    settings: tuple[str, ...] = ()
+    max_age: int = 0
+    public: bool = False
+    no_store: bool = False
+    # Reads no session, user, CSRF token or flash message (see StatelessPageMiddleware).
+    stateless: bool = False
+
+    @property
+    def validated(self) -> bool:
+        return self.template is not None and not self.no_store
+
+
+@dataclass(frozen=True)
+class Validators:
+    etag: str
+    last_modified: float
+
+
+def template_dependencies(name: str) -> list[Template]:
+    """The named template plus every template it statically extends or includes."""
+    engine = engines["django"].engine
+    seen: dict[str, Template] = {}
+    pending = [name]
+    while pending:
+        current = pending.pop()
+        if current in seen:
+            continue
+        template = engine.get_template(current)
+        seen[current] = template
+        nodes = template.nodelist.get_nodes_by_type(ExtendsNode)
+        for node in nodes:
+            if isinstance(node.parent_name.var, str):
+                pending.append(node.parent_name.var)
+        for node in template.nodelist.get_nodes_by_type(IncludeNode):
+            if isinstance(node.template.var, str):
+                pending.append(node.template.var)
+    return list(seen.values())
+
+
+_validator_cache: dict[tuple[str, ...], tuple[str, float]] = {}
+_validator_lock = threading.Lock()
+
+
+def _template_digest(name: str) -> tuple[str, float]:
+    """(sha256 of template sources, newest mtime), memoized until templates change."""
+    key = (name, template_fingerprint())
+    cached = _validator_cache.get(key)
+    if cached is not None:
+        return cached
+    digest = hashlib.sha256()
+    newest = 0.0
+    for template in template_dependencies(name):
+        digest.update(template.origin.name.encode())
+        digest.update(template.source.encode())
+        with contextlib.suppress(OSError):
+            newest = max(newest, int(os.stat(template.origin.name).st_mtime))
+    result = (digest.hexdigest(), newest)
+    with _validator_lock:
+        if len(_validator_cache) > 256:
+            _validator_cache.clear()
+        _validator_cache[key] = result
+    return result
+
+
+def compute_validators(policy: CachePolicy, request: HttpRequest) -> Validators:
+    assert policy.template is not None
+    source_digest, templates_modified = _template_digest(policy.template)
+    inputs = hashlib.sha256()
+    for name in policy.settings:
+        inputs.update(f"{name}={getattr(settings, name, '')!r};".encode())
+    # The page embeds hashed asset URLs, which change whenever an asset does.
+    inputs.update(f"static={manifest_fingerprint()};".encode())
+    inputs.update(f"code={code_fingerprint()};".encode())
+    for key, value in sorted(branding(request).items()):
+        inputs.update(f"{key}={value!r};".encode())
+    etag = hashlib.sha256(f"{source_digest};{inputs.hexdigest()}".encode()).hexdigest()
+    last_modified = max(templates_modified, manifest_modified(), code_modified())
+    return Validators(f'"{etag[:32]}"', last_modified)
+
+
+def _apply_headers(
+    response: HttpResponse, policy: CachePolicy, validators: Validators | None
+) -> None:
+    if policy.no_store:
+        patch_cache_control(response, no_store=True)
+        return
+    if validators is None:
+        patch_cache_control(response, private=True, no_cache=True)
+        return
+    response["ETag"] = validators.etag
+    if validators.last_modified:
+        response["Last-Modified"] = http_date(validators.last_modified)
+    if policy.public:
+        patch_cache_control(response, public=True, max_age=policy.max_age)
+    else:
+        patch_cache_control(response, private=True, max_age=policy.max_age)
+
+
+def cache_policy(
+    view: Callable[..., HttpResponse],
+    *,
+    template: str | None = None,
+    settings_keys: Iterable[str] = (),
+    max_age: int = 0,
+    public: bool = False,
+    no_store: bool = False,
+    stateless: bool = False,
+) -> Callable[..., HttpResponse]:
+    """Attach a cache policy to a view.
+
+    ``template``/``settings_keys`` name everything the rendered page depends on; without a
+    template the response is marked ``private, no-cache`` and never validated.
+    ``stateless`` views are served past the session, CSRF, auth and messages middleware.
+    """
+    policy = CachePolicy(
+        template, tuple(settings_keys), max_age, public, no_store, stateless
+    )
+
+    def check(request: HttpRequest) -> tuple[Validators | None, HttpResponse | None]:
+        if (
+            policy.validated
+            and request.method in ("GET", "HEAD")
+            and not has_pending_messages(request)
+        ):
+            validators = compute_validators(policy, request)
+            # Part of the page cache key (see pagecache.cache_page_response).
+            request.page_etag = validators.etag
+            not_modified = get_conditional_response(
+                request, etag=validators.etag, last_modified=validators.last_modified
+            )
+            if not_modified is not None:
+                _apply_headers(not_modified, policy, validators)
+            return validators, not_modified
+        return None, None
+
+    def finish(
+        request: HttpRequest, response: HttpResponse, validators: Validators | None
+    ) -> HttpResponse:
+        if (
+            response.status_code != 200
+            or response.cookies
+            or request.META.get("CSRF_COOKIE_NEEDS_UPDATE")
+        ):
+            validators = None
+        _apply_headers(response, policy, validators)
+        return response
+
+    if iscoroutinefunction(view):
+
+        @wraps(view)
+        async def wrapped(
+            request: HttpRequest, *args: object, **kwargs: object
+        ) -> HttpResponse:
+            validators, not_modified = check(request)
+            if not_modified is not None:
+                return not_modified
+            return finish(request, await view(request, *args, **kwargs), validators)
+
+    else:
+
+        @wraps(view)
+        def wrapped(
+            request: HttpRequest, *args: object, **kwargs: object
+        ) -> HttpResponse:
+            validators, not_modified = check(request)
+            if not_modified is not None:
+                return not_modified
+            return finish(request, view(request, *args, **kwargs), validators)
+
+    wrapped.cache_policy = policy  # type: ignore[attr-defined]
+    return wrapped
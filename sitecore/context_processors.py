@@ -1,10 +1,10 @@
 from django.conf import settings
+from django.http import HttpRequest
 
 
-def branding(request):
+def branding(request: HttpRequest) -> dict[str, str]:
     """Expose branding-related values to all templates."""
     return {
         "logo_url": getattr(settings, "LOGO_URL", ""),
         "site_name": "Great Owl Marketing",
-        "STATIC_VERSION": getattr(settings, "STATIC_VERSION", "1"),
     }
@@ -0,0 +1,319 @@
+"""Build-time critical CSS extraction.
+
+Each route that links ``css/site.css`` is rendered once (as an anonymous visitor with
+a pending flash message, so the message markup is covered too) and the stylesheet is
+filtered down to the rules whose selectors match an element, class, id or attribute
+that actually occurs in the page. The subsets are written to
+``ASSET_BUILD_DIR/critical/<route>.css`` with an index keyed by the SHA-256 of the
+stylesheet and of the tags/classes/ids/attributes each template renders, so rebuilding
+only re-extracts pages whose CSS or template structure changed. The ``{% stylesheet %}``
+tag in ``sitecore.templatetags.assets`` inlines the subset and loads the full stylesheet
+without blocking first paint.
+
+Matching is deliberately conservative: pseudo-classes and pseudo-elements are ignored
+(``.btn:hover`` is kept whenever ``.btn`` is used), ``@font-face`` and ``@import`` are
+always kept, and attributes set by script (``data-theme``) count as present.
+"""
+
+import hashlib
+import json
+import os
+import re
+from dataclasses import dataclass, field
+from html.parser import HTMLParser
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.messages import constants as message_constants
+from django.contrib.messages.storage.base import Message
+from django.templatetags.static import static
+from django.test import RequestFactory
+from django.urls import URLPattern, resolve, reverse
+
+from . import bundles
+from . import urls as sitecore_urls
+from .conditional import CachePolicy
+from .pagecache import page_cache
+
+STYLESHEET = "css/site.css"
+INDEX_NAME = "critical.json"
+# Attributes the inline scripts set on the client, so never present in rendered HTML.
+RUNTIME_ATTRIBUTES = {"data-theme"}
+ALWAYS_KEEP_AT_RULES = {"@font-face", "@import", "@charset", "@property"}
+CONDITIONAL_AT_RULES = {"@media", "@supports", "@layer", "@container"}
+
+_UNRENDERED = {"head", "link", "meta", "noscript", "script", "style", "title"}
+
+_COMMENT_RE = re.compile(r"/\*.*?\*/", re.S)
+_PSEUDO_RE = re.compile(r"::?[a-zA-Z-]+(\((?:[^()]|\([^()]*\))*\))?")
+_COMBINATOR_RE = re.compile(r"\s*[>+~]\s*|\s+")
+_TAG_RE = re.compile(r"^[a-zA-Z][a-zA-Z0-9-]*")
+_KEYFRAMES_RE = re.compile(r"@(?:-webkit-)?keyframes\s+([\w-]+)")
+
+
+@dataclass
+class UsedSelectors:
+    tags: set[str] = field(default_factory=set)
+    classes: set[str] = field(default_factory=set)
+    ids: set[str] = field(default_factory=set)
+    attributes: set[str] = field(default_factory=set)
+    stylesheets: set[str] = field(default_factory=set)
+
+    def digest(self) -> str:
+        """Hash of everything a selector can match on; stable across CSRF tokens,
+        timestamps and copy edits, so only markup changes that matter re-extract."""
+        parts = [self.tags, self.classes, self.ids, self.attributes]
+        text = "\n".join(" ".join(sorted(p)) for p in parts)
+        return hashlib.sha256(text.encode()).hexdigest()[:16]
+
+
+class _SelectorCollector(HTMLParser):
+    def __init__(self) -> None:
+        super().__init__(convert_charrefs=True)
+        self.used = UsedSelectors()
+
+    def handle_starttag(self, tag: str, attrs: list[tuple[str, str | None]]) -> None:
+        values = dict(attrs)
+        if tag == "link" and values.get("href"):
+            self.used.stylesheets.add(values["href"] or "")
+        if tag in _UNRENDERED:
+            # Never styled, and skipping them keeps the digest independent of how the
+            # stylesheet itself is linked (blocking vs. preload + <noscript>).
+            return
+        self.used.tags.add(tag)
+        for name, value in attrs:
+            self.used.attributes.add(name)
+            if name == "class" and value:
+                self.used.classes.update(value.split())
+            elif name == "id" and value:
+                self.used.ids.add(value)
+
+
+def collect_used(html: str) -> UsedSelectors:
+    parser = _SelectorCollector()
+    parser.feed(html)
+    parser.close()
+    return parser.used
+
+
+@dataclass
+class Rule:
+    prelude: str
+    body: str
+    children: list["Rule"] | None = None  # set for conditional group at-rules
+
+
+def parse_css(css: str) -> list[Rule]:
+    """Split a stylesheet into top-level rules, recursing into ``@media`` & co."""
+    css = _COMMENT_RE.sub("", css)
+    rules: list[Rule] = []
+    i, n = 0, len(css)
+    while i < n:
+        start = i
+        depth, quote = 0, ""
+        prelude_end = body_start = -1
+        while i < n:
+            ch = css[i]
+            if quote:
+                if ch == "\\":
+                    i += 1
+                elif ch == quote:
+                    quote = ""
+            elif ch in "\"'":
+                quote = ch
+            elif ch == ";" and depth == 0:
+                break  # statement at-rule such as @import or @charset
+            elif ch == "{":
+                if depth == 0:
+                    prelude_end, body_start = i, i + 1
+                depth += 1
+            elif ch == "}":
+                depth -= 1
+                if depth == 0:
+                    break
+            i += 1
+        if prelude_end < 0:
+            statement = css[start:i].strip()
+            if statement:
+                rules.append(Rule(statement, ""))
+            i += 1
+            continue
+        prelude = " ".join(css[start:prelude_end].split())
+        body = css[body_start:i]
+        i += 1
+        if prelude.split(" ", 1)[0].lower() in CONDITIONAL_AT_RULES:
+            rules.append(Rule(prelude, "", parse_css(body)))
+        else:
+            rules.append(Rule(prelude, " ".join(body.split())))
+    return rules
+
+
+def selector_matches(selector: str, used: UsedSelectors) -> bool:
+    """True when every simple selector in ``selector`` names something in the page."""
+    bare = _PSEUDO_RE.sub("", selector).strip()
+    for compound in _COMBINATOR_RE.split(bare):
+        if not compound or compound == "*":
+            continue
+        tag = _TAG_RE.match(compound)
+        if tag and tag.group().lower() not in used.tags:
+            return False
+        if any(c not in used.classes for c in re.findall(r"\.([\w-]+)", compound)):
+            return False
+        if any(i not in used.ids for i in re.findall(r"#([\w-]+)", compound)):
+            return False
+        for attr in re.findall(r"\[\s*([\w-]+)", compound):
+            if attr not in used.attributes and attr not in RUNTIME_ATTRIBUTES:
+                return False
+    return True
+
+
+def _split_selectors(prelude: str) -> list[str]:
+    parts, depth, current = [], 0, ""
+    for ch in prelude:
+        if ch in "([":
+            depth += 1
+        elif ch in ")]":
+            depth -= 1
+        if ch == "," and depth == 0:
+            parts.append(current.strip())
+            current = ""
+        else:
+            current += ch
+    parts.append(current.strip())
+    return [p for p in parts if p]
+
+
+def _filter(rules: list[Rule], used: UsedSelectors) -> list[str]:
+    out: list[str] = []
+    keyframes: list[tuple[str, str]] = []
+    for rule in rules:
+        keyword = rule.prelude.split(" ", 1)[0].lower()
+        if rule.children is not None:
+            inner = _filter(rule.children, used)
+            if inner:
+                out.append(f"{rule.prelude}{{{''.join(inner)}}}")
+        elif keyword.startswith("@"):
+            if keyword in ALWAYS_KEEP_AT_RULES:
+                out.append(
+                    f"{rule.prelude}{{{rule.body}}}"
+                    if rule.body
+                    else f"{rule.prelude};"
+                )
+            elif (name := _KEYFRAMES_RE.match(rule.prelude)) is not None:
+                keyframes.append((name.group(1), f"{rule.prelude}{{{rule.body}}}"))
+        else:
+            selectors = [
+                s for s in _split_selectors(rule.prelude) if selector_matches(s, used)
+            ]
+            if selectors:
+                out.append(f"{','.join(selectors)}{{{rule.body}}}")
+    kept = "".join(out)
+    out.extend(
+        text for name, text in keyframes if re.search(rf"\b{re.escape(name)}\b", kept)
+    )
+    return out
+
+
+def extract(css: str, html: str) -> str:
+    """The subset of ``css`` needed to style ``html``, minified."""
+    return bundles.minify_css("\n".join(_filter(parse_css(css), collect_used(html))))
+
+
+def index_path() -> Path:
+    return Path(settings.ASSET_BUILD_DIR) / INDEX_NAME
+
+
+def _stylesheet_source() -> Path:
+    return Path(settings.STATICFILES_DIRS[0]) / STYLESHEET
+
+
+def render_route(name: str) -> str:
+    """Render a route for an anonymous visitor who has one pending flash message."""
+    url_path = reverse(name)
+    request = RequestFactory().get(url_path)
+    request.resolver_match = match = resolve(url_path)
+    request._messages = [
+        Message(message_constants.SUCCESS, "Critical CSS sample message")
+    ]
+    response = match.func(request, *match.args, **match.kwargs)
+    if response.status_code != 200:
+        raise RuntimeError(f"{url_path} returned HTTP {response.status_code}")
+    return str(response.content.decode(response.charset))
+
+
+def html_routes() -> list[str]:
+    names = []
+    for pattern in sitecore_urls.urlpatterns:
+        if not isinstance(pattern, URLPattern) or not pattern.name:
+            continue
+        policy: CachePolicy | None = getattr(pattern.callback, "cache_policy", None)
+        # Pages declare a cache policy; API endpoints and health checks don't render one.
+        if policy is None or policy.no_store:
+            continue
+        names.append(pattern.name)
+    return names
+
+
+@dataclass
+class CriticalBuildResult:
+    pages: dict[str, int] = field(default_factory=dict)  # route -> inlined bytes
+    extracted: int = 0
+    reused: int = 0
+    stylesheet_bytes: int = 0
+
+
+def load_index() -> dict[str, dict[str, str | int]]:
+    try:
+        data: dict[str, dict[str, str | int]] = json.loads(index_path().read_text())
+    except (OSError, ValueError):
+        return {}
+    return data
+
+
+def build_critical_css() -> CriticalBuildResult:
+    """Extract the critical subset for every page linking the site stylesheet."""
+    css_bytes = _stylesheet_source().read_bytes()
+    css = css_bytes.decode("utf-8")
+    css_hash = hashlib.sha256(css_bytes).hexdigest()[:16]
+    out_dir = Path(settings.ASSET_BUILD_DIR) / "critical"
+    out_dir.mkdir(parents=True, exist_ok=True)
+    previous = load_index()
+    index: dict[str, dict[str, str | int]] = {}
+    result = CriticalBuildResult(stylesheet_bytes=len(css_bytes))
+    hrefs = {
+        static(path).split("?", 1)[0]
+        for path in bundles.files_for(STYLESHEET, bundles.load_manifest())
+    }
+
+    for name in html_routes():
+        html = render_route(name)
+        used = collect_used(html)
+        if not any(link.split("?", 1)[0] in hrefs for link in used.stylesheets):
+            continue  # standalone pages (embedded forms) carry their own styles
+        template_hash = used.digest()
+        target = out_dir / f"{name}.css"
+        entry = previous.get(name, {})
+        if (
+            entry.get("css_hash") == css_hash
+            and entry.get("template_hash") == template_hash
+            and target.exists()
+        ):
+            result.reused += 1
+        else:
+            tmp = target.with_name(target.name + ".tmp")
+            tmp.write_text(extract(css, html), encoding="utf-8")
+            os.replace(tmp, target)
+            result.extracted += 1
+        size = target.stat().st_size
+        index[name] = {
+            "css_hash": css_hash,
+            "template_hash": template_hash,
+            "file": target.relative_to(settings.ASSET_BUILD_DIR).as_posix(),
+            "bytes": size,
+        }
+        result.pages[name] = size
+
+    index_path().write_text(json.dumps(index, indent=2, sort_keys=True))
+    # Pages cached while rendering (or before the build) still inline the old subset.
+    page_cache.clear()
+    return result
@@ -0,0 +1,183 @@
+"""SQLite tuning and a multi-process write-contention check.
+
+``configure_sqlite`` runs for every new database connection (registered in
+``SitecoreConfig.ready``) and applies ``settings.SQLITE_PRAGMAS``: WAL so readers never
+block the writer, ``synchronous=NORMAL``, a busy timeout so writers queue instead of
+failing, plus mmap and cache sizes. Together with ``CONN_MAX_AGE`` (connections, and so
+the pragmas, persist across requests) and ``transaction_mode=IMMEDIATE`` this is what
+keeps concurrent free-guide submissions from several Passenger workers from hitting
+"database is locked".
+
+``measure_contention`` reproduces that load: it spawns worker processes against a
+scratch database file, each running the free-guide write (``sitecore.leads.ingest``:
+upsert a Lead and enqueue its outbox message in one transaction) as fast as it can,
+and reports per-write latency, which under contention is almost entirely time spent
+waiting for the write lock. A worker that dies without reporting (killed, or any error
+other than "database is locked") is counted as crashed rather than waited for.
+"""
+
+import contextlib
+import multiprocessing
+import os
+import queue
+import statistics
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any
+
+from django.conf import settings
+from django.db.backends.base.base import BaseDatabaseWrapper
+
+
+def configure_sqlite(
+    sender: Any, connection: BaseDatabaseWrapper, **kwargs: Any
+) -> None:
+    if connection.vendor != "sqlite":
+        return
+    raw = connection.connection
+    for name, value in getattr(settings, "SQLITE_PRAGMAS", {}).items():
+        raw.execute(f"PRAGMA {name}={value}")
+
+
+@dataclass
+class ContentionReport:
+    workers: int
+    writes: int
+    tuned: bool
+    errors: int = 0
+    crashed: int = 0
+    seconds: float = 0.0
+    latencies: list[float] = field(default_factory=list, repr=False)
+
+    @property
+    def throughput(self) -> float:
+        return len(self.latencies) / self.seconds if self.seconds else 0.0
+
+    def percentile(self, pct: float) -> float:
+        """Latency in milliseconds at the given percentile (0-100)."""
+        if not self.latencies:
+            return 0.0
+        ordered = sorted(self.latencies)
+        index = min(len(ordered) - 1, round(pct / 100 * (len(ordered) - 1)))
+        return ordered[index] * 1000
+
+    def summary(self) -> str:
+        mean = statistics.fmean(self.latencies) * 1000 if self.latencies else 0.0
+        return (
+            f"{'tuned' if self.tuned else 'untuned'}: {self.workers} workers x "
+            f"{self.writes} writes, {self.errors} locked errors, "
+            f"{self.crashed} crashed workers, "
+            f"{self.throughput:.0f} writes/s; lock wait + write ms: mean {mean:.1f}, "
+            f"p50 {self.percentile(50):.1f}, p95 {self.percentile(95):.1f}, "
+            f"max {self.percentile(100):.1f}"
+        )
+
+
+def _setup_child(path: str, settings_module: str, tuned: bool) -> None:
+    os.environ["DJANGO_SETTINGS_MODULE"] = settings_module
+    os.environ["SQLITE_PATH"] = path
+    import django
+
+    django.setup()
+    if not tuned:
+        # Django's stock SQLite setup, for comparison: no pragmas, DEFERRED transactions.
+        from django.db import connections
+
+        settings.SQLITE_PRAGMAS = {}
+        connections["default"].settings_dict["OPTIONS"] = {}
+
+
+def _migrate(path: str, settings_module: str) -> None:
+    _setup_child(path, settings_module, tuned=True)
+    from django.core.management import call_command
+
+    call_command("migrate", verbosity=0)
+
+
+def _write_worker(
+    path: str,
+    settings_module: str,
+    tuned: bool,
+    worker: int,
+    writes: int,
+    barrier: Any,
+    results: Any,
+) -> None:
+    _setup_child(path, settings_module, tuned)
+    from django.db import OperationalError, connection
+
+    from . import leads
+
+    connection.ensure_connection()
+    barrier.wait()
+    latencies, errors = [], 0
+    for i in range(writes):
+        started = time.perf_counter()
+        try:
+            leads.ingest("Load test", f"load-{worker}-{i}@example.com", True)
+        except OperationalError:
+            errors += 1
+            continue
+        latencies.append(time.perf_counter() - started)
+    results.put((worker, latencies, errors))
+
+
+def measure_contention(
+    path: str,
+    workers: int = 8,
+    writes: int = 200,
+    tuned: bool = True,
+    timeout: float = 600.0,
+) -> ContentionReport:
+    """Hammer a fresh SQLite file at ``path`` from ``workers`` processes.
+
+    Workers still running after ``timeout`` seconds are killed and counted as crashed.
+    """
+    # spawn, not fork: each worker opens its own connection from scratch, as Passenger's do.
+    ctx = multiprocessing.get_context("spawn")
+    # Not settings.SETTINGS_MODULE, which is None while override_settings is active.
+    module = os.environ["DJANGO_SETTINGS_MODULE"]
+    setup = ctx.Process(target=_migrate, args=(path, module))
+    setup.start()
+    setup.join()
+    if setup.exitcode != 0:
+        raise RuntimeError(f"migrating {path} failed")
+
+    barrier = ctx.Barrier(workers + 1)
+    results = ctx.Queue()
+    procs = [
+        ctx.Process(
+            target=_write_worker,
+            args=(path, module, tuned, n, writes, barrier, results),
+        )
+        for n in range(workers)
+    ]
+    for proc in procs:
+        proc.start()
+    deadline = time.monotonic() + timeout
+    # If a worker dies during setup the barrier breaks, and the others exit with it.
+    with contextlib.suppress(threading.BrokenBarrierError):
+        barrier.wait(timeout=timeout)
+    started = time.perf_counter()
+    report = ContentionReport(workers=workers, writes=writes, tuned=tuned)
+    pending = dict(enumerate(procs))
+    while pending:
+        try:
+            worker, latencies, errors = results.get(timeout=1.0)
+        except queue.Empty:
+            # A worker flushes its result before it exits, so one that has exited by
+            # now is never going to report.
+            for n, proc in list(pending.items()):
+                if proc.exitcode is not None or time.monotonic() > deadline:
+                    proc.kill()
+                    del pending[n]
+                    report.crashed += 1
+            continue
+        pending.pop(worker, None)
+        report.latencies.extend(latencies)
+        report.errors += errors
+    report.seconds = time.perf_counter() - started
+    for proc in procs:
+        proc.join()
+    return report
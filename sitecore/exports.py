@@ -0,0 +1,153 @@
+"""Constant-memory lead export and archival.
+
+Exports stream rows with ``QuerySet.iterator(chunk_size=...)``, so neither the admin
+action nor ``manage.py export_leads`` ever holds more than one chunk of leads, however
+large the table grows. Output is grouped into blocks of about ``BLOCK_BYTES`` so a
+``StreamingHttpResponse`` writes a few large chunks instead of one per row.
+
+``archive_leads`` moves leads created before a cutoff into a gzip-compressed NDJSON
+file, one small transaction per batch: each batch is appended to the archive as its
+own gzip member and fsynced *before* its rows are deleted, so a crash can at worst
+leave a batch both archived and still in the table (rerunning archives it again; the
+``id`` field tells the copies apart), never lost. ``gzip.open``/``zcat`` read the
+concatenated members as one stream.
+"""
+
+import csv
+import datetime
+import gzip
+import io
+import json
+import os
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.db.models import QuerySet
+from django.utils import timezone
+
+from .models import Lead
+
+FIELDS = ("id", "email", "name", "consent", "created_at", "synced_at")
+CHUNK_SIZE = 2000
+BLOCK_BYTES = 64 * 1024
+
+# Spreadsheets evaluate cells starting with these as formulas; names and emails come
+# from the public form, so such cells are prefixed with ' to keep them text.
+_FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+
+
+def _rows(queryset: QuerySet[Lead], chunk_size: int) -> Iterator[tuple[Any, ...]]:
+    return queryset.order_by("pk").values_list(*FIELDS).iterator(chunk_size=chunk_size)
+
+
+def _blocks(lines: Iterable[str]) -> Iterator[str]:
+    block: list[str] = []
+    size = 0
+    for line in lines:
+        block.append(line)
+        size += len(line)
+        if size >= BLOCK_BYTES:
+            yield "".join(block)
+            block, size = [], 0
+    if block:
+        yield "".join(block)
+
+
+def _csv_cell(value: Any) -> Any:
+    if isinstance(value, datetime.datetime):
+        return value.isoformat()
+    if isinstance(value, str) and value.startswith(_FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+def _csv_lines(rows: Iterable[tuple[Any, ...]]) -> Iterator[str]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(FIELDS)
+    for row in rows:
+        writer.writerow([_csv_cell(v) for v in row])
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    # Header only (an empty export), or nothing left after the last row.
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def _ndjson_lines(rows: Iterable[tuple[Any, ...]]) -> Iterator[str]:
+    for row in rows:
+        yield json.dumps(dict(zip(FIELDS, row, strict=True)), cls=DjangoJSONEncoder)
+        yield "\n"
+
+
+def iter_csv(queryset: QuerySet[Lead], chunk_size: int = CHUNK_SIZE) -> Iterator[str]:
+    """CSV text for ``queryset`` (header first), in blocks of ~``BLOCK_BYTES``."""
+    return _blocks(_csv_lines(_rows(queryset, chunk_size)))
+
+
+def iter_ndjson(
+    queryset: QuerySet[Lead], chunk_size: int = CHUNK_SIZE
+) -> Iterator[str]:
+    """One JSON object per lead and line, in blocks of ~``BLOCK_BYTES``."""
+    return _blocks(_ndjson_lines(_rows(queryset, chunk_size)))
+
+
+# format -> (generator, content type, file extension)
+FORMATS = {
+    "csv": (iter_csv, "text/csv; charset=utf-8", "csv"),
+    "ndjson": (iter_ndjson, "application/x-ndjson", "ndjson"),
+}
+
+
+@dataclass
+class ArchiveResult:
+    path: Path
+    archived: int = 0
+    batches: int = 0
+
+
+def archive_leads(
+    cutoff: datetime.datetime,
+    directory: str | os.PathLike[str],
+    batch_size: int = 500,
+    include_unsynced: bool = False,
+) -> ArchiveResult:
+    """Move leads created before ``cutoff`` into ``directory/leads-before-<cutoff>.ndjson.gz``.
+
+    Leads GetResponse has not accepted yet stay unless ``include_unsynced`` is set, so
+    ``sync_leads`` can still backfill them.
+    """
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    stamp = timezone.localtime(cutoff).strftime("%Y%m%dT%H%M%S")
+    result = ArchiveResult(path=directory / f"leads-before-{stamp}.ndjson.gz")
+    queryset = Lead.objects.filter(created_at__lt=cutoff)
+    if not include_unsynced:
+        queryset = queryset.filter(synced_at__isnull=False)
+    with open(result.path, "ab") as archive:
+        while True:
+            with transaction.atomic():
+                # Walks the created_at index; small batches keep the write lock short.
+                rows = list(
+                    queryset.order_by("created_at", "pk").values_list(*FIELDS)[
+                        :batch_size
+                    ]
+                )
+                if not rows:
+                    break
+                archive.write(
+                    gzip.compress("".join(_ndjson_lines(rows)).encode(), mtime=0)
+                )
+                archive.flush()
+                os.fsync(archive.fileno())
+                Lead.objects.filter(pk__in=[row[0] for row in rows]).delete()
+            result.archived += len(rows)
+            result.batches += 1
+    if not result.archived and result.path.stat().st_size == 0:
+        result.path.unlink()
+    return result
@@ -2,8 +2,22 @@ from django import forms
 
 
 class LeadMagnetForm(forms.Form):
+    # Hidden from people (see lead_magnet.html); bots that fill every input trip it.
+    HONEYPOT = "website"
+
     name = forms.CharField(max_length=120, required=False, label="Name (optional)")
     email = forms.EmailField(label="Email")
     consent = forms.BooleanField(
         label="I agree to receive the free guide and occasional emails", required=True
     )
+    website = forms.CharField(
+        required=False,
+        label="Leave this field empty",
+        widget=forms.TextInput(attrs={"autocomplete": "off", "tabindex": "-1"}),
+    )
+
+    def clean_website(self) -> str:
+        # sitecore.shedding normally rejects these first; this covers it being disabled.
+        if self.cleaned_data["website"]:
+            raise forms.ValidationError("Leave this field empty.")
+        return ""
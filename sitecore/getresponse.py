@@ -0,0 +1,402 @@
+"""GetResponse API client.
+
+One client per process keeps a persistent HTTP/1.1 connection per thread, adapts
+its timeout to the latency it actually observes, and shares a circuit breaker with
+every other worker process so an outage is detected once and then fails fast.
+
+``AsyncGetResponseClient`` is the same client on asyncio streams, for async views
+under ASGI: its keep-alive connections are pooled per event loop, so a slow API
+holds open sockets rather than threads, and at most ``GETRESPONSE_ASYNC_CONCURRENCY``
+requests are in flight at once. It shares the breaker and timeout with the sync client.
+"""
+
+import asyncio
+import http.client
+import json
+import logging
+import ssl
+import threading
+import time
+import weakref
+from dataclasses import dataclass, field
+from urllib.parse import urlsplit
+
+from django.conf import settings
+
+from . import metrics
+from .circuitbreaker import BreakerStore, CircuitBreaker
+
+logger = logging.getLogger(__name__)
+
+
+class GetResponseError(Exception):
+    """Raised when a contact could not be delivered to GetResponse.
+
+    ``status`` is the HTTP status when the API answered, else None.
+    """
+
+    # Rejections that retrying the same request cannot fix (409 is a success, 429 a
+    # rate limit).
+    PERMANENT_STATUSES = frozenset({400, 401, 403, 422})
+
+    def __init__(self, message: str, status: int | None = None) -> None:
+        super().__init__(message)
+        self.status = status
+
+    @property
+    def permanent(self) -> bool:
+        return self.status in self.PERMANENT_STATUSES
+
+
+class CircuitOpenError(GetResponseError):
+    """Raised without touching the network while the shared breaker is open."""
+
+    def __init__(self, retry_after: float) -> None:
+        super().__init__(f"GetResponse circuit open; retry in {retry_after:.0f}s")
+        self.retry_after = retry_after
+
+
+class AdaptiveTimeout:
+    """Request timeout derived from observed latency (smoothed RTT + 4 * deviation,
+    as TCP does), clamped to [minimum, maximum]. Starts at the maximum until it has data.
+
+    A call that times out yields no latency sample (Karn's rule); ``backoff`` doubles
+    the timeout instead, up to the maximum, until the next answered call. Without it a
+    run of fast calls would pin the timeout at the minimum, and an API that then slowed
+    past it would time out on every call, the breaker's probes included.
+    """
+
+    def __init__(self, minimum: float = 1.0, maximum: float = 10.0) -> None:
+        self.minimum = minimum
+        self.maximum = maximum
+        self._srtt: float | None = None
+        self._rttvar = 0.0
+        self._backed_off: float | None = None
+        self._lock = threading.Lock()
+
+    def observe(self, seconds: float) -> None:
+        with self._lock:
+            self._backed_off = None
+            if self._srtt is None:
+                self._srtt, self._rttvar = seconds, seconds / 2
+            else:
+                self._rttvar = 0.75 * self._rttvar + 0.25 * abs(self._srtt - seconds)
+                self._srtt = 0.875 * self._srtt + 0.125 * seconds
+
+    def backoff(self) -> None:
+        with self._lock:
+            self._backed_off = min(2 * self.current, self.maximum)
+
+    @property
+    def current(self) -> float:
+        if self._backed_off is not None:
+            return self._backed_off
+        if self._srtt is None:
+            return self.maximum
+        return min(max(self._srtt + 4 * self._rttvar, self.minimum), self.maximum)
+
+
+class _BaseClient:
+    def __init__(
+        self,
+        api_key: str,
+        list_id: str,
+        base_url: str = "https://api.getresponse.com/v3",
+        breaker: CircuitBreaker | None = None,
+        timeout: AdaptiveTimeout | None = None,
+    ) -> None:
+        self.api_key = api_key
+        self.list_id = list_id
+        parts = urlsplit(base_url)
+        self._scheme = parts.scheme
+        self._host = parts.hostname or ""
+        self._port = parts.port
+        self._base_path = parts.path.rstrip("/")
+        self.breaker = breaker
+        self.timeout = timeout or AdaptiveTimeout()
+
+    def _check_breaker(self) -> None:
+        if self.breaker is not None and not self.breaker.allow():
+            raise CircuitOpenError(self.breaker.retry_after)
+
+    def _contact(self, name: str, email: str) -> bytes:
+        payload = {
+            "email": email,
+            "name": name or "",
+            "campaign": {"campaignId": self.list_id},
+            "dayOfCycle": 0,
+        }
+        return json.dumps(payload).encode("utf-8")
+
+    def _raised(self, e: Exception, elapsed: float) -> GetResponseError:
+        metrics.observe_getresponse(elapsed, "error")
+        if isinstance(e, (TimeoutError, asyncio.TimeoutError)):
+            self.timeout.backoff()
+        self._failed()
+        return GetResponseError(str(e) or e.__class__.__name__)
+
+    def _answered(self, status: int, elapsed: float) -> None:
+        """A 409 (contact already exists) counts as success."""
+        self.timeout.observe(elapsed)
+        metrics.observe_getresponse(elapsed, f"{status // 100}xx")
+        if 200 <= status < 300 or status == 409:
+            if self.breaker is not None:
+                self.breaker.record_success()
+            return
+        if status >= 500 or status == 429:
+            self._failed()
+        raise GetResponseError(f"GetResponse returned HTTP {status}", status)
+
+    def _failed(self) -> None:
+        if self.breaker is not None:
+            self.breaker.record_failure()
+
+
+class GetResponseClient(_BaseClient):
+    def __init__(self, *args: object, **kwargs: object) -> None:
+        super().__init__(*args, **kwargs)  # type: ignore[arg-type]
+        self._local = threading.local()
+
+    def _connection(self) -> http.client.HTTPConnection:
+        conn: http.client.HTTPConnection | None = getattr(self._local, "conn", None)
+        if conn is None:
+            if self._scheme == "https":
+                conn = http.client.HTTPSConnection(
+                    self._host, self._port, context=ssl.create_default_context()
+                )
+            else:
+                conn = http.client.HTTPConnection(self._host, self._port)
+            self._local.conn = conn
+        conn.timeout = self.timeout.current
+        if conn.sock is not None:
+            conn.sock.settimeout(conn.timeout)
+        return conn
+
+    def close(self) -> None:
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+    def _send(self, method: str, path: str, body: bytes) -> int:
+        headers = {
+            "Content-Type": "application/json",
+            "X-Auth-Token": f"api-key {self.api_key}",
+        }
+        for attempt in range(2):
+            conn = self._connection()
+            reused = conn.sock is not None
+            try:
+                conn.request(method, self._base_path + path, body=body, headers=headers)
+                resp = conn.getresponse()
+                resp.read()  # drain so the connection can be reused
+                if resp.will_close:
+                    self.close()
+                return int(resp.status)
+            except (
+                http.client.RemoteDisconnected,
+                BrokenPipeError,
+                ConnectionResetError,
+            ):
+                self.close()
+                # The server may silently drop idle keep-alive connections; retry once.
+                if not reused or attempt:
+                    raise
+            except Exception:
+                self.close()
+                raise
+        raise AssertionError("unreachable")
+
+    def subscribe(self, name: str, email: str) -> None:
+        """Create a contact in the campaign. A 409 (contact already exists) counts as success."""
+        self._check_breaker()
+        started = time.perf_counter()
+        try:
+            with metrics.span("getresponse"):
+                status = self._send("POST", "/contacts", self._contact(name, email))
+        except Exception as e:
+            raise self._raised(e, time.perf_counter() - started) from e
+        self._answered(status, time.perf_counter() - started)
+
+
+Stream = tuple[asyncio.StreamReader, asyncio.StreamWriter]
+
+
+@dataclass
+class _Pool:
+    slots: asyncio.Semaphore
+    idle: list[Stream] = field(default_factory=list)
+
+
+async def _read_response(reader: asyncio.StreamReader) -> tuple[int, bool]:
+    """Read one HTTP/1.1 response; returns (status, connection reusable)."""
+    line = await reader.readline()
+    if not line:
+        raise ConnectionResetError("connection closed before a response was received")
+    version, status = line.split(None, 2)[:2]
+    headers = {}
+    while (header := await reader.readline()) not in (b"\r\n", b"\n", b""):
+        name, _, value = header.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip().lower()
+    reusable = version == b"HTTP/1.1" and headers.get("connection") != "close"
+    if headers.get("transfer-encoding") == "chunked":
+        while True:
+            size = int((await reader.readline()).split(b";")[0], 16)
+            await reader.readexactly(size + 2)  # chunk data + CRLF
+            if not size:
+                break
+    elif "content-length" in headers:
+        await reader.readexactly(int(headers["content-length"]))
+    else:
+        await reader.read()  # body runs to EOF
+        reusable = False
+    return int(status), reusable
+
+
+class AsyncGetResponseClient(_BaseClient):
+    def __init__(self, *args: object, concurrency: int = 20, **kwargs: object) -> None:
+        super().__init__(*args, **kwargs)  # type: ignore[arg-type]
+        self.concurrency = concurrency
+        # Streams and semaphores belong to one event loop.
+        self._pools: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, _Pool] = (
+            weakref.WeakKeyDictionary()
+        )
+        self._ssl = ssl.create_default_context() if self._scheme == "https" else None
+
+    def _pool(self) -> _Pool:
+        loop = asyncio.get_running_loop()
+        pool = self._pools.get(loop)
+        if pool is None:
+            pool = self._pools[loop] = _Pool(asyncio.Semaphore(self.concurrency))
+        return pool
+
+    async def _open(self) -> Stream:
+        port = self._port or (443 if self._ssl else 80)
+        return await asyncio.open_connection(self._host, port, ssl=self._ssl)
+
+    async def _exchange(self, pool: _Pool, request: bytes) -> int:
+        for attempt in range(2):
+            reused = bool(pool.idle)
+            reader, writer = pool.idle.pop() if reused else await self._open()
+            try:
+                writer.write(request)
+                await writer.drain()
+                status, reusable = await _read_response(reader)
+            except (ConnectionError, asyncio.IncompleteReadError):
+                writer.close()
+                # The server may silently drop idle keep-alive connections; retry once.
+                if not reused or attempt:
+                    raise
+                continue
+            except BaseException:  # including cancellation by the timeout
+                writer.close()
+                raise
+            if reusable:
+                pool.idle.append((reader, writer))
+            else:
+                writer.close()
+            return status
+        raise AssertionError("unreachable")
+
+    async def _send(self, method: str, path: str, body: bytes) -> int:
+        host = self._host if self._port is None else f"{self._host}:{self._port}"
+        request = (
+            f"{method} {self._base_path}{path} HTTP/1.1\r\n"
+            f"Host: {host}\r\n"
+            "Content-Type: application/json\r\n"
+            f"X-Auth-Token: api-key {self.api_key}\r\n"
+            f"Content-Length: {len(body)}\r\n\r\n"
+        ).encode("latin-1") + body
+        pool = self._pool()
+        async with pool.slots:
+            # Only the exchange is timed; waiting for a slot is not the API's latency.
+            return await asyncio.wait_for(
+                self._exchange(pool, request), self.timeout.current
+            )
+
+    async def close(self) -> None:
+        """Close this event loop's idle connections."""
+        pool = self._pools.pop(asyncio.get_running_loop(), None)
+        writers = [writer for _, writer in pool.idle] if pool else []
+        for writer in writers:
+            writer.close()
+        await asyncio.gather(
+            *(w.wait_closed() for w in writers), return_exceptions=True
+        )
+
+    async def subscribe(self, name: str, email: str) -> None:
+        """Async ``GetResponseClient.subscribe``."""
+        self._check_breaker()
+        started = time.perf_counter()
+        try:
+            status = await self._send("POST", "/contacts", self._contact(name, email))
+        except Exception as e:
+            raise self._raised(e, time.perf_counter() - started) from e
+        self._answered(status, time.perf_counter() - started)
+
+
+_client: GetResponseClient | None = None
+_client_key: tuple[str, str, str] | None = None
+_client_lock = threading.Lock()
+
+
+def is_configured() -> bool:
+    return bool(settings.GETRESPONSE_API_KEY and settings.GETRESPONSE_LIST_ID)
+
+
+def get_client() -> GetResponseClient:
+    """Return the process-wide client, rebuilt if the settings it was built from change."""
+    global _client, _client_key
+    key = (
+        settings.GETRESPONSE_API_KEY,
+        settings.GETRESPONSE_LIST_ID,
+        settings.GETRESPONSE_API_URL,
+    )
+    with _client_lock:
+        if _client is None or _client_key != key:
+            breaker = CircuitBreaker(
+                "getresponse",
+                BreakerStore(settings.GETRESPONSE_BREAKER_PATH),
+                failure_threshold=settings.GETRESPONSE_BREAKER_THRESHOLD,
+                reset_timeout=settings.GETRESPONSE_BREAKER_RESET,
+            )
+            _client = GetResponseClient(*key, breaker=breaker)
+            _client_key = key
+        return _client
+
+
+_async_client: AsyncGetResponseClient | None = None
+
+
+def get_async_client() -> AsyncGetResponseClient:
+    """Return the process-wide async client, sharing the sync client's breaker and timeout."""
+    global _async_client
+    sync = get_client()
+    key = (sync.api_key, sync.list_id, settings.GETRESPONSE_API_URL)
+    with _client_lock:
+        client = _async_client
+        if client is None or client.breaker is not sync.breaker:
+            client = _async_client = AsyncGetResponseClient(
+                *key,
+                breaker=sync.breaker,
+                timeout=sync.timeout,
+                concurrency=settings.GETRESPONSE_ASYNC_CONCURRENCY,
+            )
+        return client
+
+
+def subscribe(name: str, email: str) -> None:
+    """Create a contact in the configured GetResponse campaign.
+
+    Raises GetResponseError on any failure so callers can decide whether to retry.
+    """
+    if not is_configured():
+        raise GetResponseError("GetResponse not configured")
+    get_client().subscribe(name, email)
+
+
+async def asubscribe(name: str, email: str) -> None:
+    """Async ``subscribe``, for async views."""
+    if not is_configured():
+        raise GetResponseError("GetResponse not configured")
+    await get_async_client().subscribe(name, email)
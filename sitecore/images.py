@@ -0,0 +1,126 @@
+"""Build-time responsive image pipeline.
+
+For every raster image under ``static/img`` this generates resized WebP (and AVIF,
+when Pillow supports it) variants at several widths into ``ASSET_BUILD_DIR/img`` and
+records intrinsic dimensions plus the variant list in ``ASSET_BUILD_DIR/images.json``.
+Variants are named by content hash, so byte-identical sources (e.g. ``hero-owl.png``
+and ``robot owl.png``) share one set of files, and unchanged images are skipped on
+rebuild. It runs as part of ``collectstatic``; the ``{% responsive_image %}`` tag in
+``sitecore.templatetags.assets`` reads the manifest.
+"""
+
+import hashlib
+import json
+import os
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+from django.conf import settings
+from PIL import Image, features
+
+SOURCE_EXTENSIONS = {".png", ".jpg", ".jpeg"}
+WIDTHS = (48, 96, 160, 320, 480, 640, 960, 1280, 1920)
+QUALITY = {"avif": 50, "webp": 80}
+MANIFEST_NAME = "images.json"
+
+
+@dataclass
+class ImageBuildResult:
+    sources: int = 0
+    generated: int = 0
+    reused: int = 0
+    duplicates: list[tuple[str, str]] = field(default_factory=list)
+    bytes_before: int = 0
+    # Full-width variant bytes per format, for comparison with bytes_before.
+    bytes_after: dict[str, int] = field(default_factory=dict)
+
+
+def output_formats() -> list[str]:
+    """Modern formats this Pillow build can encode, best first."""
+    return [fmt for fmt in ("avif", "webp") if features.check(fmt)]
+
+
+def manifest_path() -> Path:
+    return Path(settings.ASSET_BUILD_DIR) / MANIFEST_NAME
+
+
+def _source_root() -> Path:
+    return Path(settings.STATICFILES_DIRS[0])
+
+
+def _iter_sources(root: Path, build_dir: Path) -> list[Path]:
+    found = []
+    for path in sorted((root / "img").rglob("*")):
+        if path.suffix.lower() in SOURCE_EXTENSIONS and build_dir not in path.parents:
+            found.append(path)
+    return found
+
+
+def _target_widths(width: int) -> list[int]:
+    return [w for w in WIDTHS if w < width] + [width]
+
+
+def build_images() -> ImageBuildResult:
+    """Generate variants for all source images and write the manifest."""
+    root = _source_root()
+    build_dir = Path(settings.ASSET_BUILD_DIR)
+    out_dir = build_dir / "img"
+    out_dir.mkdir(parents=True, exist_ok=True)
+    formats = output_formats()
+    result = ImageBuildResult()
+    manifest: dict[str, Any] = {}
+    by_hash: dict[str, dict[str, Any]] = {}
+    first_seen: dict[str, str] = {}
+
+    for source in _iter_sources(root, build_dir):
+        rel = source.relative_to(root).as_posix()
+        data = source.read_bytes()
+        digest = hashlib.sha256(data).hexdigest()[:12]
+        result.sources += 1
+        if digest in by_hash:
+            manifest[rel] = by_hash[digest]
+            result.duplicates.append((rel, first_seen[digest]))
+            continue
+        first_seen[digest] = rel
+        result.bytes_before += len(data)
+        with Image.open(source) as im:
+            im.load()
+            width, height = im.size
+            entry: dict[str, Any] = {
+                "hash": digest,
+                "width": width,
+                "height": height,
+                "variants": {},
+            }
+            for fmt in formats:
+                variants = []
+                for w in _target_widths(width):
+                    name = f"{digest}-{w}.{fmt}"
+                    target = out_dir / name
+                    if target.exists():
+                        result.reused += 1
+                    else:
+                        h = max(round(height * w / width), 1)
+                        resized = (
+                            im
+                            if w == width
+                            else im.resize((w, h), Image.Resampling.LANCZOS)
+                        )
+                        tmp = target.with_name(name + ".tmp")
+                        resized.save(tmp, format=fmt.upper(), quality=QUALITY[fmt])
+                        os.replace(tmp, target)
+                        result.generated += 1
+                    if w == width:
+                        result.bytes_after[fmt] = (
+                            result.bytes_after.get(fmt, 0) + target.stat().st_size
+                        )
+                    variants.append(
+                        [w, f"{out_dir.relative_to(root).as_posix()}/{name}"]
+                    )
+                entry["variants"][fmt] = variants
+        by_hash[digest] = entry
+        manifest[rel] = entry
+
+    manifest_path().write_text(json.dumps(manifest, indent=2, sort_keys=True))
+    return result
@@ -0,0 +1,192 @@
+"""Lead ingestion: normalized, single-statement upserts with optional write-behind.
+
+``ingest`` lower-cases the email and writes the lead with one
+``INSERT ... ON CONFLICT (email) DO UPDATE`` (via ``bulk_create(update_conflicts=True)``)
+together with its GetResponse outbox message, in one transaction. Resubmitting an
+address, in any letter case, updates the existing row instead of racing a separate
+SELECT; the case-insensitive unique index on ``Lead`` backs that up for writes that
+bypass this module.
+
+With ``LEAD_WRITE_BEHIND=True``, ``submit`` only queues the submission in memory and
+a background thread writes queued submissions in batches, whenever
+``LEAD_WRITE_BEHIND_MAX_ROWS`` are waiting or ``LEAD_WRITE_BEHIND_MAX_DELAY_MS`` has
+passed, so a campaign spike costs one write-lock acquisition per batch instead of one
+per visitor. The queue is flushed at interpreter exit, but submissions still queued
+when a worker is killed outright are lost, so it is off by default.
+"""
+
+import atexit
+import logging
+import threading
+import time
+from dataclasses import dataclass
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import connection, transaction
+
+from . import outbox
+from .models import Lead, OutboxMessage
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class Submission:
+    name: str
+    email: str
+    consent: bool
+
+
+def normalize_email(email: str) -> str:
+    """Canonical form used for storage and uniqueness: trimmed and lower-cased."""
+    return email.strip().lower()
+
+
+def _normalized(submissions: list[Submission]) -> list[Submission]:
+    # Within one batch the last submission for an address wins, like sequential upserts.
+    latest: dict[str, Submission] = {}
+    for sub in submissions:
+        email = normalize_email(sub.email)
+        previous = latest.pop(email, None)
+        name = sub.name.strip() or (previous.name if previous else "")
+        latest[email] = Submission(name, email, sub.consent)
+    return list(latest.values())
+
+
+def ingest_many(submissions: list[Submission]) -> int:
+    """Upsert leads and enqueue their subscriptions in one transaction.
+
+    Returns the number of distinct addresses written. A blank name never overwrites a
+    stored one.
+    """
+    return len(_ingest(_normalized(submissions)))
+
+
+def _ingest(subs: list[Submission]) -> list[OutboxMessage]:
+    if not subs:
+        return []
+    named = [s for s in subs if s.name]
+    unnamed = [s for s in subs if not s.name]
+    with transaction.atomic():
+        for group, update_fields in (
+            (named, ["name", "consent"]),
+            (unnamed, ["consent"]),
+        ):
+            if group:
+                Lead.objects.bulk_create(
+                    [
+                        Lead(name=s.name, email=s.email, consent=s.consent)
+                        for s in group
+                    ],
+                    update_conflicts=True,
+                    unique_fields=["email"],
+                    update_fields=update_fields,
+                )
+        return outbox.enqueue_many(
+            OutboxMessage.KIND_GETRESPONSE_SUBSCRIBE,
+            [{"name": s.name, "email": s.email} for s in subs],
+        )
+
+
+def ingest(name: str, email: str, consent: bool) -> None:
+    ingest_many([Submission(name, email, consent)])
+
+
+class WriteBehindBuffer:
+    """Collects submissions and writes them with ``ingest_many`` from a daemon thread."""
+
+    def __init__(self, max_rows: int = 50, max_delay: float = 0.2) -> None:
+        self.max_rows = max_rows
+        self.max_delay = max_delay
+        self._pending: list[Submission] = []
+        self._cond = threading.Condition()
+        self._flush_lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+        self.batches = 0
+
+    def submit(self, submission: Submission) -> None:
+        with self._cond:
+            self._pending.append(submission)
+            self._ensure_thread()
+            if len(self._pending) >= self.max_rows:
+                self._cond.notify()
+
+    def flush(self) -> int:
+        """Write everything queued so far; returns the number of submissions taken."""
+        with self._flush_lock:
+            with self._cond:
+                batch, self._pending = self._pending, []
+            if not batch:
+                return 0
+            try:
+                ingest_many(batch)
+            except Exception:
+                # Put the batch back so the next flush retries it.
+                logger.exception("Write-behind flush of %d leads failed", len(batch))
+                with self._cond:
+                    self._pending[:0] = batch
+                raise
+            finally:
+                # Honour CONN_MAX_AGE for the flushing thread's own connection.
+                connection.close_if_unusable_or_obsolete()
+            self.batches += 1
+            return len(batch)
+
+    def _ensure_thread(self) -> None:
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(
+                target=self._run, name="lead-write-behind", daemon=True
+            )
+            self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: bool(self._pending))
+                # Give the batch up to max_delay to fill, unless it is already full.
+                self._cond.wait_for(
+                    lambda: len(self._pending) >= self.max_rows, timeout=self.max_delay
+                )
+            try:
+                self.flush()
+            except Exception:
+                time.sleep(max(self.max_delay, 1.0))  # already logged; retry shortly
+
+
+_buffer: WriteBehindBuffer | None = None
+_buffer_lock = threading.Lock()
+
+
+def write_behind_buffer() -> WriteBehindBuffer:
+    global _buffer
+    with _buffer_lock:
+        if _buffer is None:
+            _buffer = WriteBehindBuffer(
+                max_rows=settings.LEAD_WRITE_BEHIND_MAX_ROWS,
+                max_delay=settings.LEAD_WRITE_BEHIND_MAX_DELAY_MS / 1000,
+            )
+            atexit.register(_buffer.flush)
+        return _buffer
+
+
+def submit(name: str, email: str, consent: bool) -> None:
+    """Record a free-guide submission, immediately or via the write-behind buffer."""
+    if getattr(settings, "LEAD_WRITE_BEHIND", False):
+        write_behind_buffer().submit(Submission(name, email, consent))
+    else:
+        ingest(name, email, consent)
+
+
+async def asubmit(name: str, email: str, consent: bool) -> list[OutboxMessage]:
+    """``submit`` for async views.
+
+    Returns the outbox messages it queued, so the caller can start delivering them
+    (none with write-behind). The lead and its message are written in one transaction,
+    which Django's async ORM can't express, so the write runs in Django's sync thread.
+    """
+    submission = Submission(name, email, consent)
+    if getattr(settings, "LEAD_WRITE_BEHIND", False):
+        write_behind_buffer().submit(submission)
+        return []
+    return await sync_to_async(_ingest)(_normalized([submission]))
@@ -0,0 +1,168 @@
+"""Lead -> GetResponse reconciliation.
+
+Pushes leads that never reached GetResponse (``Lead.synced_at`` is NULL) using a
+bounded thread pool and a shared requests-per-second limit. Progress is checkpointed
+to a small JSON file after every batch, so a killed run resumes where it stopped.
+All database access happens on the calling thread; worker threads only do HTTP.
+"""
+
+import json
+import os
+import threading
+import time
+from collections.abc import Callable, Iterator
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+
+from django.utils import timezone
+
+from . import getresponse
+from .models import Lead
+
+
+class RateLimiter:
+    """Thread-safe token bucket: at most ``rate`` acquisitions per second on average,
+    with bursts of up to ``burst``.
+    """
+
+    def __init__(self, rate: float, burst: int = 1) -> None:
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = rate
+        self.capacity = float(max(burst, 1))
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(
+                    self.capacity, self._tokens + (now - self._updated) * self.rate
+                )
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+@dataclass
+class SyncStats:
+    synced: int = 0
+    failed: int = 0
+    started: float = 0.0
+
+    @property
+    def processed(self) -> int:
+        return self.synced + self.failed
+
+    @property
+    def rate(self) -> float:
+        elapsed = time.monotonic() - self.started
+        return self.processed / elapsed if elapsed > 0 else 0.0
+
+
+class Checkpoint:
+    """Highest lead id already handled by an interrupted run."""
+
+    def __init__(self, path: str | os.PathLike[str]) -> None:
+        self.path = Path(path)
+
+    def load(self) -> int:
+        try:
+            return int(json.loads(self.path.read_text())["last_id"])
+        except (OSError, ValueError, KeyError, TypeError):
+            return 0
+
+    def save(self, last_id: int) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".tmp")
+        tmp.write_text(
+            json.dumps({"last_id": last_id, "saved_at": timezone.now().isoformat()})
+        )
+        os.replace(tmp, self.path)
+
+    def clear(self) -> None:
+        self.path.unlink(missing_ok=True)
+
+
+def unsynced_batches(
+    after_id: int, batch_size: int
+) -> Iterator[list[tuple[int, str, str]]]:
+    """Yield (id, name, email) rows of unsynced leads in id order, keyset-paginated."""
+    while True:
+        batch = list(
+            Lead.objects.filter(synced_at__isnull=True, consent=True, id__gt=after_id)
+            .order_by("id")
+            .values_list("id", "name", "email")[:batch_size]
+        )
+        if not batch:
+            return
+        yield batch
+        after_id = batch[-1][0]
+
+
+def _push(
+    limiter: RateLimiter, row: tuple[int, str, str]
+) -> tuple[int, Exception | None]:
+    lead_id, name, email = row
+    limiter.acquire()
+    try:
+        getresponse.subscribe(name, email)
+    except getresponse.GetResponseError as e:
+        return lead_id, e
+    return lead_id, None
+
+
+def sync_leads(
+    workers: int = 8,
+    rps: float = 10.0,
+    batch_size: int = 500,
+    checkpoint: Checkpoint | None = None,
+    progress: Callable[[SyncStats], None] | None = None,
+) -> SyncStats:
+    """Push every unsynced lead once.
+
+    Raises CircuitOpenError if GetResponse goes down mid-run; the checkpoint then
+    points just before the first lead that was not attempted, so a rerun resumes there.
+    """
+    stats = SyncStats(started=time.monotonic())
+    limiter = RateLimiter(rps, burst=workers)
+    after_id = checkpoint.load() if checkpoint else 0
+    with ThreadPoolExecutor(
+        max_workers=workers, thread_name_prefix="sync-leads"
+    ) as pool:
+        for batch in unsynced_batches(after_id, batch_size):
+            results = list(pool.map(lambda row: _push(limiter, row), batch))
+            ok = [lead_id for lead_id, error in results if error is None]
+            if ok:
+                Lead.objects.filter(id__in=ok).update(
+                    synced_at=timezone.now(), sync_error=""
+                )
+            tripped = [
+                (lead_id, error)
+                for lead_id, error in results
+                if isinstance(error, getresponse.CircuitOpenError)
+            ]
+            for lead_id, error in results:
+                if error is not None and not isinstance(
+                    error, getresponse.CircuitOpenError
+                ):
+                    Lead.objects.filter(id=lead_id).update(sync_error=str(error)[:255])
+                    stats.failed += 1
+            stats.synced += len(ok)
+            if progress:
+                progress(stats)
+            if tripped:
+                if checkpoint:
+                    checkpoint.save(tripped[0][0] - 1)
+                raise tripped[0][1]
+            if checkpoint:
+                checkpoint.save(batch[-1][0])
+    if checkpoint:
+        checkpoint.clear()
+    return stats
@@ -0,0 +1,62 @@
+import datetime
+from typing import Any
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+from django.utils import timezone
+
+from sitecore.exports import archive_leads
+
+
+class Command(BaseCommand):
+    help = (
+        "Move leads older than a cutoff into a gzip-compressed NDJSON archive, "
+        "deleting them from the table in small transactions."
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        cutoff = parser.add_mutually_exclusive_group(required=True)
+        cutoff.add_argument(
+            "--days", type=int, help="Archive leads created more than N days ago."
+        )
+        cutoff.add_argument(
+            "--before",
+            type=datetime.date.fromisoformat,
+            help="Archive leads created before this date (YYYY-MM-DD).",
+        )
+        parser.add_argument("--batch-size", type=int, default=500)
+        parser.add_argument(
+            "--output-dir",
+            default=str(settings.LEAD_ARCHIVE_DIR),
+            help="Directory for the archive files.",
+        )
+        parser.add_argument(
+            "--include-unsynced",
+            action="store_true",
+            help="Also archive leads that have not reached GetResponse yet.",
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        if options["days"] is not None:
+            if options["days"] < 0:
+                raise CommandError("--days must not be negative.")
+            cutoff = timezone.now() - datetime.timedelta(days=options["days"])
+        else:
+            cutoff = timezone.make_aware(
+                datetime.datetime.combine(options["before"], datetime.time.min)
+            )
+        result = archive_leads(
+            cutoff,
+            options["output_dir"],
+            batch_size=options["batch_size"],
+            include_unsynced=options["include_unsynced"],
+        )
+        if not result.archived:
+            self.stdout.write("No leads to archive.")
+            return
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Archived {result.archived} leads in {result.batches} batches "
+                f"to {result.path}"
+            )
+        )
@@ -0,0 +1,86 @@
+from typing import Any
+
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+from django.test.utils import (
+    setup_databases,
+    setup_test_environment,
+    teardown_databases,
+    teardown_test_environment,
+)
+
+from sitecore import benchmark
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark every route in-process (or over a local socket) against a scratch "
+        "test database and compare p50/p95 with benchmarks/baseline.json."
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument("--requests", type=int, default=200)
+        parser.add_argument("--warmup", type=int, default=20)
+        parser.add_argument("--transport", choices=["wsgi", "socket"], default="wsgi")
+        parser.add_argument(
+            "--route",
+            action="append",
+            dest="routes",
+            help="Only benchmark this route name (repeatable).",
+        )
+        parser.add_argument(
+            "--threshold",
+            type=float,
+            default=0.5,
+            help="Allowed slowdown over the baseline, as a fraction (0.5 = +50%%).",
+        )
+        parser.add_argument(
+            "--update-baseline",
+            action="store_true",
+            help="Write the results to benchmarks/baseline.json.",
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        setup_test_environment()
+        old_config = setup_databases(verbosity=0, interactive=False)
+        try:
+            with benchmark.benchmark_settings():
+                report = benchmark.run_benchmarks(
+                    requests=options["requests"],
+                    warmup=options["warmup"],
+                    transport=options["transport"],
+                    routes=options["routes"],
+                )
+        finally:
+            teardown_databases(old_config, verbosity=0)
+            teardown_test_environment()
+
+        baseline = benchmark.load_baseline()
+        known = baseline.get("routes", {})
+        self.stdout.write(
+            f"{'route':<22}{'rps':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}"
+            f"{'base p95':>10}  status"
+        )
+        for name, result in sorted(report.routes.items()):
+            s = result.summary()
+            base = known.get(name, {}).get("p95_ms")
+            self.stdout.write(
+                f"{name:<22}{s['rps']:>9.0f}{s['p50_ms']:>9.2f}{s['p95_ms']:>9.2f}"
+                f"{s['p99_ms']:>9.2f}{base if base is not None else '-':>10}  "
+                f"{','.join(map(str, sorted(result.statuses)))}"
+            )
+
+        if options["update_baseline"]:
+            benchmark.write_baseline(report)
+            self.stdout.write(
+                self.style.SUCCESS(f"Baseline written to {benchmark.BASELINE_PATH}")
+            )
+            return
+        if not known:
+            self.stdout.write("No baseline yet; run with --update-baseline.")
+            return
+        regressions = benchmark.compare(report, baseline, options["threshold"])
+        if regressions:
+            raise CommandError(
+                "Regressions:\n" + "\n".join(f"  {r}" for r in regressions)
+            )
+        self.stdout.write(self.style.SUCCESS("No regressions against the baseline."))
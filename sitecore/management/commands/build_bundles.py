@@ -0,0 +1,33 @@
+from typing import Any
+
+from django.core.management.base import BaseCommand
+
+from sitecore import bundles
+
+
+class Command(BaseCommand):
+    help = "Minify and bundle CSS/JS into ASSET_BUILD_DIR and report page weights."
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        result = bundles.build_bundles()
+        for bundle in result.bundles:
+            self.stdout.write(
+                f"{bundle.name}: {bundle.source_bytes} B -> {bundle.bytes} B "
+                f"({bundle.gzip_bytes} B gzipped) at {bundle.output}"
+            )
+        self.stdout.write("")
+        self.stdout.write(
+            f"{'page':<20} {'HTML before':>12} {'after':>8} "
+            f"{'assets before':>14} {'after':>8}"
+        )
+        for page in bundles.page_report():
+            self.stdout.write(
+                f"{page.route:<20} {page.html_before:>12} {page.html_after:>8} "
+                f"{page.assets_before:>14} {page.assets_after:>8}"
+            )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{len(result.bundles)} bundles: {result.source_bytes} B of sources -> "
+                f"{result.bytes} B minified."
+            )
+        )
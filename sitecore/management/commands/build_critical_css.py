@@ -0,0 +1,22 @@
+from typing import Any
+
+from django.core.management.base import BaseCommand
+
+from sitecore import critical_css
+
+
+class Command(BaseCommand):
+    help = (
+        "Extract per-page critical CSS from css/site.css into ASSET_BUILD_DIR/critical."
+    )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        result = critical_css.build_critical_css()
+        for route, size in sorted(result.pages.items()):
+            self.stdout.write(f"{route}: {size} B inlined")
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{len(result.pages)} pages: {result.extracted} extracted, "
+                f"{result.reused} up to date (full stylesheet {result.stylesheet_bytes} B)."
+            )
+        )
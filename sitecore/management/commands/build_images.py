@@ -0,0 +1,24 @@
+from typing import Any
+
+from django.core.management.base import BaseCommand
+
+from sitecore import images
+
+
+class Command(BaseCommand):
+    help = "Generate responsive WebP/AVIF variants and the image manifest (ASSET_BUILD_DIR)."
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        result = images.build_images()
+        for duplicate, original in result.duplicates:
+            self.stdout.write(
+                f"{duplicate} is identical to {original}; sharing its variants"
+            )
+        after = ", ".join(f"{fmt} {size} B" for fmt, size in result.bytes_after.items())
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{result.sources} images: {result.generated} variants generated, "
+                f"{result.reused} up to date. Full-size originals {result.bytes_before} B"
+                f" -> {after or 'no modern formats available'}"
+            )
+        )
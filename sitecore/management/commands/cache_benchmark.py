@@ -0,0 +1,46 @@
+from typing import Any
+
+from django.core.management.base import BaseCommand, CommandParser
+
+from sitecore.benchmark import CACHE_BACKENDS, run_cache_benchmarks
+
+
+class Command(BaseCommand):
+    help = (
+        "Time get/set/incr on Django's locmem and file-based caches and on "
+        "sitecore.cache.SQLiteCache, then increment one counter from several "
+        "processes at once to show which are shared and which lose updates."
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument("--operations", type=int, default=2000)
+        parser.add_argument("--value-bytes", type=int, default=1024)
+        parser.add_argument("--processes", type=int, default=4)
+        parser.add_argument("--increments", type=int, default=200, help="Per process.")
+        parser.add_argument(
+            "--backend",
+            action="append",
+            dest="backends",
+            choices=list(CACHE_BACKENDS),
+            help="Only this backend (repeatable).",
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        results = run_cache_benchmarks(
+            operations=options["operations"],
+            value_bytes=options["value_bytes"],
+            processes=options["processes"],
+            increments=options["increments"],
+            backends=options["backends"],
+        )
+        self.stdout.write(
+            f"{'backend':<11}{'set us':>9}{'get us':>9}{'miss us':>9}{'incr us':>9}"
+            f"  {'shared':<7}{'increments counted':>20}"
+        )
+        for r in results:
+            m = r.micros
+            counted = f"{r.counted}/{r.expected}" if r.shared else "-"
+            self.stdout.write(
+                f"{r.backend:<11}{m['set']:>9.1f}{m['get']:>9.1f}{m['get_miss']:>9.1f}"
+                f"{m['incr']:>9.1f}  {'yes' if r.shared else 'no':<7}{counted:>20}"
+            )
@@ -0,0 +1,26 @@
+from typing import Any
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from sitecore.storage import find_unhashed_references
+
+
+class Command(BaseCommand):
+    help = (
+        "Fail if any template references a static asset that would not be served under "
+        "a content-hashed URL (hard-coded /static/ paths, ?v= busters, unknown files)."
+    )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        problems = find_unhashed_references()
+        base = str(settings.BASE_DIR) + "/"
+        for ref in problems:
+            self.stderr.write(
+                f"{ref.template.removeprefix(base)}:{ref.line}: {ref.reference} ({ref.problem})"
+            )
+        if problems:
+            raise CommandError(f"{len(problems)} unhashed asset reference(s) found.")
+        self.stdout.write(
+            self.style.SUCCESS("All template asset references are hashed.")
+        )
@@ -0,0 +1,46 @@
+from typing import Any
+
+from django.contrib.staticfiles.management.commands import collectstatic
+from django.core.management.base import CommandParser
+
+from sitecore import bundles, critical_css, images
+
+
+class Command(collectstatic.Command):
+    """collectstatic that first runs the asset build, so generated files are collected
+    (and hashed/compressed by the storage) like any other static file."""
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        super().add_arguments(parser)
+        parser.add_argument(
+            "--skip-asset-build",
+            action="store_true",
+            help="Collect files as they are without regenerating built assets.",
+        )
+
+    def handle(self, **options: Any) -> str | None:
+        if not options["skip_asset_build"]:
+            # self.log() needs this; the base class only sets it later, in collect().
+            self.verbosity = options["verbosity"]
+            self.build_assets()
+        result: str | None = super().handle(**options)
+        return result
+
+    def build_assets(self) -> None:
+        resized = images.build_images()
+        self.log(
+            f"Responsive images: {resized.generated} variants generated, "
+            f"{resized.reused} up to date.",
+            level=1,
+        )
+        bundled = bundles.build_bundles()
+        self.log(
+            f"Bundles: {bundled.source_bytes} B of CSS/JS sources -> {bundled.bytes} B.",
+            level=1,
+        )
+        # After the bundles: critical CSS is extracted from pages that link them.
+        critical = critical_css.build_critical_css()
+        self.log(
+            f"Critical CSS: {critical.extracted} pages extracted, {critical.reused} up to date.",
+            level=1,
+        )
@@ -0,0 +1,37 @@
+from typing import Any
+
+from django.core.management.base import BaseCommand, CommandParser
+
+from sitecore.benchmark import run_compression_benchmarks
+from sitecore.compression import available_encodings
+
+
+class Command(BaseCommand):
+    help = (
+        "Render every page and compare the CPU time of gzip/brotli at several levels "
+        "with the bytes they save and with serving a memoized compressed body."
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument("--rounds", type=int, default=50)
+        parser.add_argument(
+            "--route",
+            action="append",
+            dest="routes",
+            help="Only this route name (repeatable).",
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        results = run_compression_benchmarks(options["rounds"], options["routes"])
+        self.stdout.write(
+            f"{'route':<22}{'encoding':<10}{'bytes':>8}{'out':>8}{'saved':>8}"
+            f"{'us':>9}{'memo us':>9}"
+        )
+        for r in results:
+            self.stdout.write(
+                f"{r.route:<22}{f'{r.encoding}-{r.level}':<10}{r.bytes:>8}"
+                f"{r.compressed_bytes:>8}{r.saved:>8.0%}{r.micros:>9.0f}"
+                f"{r.memoized_micros:>9.1f}"
+            )
+        if "br" not in available_encodings():
+            self.stdout.write("brotli is not installed; only gzip was measured.")
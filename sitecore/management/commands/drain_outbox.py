@@ -0,0 +1,74 @@
+import time
+from typing import Any
+
+from django.core.management.base import BaseCommand, CommandParser
+
+from sitecore import getresponse, outbox
+from sitecore.models import OutboxMessage
+
+
+class Command(BaseCommand):
+    help = (
+        "Deliver pending outbox messages (e.g. GetResponse subscriptions) in batches. "
+        "Run from cron, or with --loop as a long-lived worker."
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument("--batch-size", type=int, default=50)
+        parser.add_argument(
+            "--max-attempts",
+            type=int,
+            default=8,
+            help="Attempts before a message is moved to the dead-letter state.",
+        )
+        parser.add_argument(
+            "--loop",
+            action="store_true",
+            help="Keep draining instead of exiting when idle.",
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=5.0,
+            help="Seconds to sleep when idle (--loop).",
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        kinds = None
+        if not getresponse.is_configured():
+            # Leave GetResponse messages pending instead of burning their attempts.
+            self.stderr.write(
+                "GetResponse not configured; skipping subscription messages."
+            )
+            kinds = [
+                k
+                for k in outbox.HANDLERS
+                if k != OutboxMessage.KIND_GETRESPONSE_SUBSCRIBE
+            ]
+            if not kinds:
+                return
+        total = outbox.DrainResult()
+        while True:
+            result = outbox.drain(
+                batch_size=options["batch_size"],
+                max_attempts=options["max_attempts"],
+                kinds=kinds,
+            )
+            total.sent += result.sent
+            total.deferred += result.deferred
+            total.retried += result.retried
+            total.dead += result.dead
+            if options["loop"] and result.processed:
+                self.stdout.write(
+                    f"{result.sent} sent, {result.deferred} deferred, "
+                    f"{result.retried} retried, {result.dead} dead-lettered"
+                )
+            # A deferral means the upstream is unavailable; stop hammering it this run.
+            if result.deferred or result.processed < options["batch_size"]:
+                if not options["loop"]:
+                    break
+                time.sleep(options["interval"])
+        self.stdout.write(
+            f"Outbox drained: {total.sent} sent, {total.deferred} deferred, "
+            f"{total.retried} retried, {total.dead} dead-lettered"
+        )
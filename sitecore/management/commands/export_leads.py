@@ -0,0 +1,36 @@
+import sys
+from typing import Any
+
+from django.core.management.base import BaseCommand, CommandParser
+
+from sitecore import exports
+from sitecore.models import Lead
+
+
+class Command(BaseCommand):
+    help = "Stream every lead as CSV or NDJSON in constant memory, to stdout or a file."
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument("--format", choices=sorted(exports.FORMATS), default="csv")
+        parser.add_argument(
+            "--output", default="-", help="File to write (default: stdout)."
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=exports.CHUNK_SIZE,
+            help="Rows fetched from the database at a time.",
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        generate = exports.FORMATS[options["format"]][0]
+        blocks = generate(Lead.objects.all(), chunk_size=options["chunk_size"])
+        if options["output"] == "-":
+            for block in blocks:
+                sys.stdout.write(block)
+            sys.stdout.flush()
+            return
+        with open(options["output"], "w", encoding="utf-8", newline="") as fh:
+            for block in blocks:
+                fh.write(block)
+        self.stderr.write(self.style.SUCCESS(f"Wrote {options['output']}"))
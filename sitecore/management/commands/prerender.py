@@ -0,0 +1,30 @@
+from pathlib import Path
+from typing import Any
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandParser
+
+from sitecore.prerender import prerender
+
+
+class Command(BaseCommand):
+    help = (
+        "Render every non-interactive route to static HTML (+ .gz/.br) under "
+        "PRERENDER_ROOT. Run after collectstatic on each deploy."
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            "--output-dir",
+            default=str(settings.PRERENDER_ROOT),
+            help="Directory to write pages to (default: PRERENDER_ROOT).",
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        pages = prerender(Path(options["output_dir"]))
+        for page in pages:
+            br = f", br {page.br_bytes}" if page.br_bytes is not None else ""
+            self.stdout.write(
+                f"{page.path:<28} -> {page.file} ({page.bytes} B, gz {page.gzip_bytes}{br})"
+            )
+        self.stdout.write(self.style.SUCCESS(f"Prerendered {len(pages)} pages"))
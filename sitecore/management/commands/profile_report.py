@@ -0,0 +1,66 @@
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Any
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandParser
+
+from sitecore.profiling import TOKEN_HEADER, hot_functions, issue_token, load_profiles
+
+
+class Command(BaseCommand):
+    help = (
+        "Aggregate the request profiles in PROFILE_DIR into the hottest functions per "
+        "route (own samples: on top of the stack; total: anywhere on it)."
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument("--route", action="append", default=[], dest="routes")
+        parser.add_argument("--top", type=int, default=15)
+        parser.add_argument(
+            "--hours",
+            type=float,
+            default=0,
+            help="Only profiles from the last N hours.",
+        )
+        parser.add_argument(
+            "--folded",
+            type=Path,
+            help="Also write all matching stacks merged into one collapsed-stack file "
+            "(for flamegraph.pl or speedscope).",
+        )
+        parser.add_argument(
+            "--token",
+            action="store_true",
+            help=f"Print an {TOKEN_HEADER} header value that gets a request profiled.",
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        if options["token"]:
+            self.stdout.write(f"{TOKEN_HEADER}: {issue_token()}")
+            self.stdout.write(
+                f"Valid for {settings.PROFILE_TOKEN_MAX_AGE} s, e.g. "
+                f"curl -H '{TOKEN_HEADER}: ...' https://<site>/free-guide/"
+            )
+            return
+        since = time.time() - options["hours"] * 3600 if options["hours"] else 0.0
+        profiles = load_profiles(Path(settings.PROFILE_DIR), options["routes"], since)
+        if not profiles:
+            self.stdout.write(f"No profiles in {settings.PROFILE_DIR}.")
+            return
+        everything: Counter[str] = Counter()
+        for route, (requests, counts) in sorted(profiles.items()):
+            samples = sum(counts.values())
+            everything.update(counts)
+            self.stdout.write(f"{route}: {requests} requests, {samples} samples")
+            self.stdout.write(f"  {'own %':>6} {'total %':>7}  function")
+            for fn in hot_functions(counts, options["top"]):
+                self.stdout.write(
+                    f"  {fn.own / samples:>6.1%} {fn.total / samples:>7.1%}  {fn.name}"
+                )
+        if options["folded"]:
+            options["folded"].write_text(
+                "".join(f"{stack} {n}\n" for stack, n in everything.items())
+            )
+            self.stdout.write(f"Wrote {options['folded']}")
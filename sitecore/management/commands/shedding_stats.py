@@ -0,0 +1,24 @@
+from typing import Any
+
+from django.core.management.base import BaseCommand
+
+from sitecore.shedding import get_shedder
+
+# Outcomes counted by sitecore.shedding, in the order a POST meets them.
+OUTCOMES = ("rate_limited", "honeypot", "passed", "duplicate")
+
+
+class Command(BaseCommand):
+    help = (
+        "Show how many free-guide POSTs were rate limited, caught by the honeypot, "
+        "passed through, or short-circuited as recent duplicates (all workers)."
+    )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        counts = get_shedder().store.counts()
+        for name in OUTCOMES:
+            self.stdout.write(f"{name:<14}{counts.get(name, 0):>10}")
+        self.stdout.write(
+            "Counts reach the shared file every few seconds per worker, so the last "
+            "moments of traffic may not be included yet."
+        )
@@ -0,0 +1,35 @@
+import tempfile
+from pathlib import Path
+from typing import Any
+
+from django.core.management.base import BaseCommand, CommandParser
+
+from sitecore.db import measure_contention
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure lock waits for concurrent free-guide writes from several processes, "
+        "against a scratch SQLite file (never the configured database)."
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument("--workers", type=int, default=8)
+        parser.add_argument(
+            "--writes", type=int, default=200, help="Writes per worker."
+        )
+        parser.add_argument(
+            "--compare",
+            action="store_true",
+            help="Also run with Django's stock SQLite settings for comparison.",
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        modes = [True, False] if options["compare"] else [True]
+        with tempfile.TemporaryDirectory() as tmp:
+            for tuned in modes:
+                path = Path(tmp) / f"contention-{'tuned' if tuned else 'stock'}.sqlite3"
+                report = measure_contention(
+                    str(path), options["workers"], options["writes"], tuned
+                )
+                self.stdout.write(report.summary())
@@ -0,0 +1,97 @@
+import json
+import statistics
+from typing import Any
+
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+
+from sitecore.warmup import StartupProfile, profile_startup
+
+
+def _median(profiles: list[StartupProfile]) -> StartupProfile:
+    first = profiles[0]
+    return StartupProfile(
+        warm=first.warm,
+        phases={
+            k: statistics.median(p.phases.get(k, 0.0) for p in profiles)
+            for k in first.phases
+        },
+        imports={
+            k: statistics.median(p.imports.get(k, 0.0) for p in profiles)
+            for k in first.imports
+        },
+        statuses=first.statuses,
+    )
+
+
+class Command(BaseCommand):
+    help = (
+        "Start fresh interpreters the way a new Passenger worker starts and break the "
+        "time to its first response down into imports, Django setup, warm-up and the "
+        "first two requests, with and without WARMUP_ON_START."
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument("--runs", type=int, default=3, help="Median of this many.")
+        parser.add_argument("--path", default="/", help="Path of the first request.")
+        parser.add_argument(
+            "--top", type=int, default=15, help="Packages listed by import time."
+        )
+        parser.add_argument(
+            "--json", action="store_true", help="Machine-readable output."
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        if options["runs"] < 1:
+            raise CommandError("--runs must be at least 1")
+        try:
+            cold, warm = (
+                _median(
+                    [
+                        profile_startup(w, options["path"])
+                        for _ in range(options["runs"])
+                    ]
+                )
+                for w in (False, True)
+            )
+        except RuntimeError as e:
+            raise CommandError(str(e)) from e
+
+        if options["json"]:
+            self.stdout.write(
+                json.dumps(
+                    {
+                        "warm" if mode.warm else "cold": {
+                            "phases_ms": {k: v * 1000 for k, v in mode.phases.items()},
+                            "to_first_response_ms": mode.to_first_response * 1000,
+                            "imports_ms": {
+                                k: v * 1000 for k, v in mode.imports.items()
+                            },
+                            "statuses": mode.statuses,
+                        }
+                        for mode in (cold, warm)
+                    },
+                    indent=2,
+                )
+            )
+            return
+
+        self.stdout.write(f"{'phase':<26}{'cold ms':>10}{'warm ms':>10}")
+        for name in dict.fromkeys([*warm.phases, *cold.phases]):
+            c, w = cold.phases.get(name), warm.phases.get(name)
+            self.stdout.write(
+                f"{name:<26}{'-' if c is None else f'{c * 1000:.1f}':>10}"
+                f"{'-' if w is None else f'{w * 1000:.1f}':>10}"
+            )
+        self.stdout.write(
+            f"{'to first response':<26}{cold.to_first_response * 1000:>10.1f}"
+            f"{warm.to_first_response * 1000:>10.1f}"
+        )
+        self.stdout.write(f"responses: {', '.join(cold.statuses)}")
+
+        total = sum(cold.imports.values())
+        self.stdout.write(
+            f"\nImport self-time by package (cold, {total * 1000:.0f} ms total)"
+        )
+        top = sorted(cold.imports.items(), key=lambda kv: kv[1], reverse=True)
+        for package, seconds in top[: options["top"]]:
+            self.stdout.write(f"  {package:<24}{seconds * 1000:>8.1f} ms")
@@ -0,0 +1,66 @@
+from typing import Any
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+
+from sitecore import getresponse
+from sitecore.leadsync import Checkpoint, SyncStats, sync_leads
+
+
+class Command(BaseCommand):
+    help = (
+        "Push every lead that has not reached GetResponse yet (e.g. after an outage). "
+        "Resumable: progress is checkpointed after each batch."
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            "--workers", type=int, default=8, help="Concurrent API requests."
+        )
+        parser.add_argument(
+            "--rps", type=float, default=10.0, help="Maximum API requests per second."
+        )
+        parser.add_argument("--batch-size", type=int, default=500)
+        parser.add_argument(
+            "--checkpoint",
+            default=str(settings.RUNTIME_DIR / "sync_leads.checkpoint.json"),
+            help="File used to resume an interrupted run.",
+        )
+        parser.add_argument(
+            "--restart", action="store_true", help="Ignore any existing checkpoint."
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        if not getresponse.is_configured():
+            raise CommandError(
+                "GetResponse is not configured (GETRESPONSE_API_KEY/LIST_ID)."
+            )
+        checkpoint = Checkpoint(options["checkpoint"])
+        if options["restart"]:
+            checkpoint.clear()
+        elif resume_from := checkpoint.load():
+            self.stdout.write(f"Resuming after lead id {resume_from}")
+
+        def progress(stats: SyncStats) -> None:
+            self.stdout.write(
+                f"{stats.processed} processed ({stats.synced} synced, {stats.failed} failed), "
+                f"{stats.rate:.1f} leads/s"
+            )
+
+        try:
+            stats = sync_leads(
+                workers=options["workers"],
+                rps=options["rps"],
+                batch_size=options["batch_size"],
+                checkpoint=checkpoint,
+                progress=progress,
+            )
+        except getresponse.CircuitOpenError as e:
+            raise CommandError(
+                f"Stopped: {e}. Rerun to resume from the checkpoint."
+            ) from e
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Done: {stats.synced} synced, {stats.failed} failed, {stats.rate:.1f} leads/s"
+            )
+        )
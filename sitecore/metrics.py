@@ -0,0 +1,514 @@
+"""Request instrumentation aggregated across worker processes.
+
+``TimingMiddleware`` measures every request and, through a context variable, collects
+what happened inside it: database queries (an execute wrapper on every connection),
+template rendering (``TimedDjangoTemplates``, the template backend configured in
+settings) and outbound GetResponse calls (``span``). Each response gets a
+``Server-Timing`` header, and the numbers go into per-route Prometheus metrics.
+
+Each process owns one file, ``METRICS_DIR/values-<pid>.bin``, holding a memory-mapped
+table of ``sample key -> float64``. Recording a sample is a dict lookup and a
+``struct.pack_into``, with no locking between processes and no system call. Histogram
+buckets are stored per bucket rather than cumulatively, so an observation touches
+three values (bucket, sum and count). ``/metrics`` sums every file. Files left by
+exited workers are folded into ``values-archive.json``, so their counts survive
+Passenger recycling workers.
+"""
+
+import contextlib
+import hmac
+import json
+import mmap
+import os
+import re
+import struct
+import threading
+import time
+from collections import defaultdict
+from collections.abc import Callable, Iterator
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connection
+from django.db.backends.signals import connection_created
+from django.http import HttpRequest, HttpResponse
+from django.template.backends.django import DjangoTemplates
+from django.template.backends.django import Template as DjangoTemplate
+
+try:
+    import fcntl
+except ImportError:  # Windows: dead workers' files are simply left in place
+    fcntl = None  # type: ignore[assignment]
+
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# name -> (type, help); histograms are recorded with observe(), the rest with inc().
+FAMILIES = {
+    "http_request_duration_seconds": (
+        "histogram",
+        "Time from the first middleware to the response, by route.",
+    ),
+    "http_request_db_seconds_total": ("counter", "Time spent in database queries."),
+    "http_request_db_queries_total": ("counter", "Database queries executed."),
+    "http_request_template_seconds_total": (
+        "counter",
+        "Time spent rendering templates.",
+    ),
+    "getresponse_request_duration_seconds": (
+        "histogram",
+        "GetResponse API calls, from the web workers and the outbox worker.",
+    ),
+    "lead_shed_total": (
+        "counter",
+        "Free-guide POSTs by load-shedding outcome (sitecore.shedding).",
+    ),
+    "scanner_rejects_total": (
+        "counter",
+        "Scanner probes answered early, by matching rule (sitecore.scanners).",
+    ),
+}
+
+_HEADER = struct.Struct("<Q")  # bytes in use, including the header
+_KEYLEN = struct.Struct("<I")
+_VALUE = struct.Struct("<d")
+_INITIAL_SIZE = 64 * 1024
+_ARCHIVE = "values-archive.json"
+_FILE_RE = re.compile(r"values-(\d+)\.bin$")
+
+
+class ValueFile:
+    """Append-only ``key -> float`` table in a memory-mapped file, one writer process.
+
+    An entry is a length-prefixed key padded to 8 bytes followed by its value; the
+    header records how many bytes are in use and is written last, so a reader never
+    sees a half-written entry.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+        self._offsets: dict[str, int] = {}
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+        size = os.fstat(self._fd).st_size
+        if size < _INITIAL_SIZE:
+            os.ftruncate(self._fd, _INITIAL_SIZE)
+            size = _INITIAL_SIZE
+        self._map = mmap.mmap(self._fd, size)
+        used: int = _HEADER.unpack_from(self._map, 0)[0]
+        if used < _HEADER.size:
+            used = _HEADER.size
+            _HEADER.pack_into(self._map, 0, used)
+        # A reused pid continues the previous owner's file.
+        for key, offset in _entries(self._map, used):
+            self._offsets[key] = offset
+        self._used = used
+
+    def add(self, key: str, amount: float) -> None:
+        with self._lock:
+            offset = self._offsets.get(key)
+            if offset is None:
+                offset = self._append(key)
+            value = _VALUE.unpack_from(self._map, offset)[0]
+            _VALUE.pack_into(self._map, offset, value + amount)
+
+    def _append(self, key: str) -> int:
+        raw = key.encode()
+        padded = (_KEYLEN.size + len(raw) + 7) // 8 * 8
+        needed = self._used + padded + _VALUE.size
+        if needed > len(self._map):
+            size = len(self._map)
+            while size < needed:
+                size *= 2
+            os.ftruncate(self._fd, size)
+            self._map.close()
+            self._map = mmap.mmap(self._fd, size)
+        _KEYLEN.pack_into(self._map, self._used, len(raw))
+        self._map[self._used + _KEYLEN.size : self._used + _KEYLEN.size + len(raw)] = (
+            raw
+        )
+        offset = self._used + padded
+        _VALUE.pack_into(self._map, offset, 0.0)
+        self._used = offset + _VALUE.size
+        _HEADER.pack_into(self._map, 0, self._used)
+        self._offsets[key] = offset
+        return offset
+
+
+def _entries(buf: Any, used: int) -> Iterator[tuple[str, int]]:
+    pos = _HEADER.size
+    while pos + _KEYLEN.size <= used:
+        (length,) = _KEYLEN.unpack_from(buf, pos)
+        key = bytes(buf[pos + _KEYLEN.size : pos + _KEYLEN.size + length]).decode()
+        offset = pos + (_KEYLEN.size + length + 7) // 8 * 8
+        if offset + _VALUE.size > used:
+            break
+        yield key, offset
+        pos = offset + _VALUE.size
+
+
+def read_values(path: Path) -> dict[str, float]:
+    data = path.read_bytes()
+    if len(data) < _HEADER.size:
+        return {}
+    used = min(_HEADER.unpack_from(data, 0)[0], len(data))
+    return {key: _VALUE.unpack_from(data, off)[0] for key, off in _entries(data, used)}
+
+
+class Registry:
+    """Records samples into this process's ValueFile."""
+
+    def __init__(self, directory: str | os.PathLike[str]) -> None:
+        self.directory = Path(directory)
+        self._file: ValueFile | None = None
+        self._pid = 0
+
+    def _values(self) -> ValueFile:
+        if self._file is None or self._pid != os.getpid():
+            self._file = ValueFile(self.directory / f"values-{os.getpid()}.bin")
+            self._pid = os.getpid()
+        return self._file
+
+    def inc(self, name: str, labels: dict[str, str], amount: float = 1.0) -> None:
+        self._values().add(f"{name}{{{_labels(labels)}}}", amount)
+
+    def observe(self, name: str, labels: dict[str, str], seconds: float) -> None:
+        le = next((f"{b}" for b in BUCKETS if seconds <= b), "+Inf")
+        values = self._values()
+        text = _labels(labels)
+        values.add(f'{name}_bucket{{{text},le="{le}"}}', 1)
+        values.add(f"{name}_sum{{{text}}}", seconds)
+        values.add(f"{name}_count{{{text}}}", 1)
+
+    def collect(self) -> dict[str, float]:
+        """Sum of every process's samples, folding files of exited processes first."""
+        self._fold_dead_files()
+        totals: dict[str, float] = defaultdict(float)
+        archive = self.directory / _ARCHIVE
+        if archive.exists():
+            for key, value in json.loads(archive.read_text()).items():
+                totals[key] += value
+        for path in self.directory.glob("values-*.bin"):
+            with contextlib.suppress(OSError):
+                for key, value in read_values(path).items():
+                    totals[key] += value
+        return dict(totals)
+
+    def _fold_dead_files(self) -> None:
+        if fcntl is None or not self.directory.is_dir():
+            return
+        with open(self.directory / "archive.lock", "a") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            dead = []
+            for path in self.directory.glob("values-*.bin"):
+                match = _FILE_RE.search(path.name)
+                if match and not _alive(int(match.group(1))):
+                    dead.append(path)
+            if not dead:
+                return
+            archive = self.directory / _ARCHIVE
+            totals: dict[str, float] = defaultdict(float)
+            if archive.exists():
+                totals.update(json.loads(archive.read_text()))
+            for path in dead:
+                for key, value in read_values(path).items():
+                    totals[key] += value
+            tmp = archive.with_suffix(".tmp")
+            tmp.write_text(json.dumps(totals))
+            os.replace(tmp, archive)
+            for path in dead:
+                path.unlink()
+
+
+def _alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(labels: dict[str, str]) -> str:
+    return ",".join(f'{k}="{_escape(v)}"' for k, v in sorted(labels.items()))
+
+
+_registry: Registry | None = None
+_registry_lock = threading.Lock()
+
+
+def registry() -> Registry:
+    """The process-wide registry, rebuilt if ``METRICS_DIR`` changes."""
+    global _registry
+    directory = Path(settings.METRICS_DIR)
+    with _registry_lock:
+        if _registry is None or _registry.directory != directory:
+            _registry = Registry(directory)
+        return _registry
+
+
+def render_prometheus(samples: dict[str, float]) -> str:
+    """Prometheus text exposition format (0.0.4) for summed samples."""
+    by_family: dict[str, list[tuple[str, float]]] = defaultdict(list)
+    for key, value in samples.items():
+        name = key.split("{", 1)[0]
+        family = re.sub(r"_(bucket|sum|count)$", "", name)
+        if family not in FAMILIES:
+            family = name
+        by_family[family].append((key, value))
+    lines = []
+    for family in sorted(by_family):
+        kind, help_text = FAMILIES.get(family, ("untyped", ""))
+        lines.append(f"# HELP {family} {help_text}")
+        lines.append(f"# TYPE {family} {kind}")
+        rows = sorted(by_family[family])
+        if kind == "histogram":
+            rows = _cumulative(family, rows)
+        lines.extend(f"{key} {_number(value)}" for key, value in rows)
+    return "\n".join(lines) + "\n"
+
+
+def _cumulative(family: str, rows: list[tuple[str, float]]) -> list[tuple[str, float]]:
+    # Stored buckets count their own interval; exposition wants running totals.
+    bucket_re = re.compile(rf'^{family}_bucket\{{(.*),le="([^"]+)"\}}$')
+    per_series: dict[str, dict[str, float]] = defaultdict(dict)
+    out = []
+    for key, value in rows:
+        match = bucket_re.match(key)
+        if match:
+            per_series[match.group(1)][match.group(2)] = value
+        else:
+            out.append((key, value))
+    for labels, counts in sorted(per_series.items()):
+        running = 0.0
+        for le in [f"{b}" for b in BUCKETS] + ["+Inf"]:
+            running += counts.get(le, 0.0)
+            out.append((f'{family}_bucket{{{labels},le="{le}"}}', running))
+    return out
+
+
+def _number(value: float) -> str:
+    value = float(value)
+    return str(int(value)) if value.is_integer() else repr(value)
+
+
+@dataclass
+class RequestTimings:
+    db_seconds: float = 0.0
+    db_queries: int = 0
+    template_seconds: float = 0.0
+    spans: dict[str, float] = field(default_factory=dict)
+
+
+_current: ContextVar[RequestTimings | None] = ContextVar(
+    "request_timings", default=None
+)
+
+
+@contextlib.contextmanager
+def span(name: str) -> Iterator[None]:
+    """Time a block as part of the current request (e.g. an outbound API call)."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings = _current.get()
+        if timings is not None:
+            elapsed = time.perf_counter() - started
+            timings.spans[name] = timings.spans.get(name, 0.0) + elapsed
+
+
+def observe_getresponse(seconds: float, outcome: str) -> None:
+    if settings.METRICS_ENABLED:
+        registry().observe(
+            "getresponse_request_duration_seconds", {"outcome": outcome}, seconds
+        )
+
+
+class TimedTemplate(DjangoTemplate):
+    def render(
+        self, context: dict[str, Any] | None = None, request: HttpRequest | None = None
+    ) -> str:
+        timings = _current.get()
+        if timings is None:
+            return str(super().render(context, request))
+        started = time.perf_counter()
+        try:
+            return str(super().render(context, request))
+        finally:
+            timings.template_seconds += time.perf_counter() - started
+
+
+class TimedDjangoTemplates(DjangoTemplates):
+    """The stock Django backend, timing each top-level render for TimingMiddleware."""
+
+    def from_string(self, template_code: str) -> TimedTemplate:
+        return TimedTemplate(self.engine.from_string(template_code), self)
+
+    def get_template(self, template_name: str) -> TimedTemplate:
+        template = super().get_template(template_name)
+        return TimedTemplate(template.template, self)
+
+
+def _time_query(
+    execute: Callable[..., Any], sql: str, params: Any, many: bool, context: Any
+) -> Any:
+    # The request is found through the context, which asgiref copies into the threads
+    # async views run their queries in, so one wrapper serves every connection.
+    timings = _current.get()
+    if timings is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        timings.db_seconds += time.perf_counter() - started
+        timings.db_queries += 1
+
+
+def _install_query_timer(connection: Any, **kwargs: Any) -> None:
+    if _time_query not in connection.execute_wrappers:
+        # First, so connection.execute_wrapper() blocks opened later never pop it.
+        connection.execute_wrappers.insert(0, _time_query)
+
+
+connection_created.connect(_install_query_timer)
+
+
+def _route(request: HttpRequest) -> str:
+    match = getattr(request, "resolver_match", None)
+    if match is not None:
+        return str(match.view_name)
+    if request.path.startswith(settings.STATIC_URL or "/static/"):
+        return "static"
+    return "unmatched"
+
+
+class TimingMiddleware:
+    """Per-request timing: ``Server-Timing`` header plus per-route metrics."""
+
+    async_capable = True
+    sync_capable = True
+
+    def __init__(self, get_response: Callable[[HttpRequest], HttpResponse]):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request: HttpRequest) -> HttpResponse:
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not settings.METRICS_ENABLED:
+            return self.get_response(request)
+        # Connections opened before this module was imported missed connection_created.
+        _install_query_timer(connection)
+        timings = RequestTimings()
+        token = _current.set(timings)
+        started = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self._finish(request, response, timings, started)
+
+    async def __acall__(self, request: HttpRequest) -> HttpResponse:
+        if not settings.METRICS_ENABLED:
+            return await self.get_response(request)
+        timings = RequestTimings()
+        token = _current.set(timings)
+        started = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self._finish(request, response, timings, started)
+
+    def _finish(
+        self,
+        request: HttpRequest,
+        response: HttpResponse,
+        timings: RequestTimings,
+        started: float,
+    ) -> HttpResponse:
+        elapsed = time.perf_counter() - started
+        self._record(request, response, timings, elapsed)
+        if settings.METRICS_SERVER_TIMING:
+            response["Server-Timing"] = _server_timing(timings, elapsed)
+        return response
+
+    def _record(
+        self,
+        request: HttpRequest,
+        response: HttpResponse,
+        timings: RequestTimings,
+        elapsed: float,
+    ) -> None:
+        route = _route(request)
+        reg = registry()
+        reg.observe(
+            "http_request_duration_seconds",
+            {
+                "route": route,
+                "method": request.method or "",
+                "status": f"{response.status_code // 100}xx",
+            },
+            elapsed,
+        )
+        labels = {"route": route}
+        if timings.db_queries:
+            reg.inc("http_request_db_seconds_total", labels, timings.db_seconds)
+            reg.inc("http_request_db_queries_total", labels, timings.db_queries)
+        if timings.template_seconds:
+            reg.inc(
+                "http_request_template_seconds_total", labels, timings.template_seconds
+            )
+
+
+def _server_timing(timings: RequestTimings, elapsed: float) -> str:
+    parts = [f"total;dur={elapsed * 1000:.1f}"]
+    if timings.db_queries:
+        parts.append(
+            f'db;dur={timings.db_seconds * 1000:.1f};desc="{timings.db_queries} queries"'
+        )
+    if timings.template_seconds:
+        parts.append(f"tpl;dur={timings.template_seconds * 1000:.1f}")
+    for name, seconds in sorted(timings.spans.items()):
+        parts.append(f"{name};dur={seconds * 1000:.1f}")
+    return ", ".join(parts)
+
+
+def _metrics_allowed(request: HttpRequest) -> bool:
+    token = settings.METRICS_TOKEN
+    if not token:
+        # Behind a same-host proxy every request comes from localhost, so REMOTE_ADDR
+        # proves nothing: without a token the endpoint does not exist.
+        return False
+    scheme, _, given = request.headers.get("Authorization", "").partition(" ")
+    return scheme.lower() == "bearer" and hmac.compare_digest(
+        given.strip().encode(), token.encode()
+    )
+
+
+def metrics_view(request: HttpRequest) -> HttpResponse:
+    if not _metrics_allowed(request):
+        return HttpResponse(status=404)
+    samples = registry().collect()
+    from .shedding import get_shedder
+
+    with contextlib.suppress(Exception):
+        for outcome, value in get_shedder().store.counts().items():
+            samples[f'lead_shed_total{{outcome="{outcome}"}}'] = float(value)
+    response = HttpResponse(
+        render_prometheus(samples), content_type="text/plain; version=0.0.4"
+    )
+    response["Cache-Control"] = "no-store"
+    return response
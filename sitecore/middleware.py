@@ -1,6 +1,50 @@
-from collections.abc import Callable
+from collections.abc import Awaitable, Callable
 
+from asgiref.sync import (
+    async_to_sync,
+    iscoroutinefunction,
+    markcoroutinefunction,
+    sync_to_async,
+)
+from django.conf import settings
+from django.contrib.messages.storage.cookie import CookieStorage
 from django.http import HttpRequest, HttpResponse
+from django.urls import Resolver404, ResolverMatch, resolve
+from whitenoise.middleware import WhiteNoiseMiddleware
+
+
+class StaticFilesMiddleware(WhiteNoiseMiddleware):
+    """WhiteNoise with a one-year lifetime for content-hashed files.
+
+    Files whose name carries the manifest hash (``css/site.3f2a9c1e7b4d.css``) are sent
+    with ``Cache-Control: max-age=31536000, public, immutable``; everything else keeps
+    ``WHITENOISE_MAX_AGE``.
+    """
+
+    FOREVER = 365 * 24 * 60 * 60
+
+    # WhiteNoise 6 is sync-only; a sync middleware would push every ASGI request through
+    # Django's single sync thread, so the (in-memory) file lookup is repeated here.
+    async_capable = True
+
+    def __init__(self, get_response: Callable[..., object], *args: object) -> None:
+        super().__init__(get_response, *args)
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request: HttpRequest) -> HttpResponse | Awaitable[HttpResponse]:
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        return super().__call__(request)
+
+    async def __acall__(self, request: HttpRequest) -> HttpResponse:
+        if self.autorefresh:
+            static_file = self.find_file(request.path_info)
+        else:
+            static_file = self.files.get(request.path_info)
+        if static_file is not None:
+            return self.serve(static_file, request)
+        return await self.get_response(request)
 
 
 class PermissionsPolicyMiddleware:
@@ -17,11 +61,23 @@ class PermissionsPolicyMiddleware:
     site and avoids warnings from embeds such as Calendly.
     """
 
+    async_capable = True
+    sync_capable = True
+
     def __init__(self, get_response: Callable[[HttpRequest], HttpResponse]):
         self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
 
     def __call__(self, request: HttpRequest) -> HttpResponse:
-        response = self.get_response(request)
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        return self._add_headers(self.get_response(request))
+
+    async def __acall__(self, request: HttpRequest) -> HttpResponse:
+        return self._add_headers(await self.get_response(request))
+
+    def _add_headers(self, response: HttpResponse) -> HttpResponse:
         # Add headers defensively; never let a header formatting issue break the response.
         try:
             # Allow payment feature to avoid console warnings on pages with embeds/extensions.
@@ -34,3 +90,75 @@ class PermissionsPolicyMiddleware:
             # Silently ignore header set failures; functional content must still be served.
             pass
         return response
+
+
+def _message_cookie() -> str:
+    """The cookie whose presence means flash messages may be waiting."""
+    if settings.MESSAGE_STORAGE.endswith(".SessionStorage"):
+        return str(settings.SESSION_COOKIE_NAME)
+    # Cookie and fallback storage; the fallback only uses the session once the
+    # cookie is full, and then leaves a marker in the cookie.
+    return str(CookieStorage.cookie_name)
+
+
+class StatelessPageMiddleware:
+    """Serve routes declared ``cache_policy(..., stateless=True)`` directly.
+
+    Sits above the session, common, CSRF, auth and messages middleware. A GET/HEAD for a
+    stateless route, from a visitor with no flash-message cookie, is resolved here and
+    handed straight to the view, so the response carries no ``Vary: Cookie`` and no
+    cookies and stays publicly cacheable. Anything else (other routes, POSTs, pending
+    messages, 404s and slash redirects) takes the full stack. Only middleware that just
+    add response headers (X-Frame-Options, Permissions-Policy) sit above this one.
+    """
+
+    async_capable = True
+    sync_capable = True
+
+    def __init__(self, get_response: Callable[[HttpRequest], HttpResponse]):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def _match(self, request: HttpRequest) -> ResolverMatch | None:
+        if (
+            request.method not in ("GET", "HEAD")
+            or not settings.STATELESS_FAST_PATH
+            or request.COOKIES.get(_message_cookie())
+        ):
+            return None
+        try:
+            match = resolve(request.path_info, getattr(request, "urlconf", None))
+        except Resolver404:
+            return None
+        policy = getattr(match.func, "cache_policy", None)
+        if policy is None or not policy.stateless:
+            return None
+        request.resolver_match = match
+        return match
+
+    def __call__(self, request: HttpRequest) -> HttpResponse:
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        match = self._match(request)
+        if match is None:
+            return self.get_response(request)
+        view = match.func
+        if iscoroutinefunction(view):
+            view = async_to_sync(view)
+        return self._finish(view(request, *match.args, **match.kwargs))
+
+    async def __acall__(self, request: HttpRequest) -> HttpResponse:
+        match = self._match(request)
+        if match is None:
+            return await self.get_response(request)
+        view = match.func
+        if not iscoroutinefunction(view):
+            view = sync_to_async(view)
+        return self._finish(await view(request, *match.args, **match.kwargs))
+
+    def _finish(self, response: HttpResponse) -> HttpResponse:
+        # What CommonMiddleware would have added.
+        if not response.streaming and not response.has_header("Content-Length"):
+            response.headers["Content-Length"] = str(len(response.content))
+        return response
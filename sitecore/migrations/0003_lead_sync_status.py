@@ -0,0 +1,31 @@
+# Generated by Django 5.2.5 on 2026-10-17 20:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("sitecore", "0002_outboxmessage"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="lead",
+            name="sync_error",
+            field=models.CharField(blank=True, max_length=255),
+        ),
+        migrations.AddField(
+            model_name="lead",
+            name="synced_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name="lead",
+            index=models.Index(
+                condition=models.Q(("synced_at__isnull", True)),
+                fields=["id"],
+                name="sitecore_lead_unsynced_idx",
+            ),
+        ),
+    ]
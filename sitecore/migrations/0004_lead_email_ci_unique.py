@@ -0,0 +1,43 @@
+# Generated by Django 5.2.5 on 2026-10-17 20:59
+
+from typing import Any
+
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+def merge_case_duplicates(apps: Any, schema_editor: Any) -> None:
+    """Lower-case stored emails, folding rows that differ only in case into the oldest."""
+    Lead = apps.get_model("sitecore", "Lead")
+    groups: dict[str, list[Any]] = {}
+    for lead in Lead.objects.order_by("id").iterator():
+        groups.setdefault(lead.email.strip().lower(), []).append(lead)
+    for email, (original, *duplicates) in groups.items():
+        if not duplicates and original.email == email:
+            continue
+        for dup in duplicates:
+            original.name = original.name or dup.name
+            original.consent = original.consent or dup.consent
+            original.synced_at = original.synced_at or dup.synced_at
+        # Delete first: the lower-cased address may be taken by one of the duplicates.
+        Lead.objects.filter(pk__in=[dup.pk for dup in duplicates]).delete()
+        original.email = email
+        original.save(update_fields=["email", "name", "consent", "synced_at"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("sitecore", "0003_lead_sync_status"),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_case_duplicates, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name="lead",
+            constraint=models.UniqueConstraint(
+                django.db.models.functions.text.Lower("email"),
+                name="sitecore_lead_email_ci_uniq",
+            ),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.5 on 2026-10-17 21:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("sitecore", "0004_lead_email_ci_unique"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="lead",
+            index=models.Index(fields=["created_at"], name="sitecore_lead_created_idx"),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.5 on 2026-10-17 21:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("sitecore", "0005_lead_created_at_index"),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="lead",
+            name="sitecore_lead_created_idx",
+        ),
+        migrations.AddIndex(
+            model_name="lead",
+            index=models.Index(
+                fields=["created_at", "id"], name="sitecore_lead_created_idx"
+            ),
+        ),
+    ]
@@ -1,4 +1,6 @@
 from django.db import models
+from django.db.models.functions import Lower
+from django.utils import timezone
 
 
 class Lead(models.Model):
@@ -6,6 +8,62 @@ class Lead(models.Model):
     email = models.EmailField(unique=True)
     consent = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
+    # Set once GetResponse has accepted the contact (outbox worker or `sync_leads`).
+    synced_at = models.DateTimeField(null=True, blank=True)
+    sync_error = models.CharField(max_length=255, blank=True)
+
+    class Meta:
+        indexes = [
+            # Only unsynced rows are indexed, so finding the backlog stays cheap
+            # however large the table grows.
+            models.Index(
+                fields=["id"],
+                condition=models.Q(synced_at__isnull=True),
+                name="sitecore_lead_unsynced_idx",
+            ),
+            # Archival (sitecore.exports) and the CRM feed (sitecore.api) walk leads by
+            # (created_at, id).
+            models.Index(fields=["created_at", "id"], name="sitecore_lead_created_idx"),
+        ]
+        constraints = [
+            # Emails are stored lower-cased (sitecore.leads); this keeps writes that
+            # skip normalization from adding a second row for the same address.
+            models.UniqueConstraint(Lower("email"), name="sitecore_lead_email_ci_uniq"),
+        ]
 
     def __str__(self):
         return f"{self.email}"
+
+
+class OutboxMessage(models.Model):
+    """A side effect (e.g. a GetResponse subscription) recorded in the same transaction
+    as the write that caused it, and delivered later by ``manage.py drain_outbox``.
+    """
+
+    KIND_GETRESPONSE_SUBSCRIBE = "getresponse.subscribe"
+
+    class Status(models.TextChoices):
+        PENDING = "pending", "Pending"
+        SENT = "sent", "Sent"
+        DEAD = "dead", "Dead letter"
+
+    kind = models.CharField(max_length=64)
+    payload = models.JSONField(default=dict)
+    status = models.CharField(
+        max_length=16, choices=Status.choices, default=Status.PENDING
+    )
+    attempts = models.PositiveIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["status", "next_attempt_at"], name="sitecore_outbox_due_idx"
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.kind} #{self.pk} ({self.status})"
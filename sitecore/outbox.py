@@ -0,0 +1,266 @@
+"""Transactional outbox for side effects that must not block a request.
+
+Views call :func:`enqueue` inside the same transaction as their own writes, so a
+message exists if and only if the data that caused it was committed. The
+``drain_outbox`` management command later calls :func:`drain` to deliver pending
+messages in batches, retrying failures with exponential backoff until they either
+succeed or are moved to the dead-letter state. A handler raising :class:`Rejected`
+(e.g. GetResponse answering 400 or 422) dead-letters its message on the first attempt.
+
+Under ASGI, async views hand freshly committed messages to :func:`deliver_soon`, which
+delivers them on the event loop right away with the async handlers. It claims each
+message exactly as ``drain`` does, and anything it fails to deliver is left for
+``drain`` to retry.
+"""
+
+import asyncio
+import logging
+import random
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Any
+
+from django.conf import settings
+from django.utils import timezone
+
+from . import getresponse
+from .models import Lead, OutboxMessage
+
+logger = logging.getLogger(__name__)
+
+# Seconds before the first retry; doubled on every further attempt.
+BACKOFF_BASE = 30
+BACKOFF_MAX = 6 * 60 * 60
+# How long a claimed message is hidden from other drainers while it is being delivered.
+LEASE_SECONDS = 120
+MAX_ATTEMPTS = 8
+
+
+class Deferred(Exception):
+    """Raised by a handler to reschedule a message without counting an attempt,
+    e.g. while the upstream's circuit breaker is open.
+    """
+
+    def __init__(self, delay: float, reason: str = "") -> None:
+        super().__init__(reason or f"deferred for {delay:.0f}s")
+        self.delay = delay
+
+
+class Rejected(Exception):
+    """Raised by a handler when the upstream refused the message for good, e.g. an
+    HTTP 400 or 422: it is dead-lettered at once instead of retried.
+    """
+
+
+def _deliver_getresponse_subscribe(payload: dict[str, Any]) -> None:
+    try:
+        getresponse.subscribe(payload.get("name", ""), payload["email"])
+    except getresponse.CircuitOpenError as e:
+        raise Deferred(max(e.retry_after, 1.0), str(e)) from e
+    except getresponse.GetResponseError as e:
+        if e.permanent:
+            raise Rejected(str(e)) from e
+        raise
+    Lead.objects.filter(email=payload["email"]).update(
+        synced_at=timezone.now(), sync_error=""
+    )
+
+
+async def _adeliver_getresponse_subscribe(payload: dict[str, Any]) -> None:
+    try:
+        await getresponse.asubscribe(payload.get("name", ""), payload["email"])
+    except getresponse.CircuitOpenError as e:
+        raise Deferred(max(e.retry_after, 1.0), str(e)) from e
+    except getresponse.GetResponseError as e:
+        if e.permanent:
+            raise Rejected(str(e)) from e
+        raise
+    await Lead.objects.filter(email=payload["email"]).aupdate(
+        synced_at=timezone.now(), sync_error=""
+    )
+
+
+HANDLERS: dict[str, Callable[[dict[str, Any]], None]] = {
+    OutboxMessage.KIND_GETRESPONSE_SUBSCRIBE: _deliver_getresponse_subscribe,
+}
+# Used by deliver_soon; kinds without one wait for drain.
+ASYNC_HANDLERS: dict[str, Callable[[dict[str, Any]], Awaitable[None]]] = {
+    OutboxMessage.KIND_GETRESPONSE_SUBSCRIBE: _adeliver_getresponse_subscribe,
+}
+
+
+@dataclass
+class DrainResult:
+    sent: int = 0
+    deferred: int = 0
+    retried: int = 0
+    dead: int = 0
+    errors: list[str] = field(default_factory=list)
+
+    @property
+    def processed(self) -> int:
+        return self.sent + self.deferred + self.retried + self.dead
+
+
+def enqueue(kind: str, payload: dict[str, Any]) -> OutboxMessage:
+    """Record a message for later delivery. Call inside the caller's transaction."""
+    if kind not in HANDLERS:
+        raise ValueError(f"Unknown outbox message kind: {kind}")
+    return OutboxMessage.objects.create(kind=kind, payload=payload)
+
+
+def enqueue_many(kind: str, payloads: list[dict[str, Any]]) -> list[OutboxMessage]:
+    """Record several messages with one INSERT. Call inside the caller's transaction."""
+    if kind not in HANDLERS:
+        raise ValueError(f"Unknown outbox message kind: {kind}")
+    return OutboxMessage.objects.bulk_create(
+        [OutboxMessage(kind=kind, payload=payload) for payload in payloads]
+    )
+
+
+def backoff_delay(attempts: int) -> float:
+    """Seconds to wait before the next attempt, with +/-20% jitter."""
+    delay = min(BACKOFF_BASE * (2 ** max(attempts - 1, 0)), BACKOFF_MAX)
+    return float(delay * random.uniform(0.8, 1.2))
+
+
+def _claim(message: OutboxMessage, now: datetime) -> bool:
+    """Lease a message so concurrent drainers never deliver it twice."""
+    claimed = OutboxMessage.objects.filter(
+        pk=message.pk,
+        status=OutboxMessage.Status.PENDING,
+        next_attempt_at=message.next_attempt_at,
+    ).update(next_attempt_at=now + timedelta(seconds=LEASE_SECONDS))
+    return bool(claimed == 1)
+
+
+def _settle(
+    message: OutboxMessage,
+    error: Exception | None,
+    max_attempts: int,
+    result: DrainResult,
+    final: bool = False,
+) -> None:
+    """Record the outcome of one delivery attempt on ``message`` (not yet saved)."""
+    if error is None:
+        message.status = OutboxMessage.Status.SENT
+        message.last_error = ""
+        result.sent += 1
+    elif isinstance(error, Deferred):
+        message.attempts -= 1
+        message.last_error = str(error)
+        message.next_attempt_at = timezone.now() + timedelta(seconds=error.delay)
+        result.deferred += 1
+    else:
+        message.last_error = str(error)[:2000]
+        if message.attempts >= max_attempts or final or isinstance(error, Rejected):
+            message.status = OutboxMessage.Status.DEAD
+            result.dead += 1
+            logger.error("Outbox message %s dead-lettered: %s", message.pk, error)
+        else:
+            message.next_attempt_at = timezone.now() + timedelta(
+                seconds=backoff_delay(message.attempts)
+            )
+            result.retried += 1
+            logger.warning(
+                "Outbox message %s failed (attempt %s): %s",
+                message.pk,
+                message.attempts,
+                error,
+            )
+        result.errors.append(f"#{message.pk}: {error}")
+
+
+SETTLED_FIELDS = ["status", "attempts", "next_attempt_at", "last_error", "updated_at"]
+
+
+def drain(
+    batch_size: int = 50,
+    max_attempts: int = MAX_ATTEMPTS,
+    kinds: list[str] | None = None,
+) -> DrainResult:
+    """Deliver one batch of due messages and return what happened to them."""
+    now = timezone.now()
+    result = DrainResult()
+    due = OutboxMessage.objects.filter(
+        status=OutboxMessage.Status.PENDING, next_attempt_at__lte=now
+    )
+    if kinds:
+        due = due.filter(kind__in=kinds)
+    for message in list(due.order_by("next_attempt_at", "pk")[:batch_size]):
+        if not _claim(message, now):
+            continue
+        handler = HANDLERS.get(message.kind)
+        message.attempts += 1
+        try:
+            if handler is None:
+                raise LookupError(
+                    f"No handler for outbox message kind {message.kind!r}"
+                )
+            handler(message.payload)
+        except Exception as e:
+            _settle(message, e, max_attempts, result, final=handler is None)
+        else:
+            _settle(message, None, max_attempts, result)
+        message.save(update_fields=SETTLED_FIELDS)
+    return result
+
+
+async def adeliver(
+    message: OutboxMessage, max_attempts: int = MAX_ATTEMPTS
+) -> DrainResult:
+    """Deliver one just-enqueued message with its async handler, if nobody else has."""
+    result = DrainResult()
+    handler = ASYNC_HANDLERS.get(message.kind)
+    if handler is None:
+        return result
+    now = timezone.now()
+    claimed = await OutboxMessage.objects.filter(
+        pk=message.pk,
+        status=OutboxMessage.Status.PENDING,
+        next_attempt_at=message.next_attempt_at,
+    ).aupdate(next_attempt_at=now + timedelta(seconds=LEASE_SECONDS))
+    if claimed != 1:
+        return result
+    message.attempts += 1
+    try:
+        await handler(message.payload)
+    except Exception as e:
+        _settle(message, e, max_attempts, result)
+    else:
+        _settle(message, None, max_attempts, result)
+    await message.asave(update_fields=SETTLED_FIELDS)
+    return result
+
+
+# Strong references: the event loop only keeps weak ones to running tasks.
+_in_flight: set["asyncio.Task[None]"] = set()
+
+
+async def _deliver_logged(message: OutboxMessage) -> None:
+    try:
+        await adeliver(message)
+    except Exception:
+        # Still claimed; drain picks it up once the lease expires.
+        logger.exception("Immediate delivery of outbox message %s failed", message.pk)
+
+
+def deliver_soon(messages: list[OutboxMessage]) -> list["asyncio.Task[None]"]:
+    """Start delivering ``messages`` on the running event loop without waiting.
+
+    Only meaningful under ASGI, where the loop outlives the request. Messages without a
+    primary key (bulk inserts on SQLite < 3.35 don't return them) are left to ``drain``.
+    """
+    if not settings.OUTBOX_DELIVER_ON_SUBMIT:
+        return []
+    loop = asyncio.get_running_loop()
+    tasks = []
+    for message in messages:
+        if message.pk is None:
+            continue
+        task = loop.create_task(_deliver_logged(message))
+        _in_flight.add(task)
+        task.add_done_callback(_in_flight.discard)
+        tasks.append(task)
+    return tasks
@@ -0,0 +1,277 @@
+"""In-process cache of fully rendered marketing pages.
+
+The content views only depend on the code, templates, static assets, settings and the
+``branding`` context processor, so their finished bytes can be reused until one of
+those changes. Entries live in a bounded LRU keyed by everything the page is built from:
+the path, a digest of the project's Python sources (``code_fingerprint``), the static
+manifest hash (which changes on deploy when any asset does), a fingerprint of the
+template files (rechecked at most once per second) and the ETag ``cache_policy``
+computed for the request, which covers the settings the view reads and the branding.
+Requests carrying flash messages, and responses that used a CSRF token or set cookies,
+bypass the cache so per-visitor content is never shared.
+
+With ``PAGE_CACHE_SHARED`` a page rendered by one worker is also put in the default
+Django cache (the cross-process ``sitecore.cache.SQLiteCache``), so a freshly started
+worker copies it from there instead of rendering it again. Those entries outlive the
+process, which is why the key must cover settings and code as well as templates.
+"""
+
+import contextlib
+import functools
+import hashlib
+import importlib
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from dataclasses import dataclass
+from functools import wraps
+from pathlib import Path
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpRequest, HttpResponse
+from django.template import engines
+
+from .storage import manifest_fingerprint
+
+logger = logging.getLogger(__name__)
+
+# How often (seconds) template mtimes are rescanned to detect edits.
+TEMPLATE_CHECK_INTERVAL = 1.0
+
+
+@dataclass(frozen=True)
+class CachedPage:
+    content: bytes
+    status: int
+    headers: tuple[tuple[str, str], ...]
+
+
+class PageCache:
+    """Thread-safe LRU bounded by entry count and total body bytes."""
+
+    def __init__(
+        self, max_entries: int = 128, max_bytes: int = 8 * 1024 * 1024
+    ) -> None:
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[tuple[str, ...], CachedPage] = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: tuple[str, ...]) -> CachedPage | None:
+        with self._lock:
+            page = self._entries.get(key)
+            if page is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return page
+
+    def set(self, key: tuple[str, ...], page: CachedPage) -> None:
+        if len(page.content) > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= len(old.content)
+            self._entries[key] = page
+            self._bytes += len(page.content)
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= len(evicted.content)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            self.hits = self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+page_cache = PageCache(
+    max_entries=getattr(settings, "PAGE_CACHE_MAX_ENTRIES", 128),
+)
+
+# Shared entries have the same key, so stale ones are never read; the TTL only bounds
+# how long they occupy the shared cache.
+SHARED_TIMEOUT = 24 * 60 * 60
+
+
+def _shared_key(key: tuple[str, ...]) -> str:
+    return "page:" + hashlib.sha256("\0".join(key).encode()).hexdigest()
+
+
+def _shared_get(key: tuple[str, ...]) -> CachedPage | None:
+    if not getattr(settings, "PAGE_CACHE_SHARED", False):
+        return None
+    try:
+        page = cache.get(_shared_key(key))
+    except Exception:
+        logger.warning("Shared page cache read failed", exc_info=True)
+        return None
+    if page is not None:
+        page_cache.set(key, page)
+    return page  # type: ignore[no-any-return]
+
+
+def _shared_set(key: tuple[str, ...], page: CachedPage) -> None:
+    if not getattr(settings, "PAGE_CACHE_SHARED", False):
+        return
+    try:
+        cache.set(_shared_key(key), page, SHARED_TIMEOUT)
+    except Exception:
+        logger.warning("Shared page cache write failed", exc_info=True)
+
+
+_fingerprint = ""
+_fingerprint_checked = 0.0
+_fingerprint_lock = threading.Lock()
+
+
+def template_fingerprint() -> str:
+    """Latest mtime across all template directories, rescanned at most once a second."""
+    global _fingerprint, _fingerprint_checked
+    now = time.monotonic()
+    if now - _fingerprint_checked < TEMPLATE_CHECK_INTERVAL and _fingerprint:
+        return _fingerprint
+    with _fingerprint_lock:
+        latest = 0
+        for directory in engines["django"].template_dirs:
+            for root, _dirs, files in os.walk(directory):
+                for name in files:
+                    try:
+                        latest = max(
+                            latest, os.stat(os.path.join(root, name)).st_mtime_ns
+                        )
+                    except OSError:
+                        continue
+        _fingerprint, _fingerprint_checked = str(latest), now
+    return _fingerprint
+
+
+def _source_files() -> list[Path]:
+    """The Python sources of this app and the settings package."""
+    settings_module = importlib.import_module(os.environ["DJANGO_SETTINGS_MODULE"])
+    settings_file = settings_module.__file__
+    assert settings_file is not None
+    files: list[Path] = []
+    for package in (Path(__file__).parent, Path(settings_file).parent):
+        files.extend(sorted(package.rglob("*.py")))
+    return files
+
+
+@functools.cache
+def code_fingerprint() -> str:
+    """Digest of ``_source_files``.
+
+    Computed once per process: a code change only takes effect after a restart.
+    """
+    digest = hashlib.sha256()
+    for path in _source_files():
+        digest.update(os.path.relpath(path, settings.BASE_DIR).encode())
+        digest.update(path.read_bytes())
+    return digest.hexdigest()[:16]
+
+
+@functools.cache
+def code_modified() -> int:
+    """Newest mtime (seconds) of ``_source_files`` and the ``.env`` file settings read.
+
+    Computed once per process, like ``code_fingerprint``: both change only on restart.
+    """
+    newest = 0
+    for path in [*_source_files(), Path(settings.BASE_DIR) / ".env"]:
+        with contextlib.suppress(OSError):
+            newest = max(newest, int(path.stat().st_mtime))
+    return newest
+
+
+def has_pending_messages(request: HttpRequest) -> bool:
+    storage = getattr(request, "_messages", None)
+    return storage is not None and len(storage) > 0
+
+
+def _cacheable(request: HttpRequest, response: HttpResponse) -> bool:
+    return (
+        response.status_code == 200
+        and not response.streaming
+        and not response.cookies
+        and not request.META.get("CSRF_COOKIE_NEEDS_UPDATE")
+        and not request.META.get("CSRF_COOKIE_USED")
+    )
+
+
+def cache_page_response(
+    view: Callable[..., HttpResponse],
+) -> Callable[..., HttpResponse]:
+    """Serve a content view's rendered bytes from ``page_cache`` when possible."""
+
+    def lookup(
+        request: HttpRequest,
+    ) -> tuple[tuple[str, ...] | None, HttpResponse | None]:
+        if (
+            not getattr(settings, "PAGE_CACHE_ENABLED", True)
+            or request.method not in ("GET", "HEAD")
+            or has_pending_messages(request)
+        ):
+            return None, None
+        key = (
+            request.path,
+            code_fingerprint(),
+            manifest_fingerprint(),
+            template_fingerprint(),
+            # Set by cache_policy: the page's settings and branding.
+            getattr(request, "page_etag", ""),
+        )
+        page = page_cache.get(key) or _shared_get(key)
+        if page is None:
+            return key, None
+        response = HttpResponse(page.content, status=page.status)
+        for header, value in page.headers:
+            response[header] = value
+        return key, response
+
+    def store(
+        key: tuple[str, ...] | None, request: HttpRequest, response: HttpResponse
+    ) -> HttpResponse:
+        if key is not None and _cacheable(request, response):
+            page = CachedPage(
+                response.content, response.status_code, tuple(response.items())
+            )
+            page_cache.set(key, page)
+            _shared_set(key, page)
+        return response
+
+    if iscoroutinefunction(view):
+
+        @wraps(view)
+        async def wrapped(
+            request: HttpRequest, *args: object, **kwargs: object
+        ) -> HttpResponse:
+            key, cached = lookup(request)
+            if cached is not None:
+                return cached
+            return store(key, request, await view(request, *args, **kwargs))
+
+    else:
+
+        @wraps(view)
+        def wrapped(
+            request: HttpRequest, *args: object, **kwargs: object
+        ) -> HttpResponse:
+            key, cached = lookup(request)
+            if cached is not None:
+                return cached
+            return store(key, request, view(request, *args, **kwargs))
+
+    return wrapped
@@ -0,0 +1,119 @@
+"""Static export of the non-interactive routes.
+
+Every route in ``sitecore/urls.py`` whose cache policy is public and validated (i.e.
+pure content with no form, session or flash-message dependency) is rendered once to
+``PRERENDER_ROOT`` as an HTML file, with precompressed ``.gz`` (and ``.br`` when the
+``brotli`` package is installed) siblings and a JSON manifest beside that directory.
+Both live under ``PRERENDER_DIR``, outside STATIC_ROOT: everything under STATIC_ROOT is
+public at ``/static/``. With
+``PRERENDER_SERVE=True`` WhiteNoise serves that directory at the site root, so those
+pages never reach the Django middleware stack or the view.
+"""
+
+import gzip
+import hashlib
+import json
+import os
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+from django.conf import settings
+from django.test import RequestFactory
+from django.urls import URLPattern, resolve, reverse
+from django.utils import timezone
+
+from . import urls as sitecore_urls
+from .conditional import CachePolicy
+from .storage import manifest_fingerprint
+
+try:
+    import brotli
+except ImportError:  # optional dependency
+    brotli = None
+
+
+@dataclass
+class RenderedPage:
+    path: str
+    file: str
+    etag: str
+    sha256: str
+    bytes: int
+    gzip_bytes: int
+    br_bytes: int | None
+
+
+def prerenderable_paths() -> list[str]:
+    """URL paths of every named route with a public, validated cache policy."""
+    paths = []
+    for pattern in sitecore_urls.urlpatterns:
+        if not isinstance(pattern, URLPattern) or not pattern.name:
+            continue
+        policy: CachePolicy | None = getattr(pattern.callback, "cache_policy", None)
+        if policy is not None and policy.validated and policy.public:
+            paths.append(reverse(pattern.name))
+    return paths
+
+
+def output_file(root: Path, url_path: str) -> Path:
+    """Map a URL path to the file WhiteNoise (index-file mode) or a web server serves."""
+    relative = url_path.lstrip("/")
+    if not relative or relative.endswith("/"):
+        relative += "index.html"
+    return root / relative
+
+
+def _write(path: Path, data: bytes) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_bytes(data)
+    os.replace(tmp, path)
+
+
+def render_path(url_path: str) -> tuple[bytes, str]:
+    """Render a route the way an anonymous visitor without cookies would see it."""
+    request = RequestFactory().get(url_path)
+    match = resolve(url_path)
+    request.resolver_match = match
+    response = match.func(request, *match.args, **match.kwargs)
+    if response.status_code != 200:
+        raise RuntimeError(f"{url_path} returned HTTP {response.status_code}")
+    return response.content, response.get("ETag", "")
+
+
+def prerender(root: Path | None = None) -> list[RenderedPage]:
+    root = Path(root or settings.PRERENDER_ROOT)
+    pages = []
+    for url_path in prerenderable_paths():
+        content, etag = render_path(url_path)
+        target = output_file(root, url_path)
+        _write(target, content)
+        gz = gzip.compress(content, compresslevel=9, mtime=0)
+        _write(target.with_name(target.name + ".gz"), gz)
+        br_size = None
+        if brotli is not None:
+            br = brotli.compress(content, mode=brotli.MODE_TEXT)
+            _write(target.with_name(target.name + ".br"), br)
+            br_size = len(br)
+        pages.append(
+            RenderedPage(
+                path=url_path,
+                file=target.relative_to(root).as_posix(),
+                etag=etag,
+                sha256=hashlib.sha256(content).hexdigest(),
+                bytes=len(content),
+                gzip_bytes=len(gz),
+                br_bytes=br_size,
+            )
+        )
+    manifest = {
+        "generated_at": timezone.now().isoformat(),
+        "static_manifest": manifest_fingerprint(),
+        "pages": [asdict(page) for page in pages],
+    }
+    # Next to (not inside) the served directory, so it is not public at /manifest.json.
+    _write(
+        root.with_name(root.name + ".manifest.json"),
+        json.dumps(manifest, indent=2).encode(),
+    )
+    return pages
@@ -0,0 +1,257 @@
+"""Sampling profiler for a small share of production requests.
+
+``ProfilingMiddleware`` profiles one request in ``PROFILE_SAMPLE_RATE`` (0: none), plus
+any request carrying a valid ``X-Profile-Token`` header (``manage.py profile_report
+--token`` issues one, signed with SECRET_KEY and valid for ``PROFILE_TOKEN_MAX_AGE``
+seconds). Unsampled requests pay for a random draw and a header lookup.
+
+A profiled request is not traced: a daemon thread reads the request thread's stack
+every ``PROFILE_INTERVAL_MS`` (``sys._current_frames``) and counts each distinct stack,
+so the view runs at full speed between samples. The counts are written in the collapsed
+format read by flamegraph.pl, speedscope and friends, one file per request, to
+``PROFILE_DIR/<route>/``; only the newest ``PROFILE_MAX_FILES`` files are kept.
+``manage.py profile_report`` merges them into a top-N table of hot functions.
+
+The sampler only sees Python frames. Under ASGI it samples the event loop thread and
+keeps only the samples taken while this request's coroutine was running, so time spent
+awaiting I/O or a render in the sync thread pool does not appear.
+"""
+
+import logging
+import os
+import random
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass
+from pathlib import Path
+from types import FrameType
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core import signing
+from django.http import HttpRequest, HttpResponse
+
+from .metrics import _route
+
+logger = logging.getLogger(__name__)
+
+TOKEN_HEADER = "X-Profile-Token"
+_TOKEN_SALT = "sitecore.profiling"
+SUFFIX = ".folded"
+
+_SITE_PACKAGES_RE = re.compile(r".*[/\\](?:site|dist)-packages[/\\]")
+
+
+def issue_token() -> str:
+    return signing.dumps("profile", salt=_TOKEN_SALT)
+
+
+def _valid_token(token: str) -> bool:
+    try:
+        signing.loads(token, salt=_TOKEN_SALT, max_age=settings.PROFILE_TOKEN_MAX_AGE)
+    except signing.BadSignature:
+        return False
+    return True
+
+
+def _frame_name(frame: FrameType) -> str:
+    code = frame.f_code
+    filename = code.co_filename
+    base = str(settings.BASE_DIR)
+    if filename.startswith(base):
+        filename = filename[len(base) :].lstrip("/\\")
+    else:
+        filename = _SITE_PACKAGES_RE.sub("", filename)
+    # ";" separates frames in the collapsed format and " " the count.
+    name = getattr(code, "co_qualname", code.co_name)  # co_qualname: Python 3.11+
+    return f"{filename}:{name}".replace(";", ":").replace(" ", "_")
+
+
+def _collapse(frame: FrameType | None, stop_at: FrameType) -> str | None:
+    """The stack from just below ``stop_at`` to ``frame``, or None if not under it."""
+    names = []
+    while frame is not None and frame is not stop_at:
+        names.append(_frame_name(frame))
+        frame = frame.f_back
+    if frame is None or not names:
+        # On the event loop: some other task is running, or the loop is idle.
+        return None
+    return ";".join(reversed(names))
+
+
+class _Sampler:
+    """One thread per process sampling the stacks of the requests being profiled."""
+
+    def __init__(self) -> None:
+        # id(counts) -> (thread, counts, stop_at); several requests may share a thread
+        # under ASGI.
+        self._targets: dict[int, tuple[int, Counter[str], FrameType]] = {}
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._pid = 0
+
+    def start(self, stop_at: FrameType) -> Counter[str]:
+        """Sample the calling thread's stack below ``stop_at`` until ``stop``."""
+        counts: Counter[str] = Counter()
+        with self._lock:
+            self._targets[id(counts)] = (threading.get_ident(), counts, stop_at)
+            # Threads do not survive a fork; start one in each worker.
+            if self._thread is None or self._pid != os.getpid():
+                self._pid = os.getpid()
+                self._thread = threading.Thread(
+                    target=self._run, name="profile-sampler", daemon=True
+                )
+                self._thread.start()
+        self._wake.set()
+        return counts
+
+    def stop(self, counts: Counter[str]) -> None:
+        with self._lock:
+            self._targets.pop(id(counts), None)
+
+    def _run(self) -> None:
+        while True:
+            with self._lock:
+                targets = dict(self._targets)
+                if not targets:
+                    self._wake.clear()
+            if not targets:
+                self._wake.wait()
+                continue
+            frames = sys._current_frames()
+            for ident, counts, stop_at in targets.values():
+                stack = _collapse(frames.get(ident), stop_at)
+                if stack is not None:
+                    counts[stack] += 1
+            del frames  # don't keep the requests' locals alive while sleeping
+            time.sleep(settings.PROFILE_INTERVAL_MS / 1000)
+
+
+_sampler = _Sampler()
+
+
+def _route_dir(route: str) -> str:
+    return re.sub(r"[^\w.-]", "_", route) or "_"
+
+
+def write_profile(
+    directory: Path, route: str, counts: Counter[str], elapsed: float
+) -> Path:
+    """Write one request's stacks and keep only the newest ``PROFILE_MAX_FILES``."""
+    folder = directory / _route_dir(route)
+    folder.mkdir(parents=True, exist_ok=True)
+    path = folder / f"{time.time_ns()}-{os.getpid()}-{elapsed * 1000:.0f}ms{SUFFIX}"
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text("".join(f"{stack} {n}\n" for stack, n in counts.items()))
+    tmp.replace(path)
+    dumps = sorted(directory.glob(f"*/*{SUFFIX}"), key=lambda p: p.name)
+    for old in dumps[: max(len(dumps) - settings.PROFILE_MAX_FILES, 0)]:
+        old.unlink(missing_ok=True)
+    return path
+
+
+class ProfilingMiddleware:
+    """Profile sampled requests; see the module docstring."""
+
+    async_capable = True
+    sync_capable = True
+
+    def __init__(self, get_response: Callable[[HttpRequest], HttpResponse]):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def _sampled(self, request: HttpRequest) -> bool:
+        rate = settings.PROFILE_SAMPLE_RATE
+        if rate > 0 and random.randrange(rate) == 0:
+            return True
+        token = request.headers.get(TOKEN_HEADER)
+        if not token:
+            return False
+        return _valid_token(token)
+
+    def __call__(self, request: HttpRequest) -> HttpResponse:
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not self._sampled(request):
+            return self.get_response(request)
+        counts = _sampler.start(sys._getframe())
+        started = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            _sampler.stop(counts)
+        self._save(request, counts, time.perf_counter() - started)
+        return response
+
+    async def __acall__(self, request: HttpRequest) -> HttpResponse:
+        if not self._sampled(request):
+            return await self.get_response(request)
+        counts = _sampler.start(sys._getframe())
+        started = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _sampler.stop(counts)
+        self._save(request, counts, time.perf_counter() - started)
+        return response
+
+    def _save(self, request: HttpRequest, counts: Counter[str], elapsed: float) -> None:
+        if not counts:
+            return  # faster than one sampling interval
+        try:
+            write_profile(Path(settings.PROFILE_DIR), _route(request), counts, elapsed)
+        except OSError:
+            logger.warning("Could not write request profile", exc_info=True)
+
+
+# --- reporting (manage.py profile_report) ------------------------------------------
+
+
+@dataclass
+class HotFunction:
+    name: str
+    own: int  # samples with this function on top of the stack
+    total: int  # samples with this function anywhere on the stack
+
+
+def load_profiles(
+    directory: Path, routes: Iterable[str] = (), since: float = 0.0
+) -> dict[str, tuple[int, Counter[str]]]:
+    """route -> (number of profiled requests, merged stack counts)."""
+    wanted = {_route_dir(r) for r in routes}
+    merged: dict[str, tuple[int, Counter[str]]] = {}
+    for path in sorted(directory.glob(f"*/*{SUFFIX}")):
+        route = path.parent.name
+        if wanted and route not in wanted:
+            continue
+        try:
+            if path.stat().st_mtime < since:
+                continue
+            text = path.read_text()
+        except FileNotFoundError:
+            continue  # rotated away by a worker meanwhile
+        requests, counts = merged.get(route, (0, Counter()))
+        for line in text.splitlines():
+            stack, _, n = line.rpartition(" ")
+            if stack and n.isdigit():
+                counts[stack] += int(n)
+        merged[route] = (requests + 1, counts)
+    return merged
+
+
+def hot_functions(counts: Counter[str], top: int = 20) -> list[HotFunction]:
+    own: Counter[str] = Counter()
+    total: Counter[str] = Counter()
+    for stack, n in counts.items():
+        frames = stack.split(";")
+        own[frames[-1]] += n
+        for name in set(frames):  # recursion counts once per sample
+            total[name] += n
+    ranked = sorted(total, key=lambda name: (own[name], total[name]), reverse=True)
+    return [HotFunction(name, own[name], total[name]) for name in ranked[:top]]
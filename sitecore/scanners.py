@@ -0,0 +1,209 @@
+"""Reject vulnerability-scanner probes before the rest of the stack sees them.
+
+Most 404s on this site are bots asking for ``/wp-login.php``, ``/.env``, ``/xmlrpc.php``
+and the like. ``ScannerRejectMiddleware`` sits near the top of the stack and answers
+those with a small, publicly cacheable 404 (or 410, ``SCANNER_REJECT_STATUS``) without
+touching sessions, the database, the URL resolver or the 404 template.
+
+Paths are matched against ``ScannerRules``, built once per process from the URLconf
+and settings:
+
+* Every real route is checked first: the exact paths of routes without converters, and
+  the literal prefix of routes with converters and of included URLconfs (``/admin/``)
+  and ``STATIC_URL``. A valid route is never rejected, whatever the block lists say.
+* Then ``SCANNER_BLOCK_PATHS`` (an exact set), ``SCANNER_BLOCK_PREFIXES`` (a character
+  trie) and ``SCANNER_BLOCK_SUFFIXES`` (a trie over the reversed path), all matched on
+  the lower-cased path.
+
+Each rejection counts towards ``scanner_rejects_total{rule=...}`` on ``/metrics``.
+Anything not on a list still gets the site's normal 404 page.
+"""
+
+import re
+import threading
+from collections.abc import Callable, Iterable
+from typing import Any
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.http import HttpRequest, HttpResponse
+from django.urls import URLPattern, URLResolver, get_resolver
+
+from . import metrics
+
+# Regex metacharacters that end the literal start of a re_path() pattern.
+_REGEX_META_RE = re.compile(r"[\\.^$*+?{}\[\]|()]")
+
+_END = ""  # trie key marking the end of a pattern; never a path character
+
+
+class PrefixTrie:
+    """Character trie answering "which stored prefix does this string start with?"."""
+
+    def __init__(self, prefixes: Iterable[str] = ()) -> None:
+        self._root: dict[str, Any] = {}
+        for prefix in prefixes:
+            self.add(prefix)
+
+    def add(self, prefix: str) -> None:
+        node = self._root
+        for char in prefix:
+            node = node.setdefault(char, {})
+        node[_END] = {}
+
+    def match(self, text: str) -> str | None:
+        """The shortest stored prefix of ``text``, or None."""
+        node = self._root
+        for i, char in enumerate(text):
+            if _END in node:
+                return text[:i]
+            next_node = node.get(char)
+            if next_node is None:
+                return None
+            node = next_node
+        return text if _END in node else None
+
+
+def _route_paths(
+    patterns: list[URLPattern | URLResolver], prefix: str = "/"
+) -> tuple[set[str], set[str]]:
+    """(exact paths, path prefixes) that the URLconf may serve."""
+    exact: set[str] = set()
+    prefixes: set[str] = set()
+    for pattern in patterns:
+        route = getattr(pattern.pattern, "_route", None)
+        if route is None:  # re_path(): keep its literal start
+            route = _REGEX_META_RE.split(
+                str(pattern.pattern.regex.pattern).lstrip("^")
+            )[0]
+            dynamic = True
+        else:
+            dynamic = "<" in route
+            route = route.split("<", 1)[0]
+        path = prefix + route
+        if isinstance(pattern, URLResolver):
+            if route:
+                prefixes.add(path)  # e.g. all of /admin/
+            else:
+                inner_exact, inner_prefixes = _route_paths(pattern.url_patterns, path)
+                exact |= inner_exact
+                prefixes |= inner_prefixes
+        elif dynamic:
+            prefixes.add(path)
+        else:
+            exact.add(path)
+    return exact, prefixes
+
+
+class ScannerRules:
+    def __init__(
+        self,
+        valid_paths: Iterable[str],
+        valid_prefixes: Iterable[str],
+        block_paths: Iterable[str],
+        block_prefixes: Iterable[str],
+        block_suffixes: Iterable[str],
+    ) -> None:
+        self.valid_paths = frozenset(valid_paths)
+        self.valid_prefixes = PrefixTrie(p for p in valid_prefixes if p != "/")
+        self.block_paths = frozenset(p.lower() for p in block_paths)
+        self.block_prefixes = PrefixTrie(p.lower() for p in block_prefixes)
+        self.block_suffixes = PrefixTrie(s.lower()[::-1] for s in block_suffixes)
+
+    @classmethod
+    def from_settings(cls) -> "ScannerRules":
+        valid, prefixes = _route_paths(get_resolver().url_patterns)
+        prefixes.add("/" + settings.STATIC_URL.strip("/") + "/")
+        return cls(
+            valid,
+            prefixes,
+            settings.SCANNER_BLOCK_PATHS,
+            settings.SCANNER_BLOCK_PREFIXES,
+            settings.SCANNER_BLOCK_SUFFIXES,
+        )
+
+    def rejects(self, path: str) -> str | None:
+        """The rule that rejects ``path`` (``"prefix:/wp-admin"``), or None."""
+        if path in self.valid_paths or self.valid_prefixes.match(path) is not None:
+            return None
+        lowered = path.lower()
+        if lowered in self.block_paths:
+            return f"path:{lowered}"
+        prefix = self.block_prefixes.match(lowered)
+        if prefix is not None:
+            return f"prefix:{prefix}"
+        suffix = self.block_suffixes.match(lowered[::-1])
+        if suffix is not None:
+            return f"suffix:{suffix[::-1]}"
+        return None
+
+
+_rules: ScannerRules | None = None
+_rules_key: tuple[object, ...] | None = None
+_rules_lock = threading.Lock()
+
+
+def get_rules() -> ScannerRules:
+    """Return the process-wide rules, rebuilt if the settings they came from change."""
+    global _rules, _rules_key
+    key = (
+        settings.ROOT_URLCONF,
+        settings.STATIC_URL,
+        tuple(settings.SCANNER_BLOCK_PATHS),
+        tuple(settings.SCANNER_BLOCK_PREFIXES),
+        tuple(settings.SCANNER_BLOCK_SUFFIXES),
+    )
+    with _rules_lock:
+        if _rules is None or _rules_key != key:
+            _rules = ScannerRules.from_settings()
+            _rules_key = key
+        return _rules
+
+
+_BODIES = {404: b"Not Found\n", 410: b"Gone\n"}
+
+
+def _reject(status: int) -> HttpResponse:
+    response = HttpResponse(
+        _BODIES.get(status, b""), status=status, content_type="text/plain"
+    )
+    response["Content-Length"] = str(len(response.content))
+    # The answer never changes, so let proxies and CDNs absorb repeat probes.
+    response["Cache-Control"] = "public, max-age=86400"
+    return response
+
+
+class ScannerRejectMiddleware:
+    """Answer known scanner probes early; see the module docstring."""
+
+    async_capable = True
+    sync_capable = True
+
+    def __init__(self, get_response: Callable[[HttpRequest], HttpResponse]):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def _check(self, request: HttpRequest) -> HttpResponse | None:
+        if not settings.SCANNER_REJECT_ENABLED:
+            return None
+        rule = get_rules().rejects(request.path_info)
+        if rule is None:
+            return None
+        if settings.METRICS_ENABLED:
+            metrics.registry().inc("scanner_rejects_total", {"rule": rule})
+        return _reject(settings.SCANNER_REJECT_STATUS)
+
+    def __call__(self, request: HttpRequest) -> HttpResponse:
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        response = self._check(request)
+        if response is not None:
+            return response
+        return self.get_response(request)
+
+    async def __acall__(self, request: HttpRequest) -> HttpResponse:
+        response = self._check(request)
+        if response is not None:
+            return response
+        return await self.get_response(request)
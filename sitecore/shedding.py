@@ -0,0 +1,396 @@
+"""Load shedding for the free-guide form.
+
+Three cheap checks run before a POST reaches form validation or the database:
+
+* A per-IP token bucket (``LEAD_RATE_BURST`` submissions, refilled at
+  ``LEAD_RATE_PER_MINUTE``) kept in a small SQLite file, so every Passenger worker
+  draws from the same bucket. Taking a token is one ``INSERT ... ON CONFLICT DO
+  UPDATE ... RETURNING``; once an address is out of tokens, the process remembers
+  when the next one is due, so further rejections cost a dict lookup and no I/O.
+* A honeypot field (``LeadMagnetForm.HONEYPOT``) that people never see and bots fill
+  in. Those posts get the normal redirect so the bot learns nothing, and nothing is
+  stored.
+* ``RecentEmails``, a Bloom filter of submissions made in the last
+  ``LEAD_DEDUPE_WINDOW_HOURS``, in a memory-mapped file shared by all workers. A
+  repeat submission is thanked again without another upsert or outbox message. It is
+  keyed on the address, name and consent together, so resubmitting to correct the
+  name or give consent still updates the lead. The filter is sized so a false
+  positive (a new submission mistaken for a repeat) is astronomically unlikely at
+  this site's volume.
+
+Every outcome is counted per process and periodically added to the shared SQLite file;
+``manage.py shedding_stats`` prints the totals. Any error in the shared state fails
+open: a broken file must not take the form down.
+"""
+
+import atexit
+import hashlib
+import logging
+import mmap
+import os
+import sqlite3
+import struct
+import threading
+import time
+from collections import Counter
+from collections.abc import Callable
+from functools import wraps
+from pathlib import Path
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.http import HttpRequest, HttpResponse
+from django.shortcuts import redirect
+
+from .forms import LeadMagnetForm
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS bucket (
+    key TEXT PRIMARY KEY,
+    tokens REAL NOT NULL,
+    updated REAL NOT NULL,
+    allowed INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS counter (
+    name TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+"""
+
+# SET expressions all see the old row, so "refill" is computed once per column.
+_TAKE = """
+INSERT INTO bucket (key, tokens, updated, allowed) VALUES (:key, :burst - 1, :now, 1)
+ON CONFLICT(key) DO UPDATE SET
+    tokens = CASE
+        WHEN MIN(:burst, tokens + (:now - updated) * :rate) >= 1
+        THEN MIN(:burst, tokens + (:now - updated) * :rate) - 1
+        ELSE MIN(:burst, tokens + (:now - updated) * :rate) END,
+    allowed = MIN(:burst, tokens + (:now - updated) * :rate) >= 1,
+    updated = :now
+RETURNING tokens, allowed
+"""
+
+# Buckets idle this long are full again and can be dropped.
+PRUNE_AFTER = 3600.0
+PRUNE_EVERY = 1000
+COUNTER_FLUSH_INTERVAL = 5.0
+
+
+class SheddingStore:
+    """Shared token buckets and counters in one SQLite file."""
+
+    def __init__(self, path: str | os.PathLike[str], busy_timeout: float = 0.1) -> None:
+        self.path = Path(path)
+        self.busy_timeout = busy_timeout
+        self._local = threading.local()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn: sqlite3.Connection | None = getattr(self._local, "conn", None)
+        # Connections must not cross a fork; reopen in the child.
+        if conn is None or getattr(self._local, "pid", None) != os.getpid():
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(
+                self.path, timeout=self.busy_timeout, isolation_level=None
+            )
+            conn.execute("PRAGMA journal_mode=WAL")
+            # Losing the last few bucket updates in a power cut is harmless.
+            conn.execute("PRAGMA synchronous=OFF")
+            conn.executescript(_SCHEMA)
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def take(self, key: str, rate: float, burst: float, now: float) -> float:
+        """Take a token from ``key``'s bucket.
+
+        Returns 0 when a token was available, else seconds until the next one is.
+        """
+        tokens, allowed = (
+            self._connect()
+            .execute(_TAKE, {"key": key, "rate": rate, "burst": burst, "now": now})
+            .fetchone()
+        )
+        return 0.0 if allowed else (1 - tokens) / rate
+
+    def prune(self, older_than: float) -> None:
+        self._connect().execute("DELETE FROM bucket WHERE updated < ?", (older_than,))
+
+    def add_counts(self, counts: dict[str, int]) -> None:
+        self._connect().executemany(
+            "INSERT INTO counter (name, value) VALUES (?, ?) "
+            "ON CONFLICT(name) DO UPDATE SET value = value + excluded.value",
+            counts.items(),
+        )
+
+    def counts(self) -> dict[str, int]:
+        rows = self._connect().execute("SELECT name, value FROM counter").fetchall()
+        return dict(rows)
+
+
+class RateLimiter:
+    """Per-key token buckets on a SheddingStore, with an in-process rejection cache."""
+
+    def __init__(self, store: SheddingStore, per_minute: float, burst: int) -> None:
+        self.store = store
+        self.rate = per_minute / 60
+        self.burst = float(max(burst, 1))
+        self._blocked: dict[str, float] = {}
+        self._calls = 0
+
+    def retry_after(self, key: str) -> float:
+        """0 when ``key`` may proceed (a token was taken), else seconds to wait."""
+        now = time.time()
+        until = self._blocked.get(key)
+        if until is not None:
+            if until > now:
+                return until - now
+            self._blocked.pop(key, None)
+        try:
+            wait = self.store.take(key, self.rate, self.burst, now)
+            self._calls += 1
+            if self._calls % PRUNE_EVERY == 0:
+                self.store.prune(now - PRUNE_AFTER)
+        except sqlite3.Error:
+            logger.warning("Rate limit state unavailable; allowing request")
+            return 0.0
+        if wait:
+            if len(self._blocked) > 10_000:
+                self._blocked.clear()
+            self._blocked[key] = now + wait
+        return wait
+
+
+class RecentEmails:
+    """Two-generation Bloom filter in a shared, memory-mapped file.
+
+    The current generation receives new addresses; lookups check it and the previous
+    one, so an address is remembered for one to two windows. A generation is cleared
+    when its window comes round again. Concurrent writers can at worst lose a bit,
+    which makes a repeat look new (a harmless upsert), never the other way round.
+    """
+
+    HEADER = struct.Struct("<q")  # window number the generation was started in
+
+    def __init__(
+        self,
+        path: str | os.PathLike[str],
+        window: float,
+        bits: int = 1 << 23,
+        hashes: int = 7,
+    ) -> None:
+        self.path = Path(path)
+        self.window = window
+        self.bits = bits
+        self.hashes = hashes
+        self._slot_bytes = self.HEADER.size + bits // 8
+        self._map: mmap.mmap | None = None
+        self._pid = 0
+        self._lock = threading.Lock()
+
+    def _mapped(self) -> mmap.mmap:
+        if self._map is None or self._pid != os.getpid():
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            size = 2 * self._slot_bytes
+            fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+            try:
+                if os.fstat(fd).st_size != size:
+                    os.ftruncate(fd, size)
+                self._map = mmap.mmap(fd, size)
+            finally:
+                os.close(fd)
+            self._pid = os.getpid()
+        return self._map
+
+    def _positions(self, email: str) -> list[int]:
+        digest = hashlib.blake2b(email.encode(), digest_size=16).digest()
+        h1, h2 = struct.unpack("<QQ", digest)
+        return [(h1 + i * h2) % self.bits for i in range(self.hashes)]
+
+    def _slot(self, buf: mmap.mmap, number: int, reset: bool) -> int | None:
+        """Offset of the bit array for window ``number``, or None if it is stale."""
+        offset = (number % 2) * self._slot_bytes
+        (started,) = self.HEADER.unpack_from(buf, offset)
+        if started == number:
+            return offset + self.HEADER.size
+        if not reset:
+            return None
+        buf[offset + self.HEADER.size : offset + self._slot_bytes] = bytes(
+            self._slot_bytes - self.HEADER.size
+        )
+        self.HEADER.pack_into(buf, offset, number)
+        return offset + self.HEADER.size
+
+    def _window(self) -> int:
+        return int(time.time() // self.window)
+
+    def add(self, email: str) -> None:
+        with self._lock:
+            buf = self._mapped()
+            base = self._slot(buf, self._window(), reset=True)
+            assert base is not None
+            for pos in self._positions(email):
+                buf[base + pos // 8] |= 1 << (pos % 8)
+
+    def __contains__(self, email: str) -> bool:
+        with self._lock:
+            buf = self._mapped()
+            current = self._window()
+            positions = self._positions(email)
+            for number in (current, current - 1):
+                base = self._slot(buf, number, reset=False)
+                if base is not None and all(
+                    buf[base + pos // 8] & (1 << (pos % 8)) for pos in positions
+                ):
+                    return True
+            return False
+
+
+class Counters:
+    """Per-process event counts, added to the shared store every few seconds."""
+
+    def __init__(self, store: SheddingStore) -> None:
+        self.store = store
+        self.local: Counter[str] = Counter()
+        self._pending: Counter[str] = Counter()
+        self._flushed = time.monotonic()
+        self._lock = threading.Lock()
+
+    def incr(self, name: str) -> None:
+        with self._lock:
+            self.local[name] += 1
+            self._pending[name] += 1
+            if time.monotonic() - self._flushed < COUNTER_FLUSH_INTERVAL:
+                return
+            pending, self._pending = self._pending, Counter()
+            self._flushed = time.monotonic()
+        try:
+            self.store.add_counts(dict(pending))
+        except sqlite3.Error:
+            with self._lock:
+                self._pending.update(pending)
+
+    def flush(self) -> None:
+        with self._lock:
+            pending, self._pending = self._pending, Counter()
+        if pending:
+            self.store.add_counts(dict(pending))
+
+
+def _dedupe_key(email: str, name: str, consent: bool) -> str:
+    # A changed name or consent is a new submission: it must still reach the upsert.
+    return "\0".join((email, name, "1" if consent else "0"))
+
+
+class Shedder:
+    def __init__(
+        self,
+        store: SheddingStore,
+        limiter: RateLimiter,
+        recent: RecentEmails,
+    ) -> None:
+        self.store = store
+        self.limiter = limiter
+        self.recent = recent
+        self.counters = Counters(store)
+
+    def seen_recently(self, email: str, name: str, consent: bool) -> bool:
+        """Whether this exact submission (``email`` normalized) was remembered within
+        the dedupe window."""
+        try:
+            return _dedupe_key(email, name, consent) in self.recent
+        except (OSError, ValueError):
+            logger.warning("Recent-email filter unavailable")
+            return False
+
+    def remember(self, email: str, name: str, consent: bool) -> None:
+        try:
+            self.recent.add(_dedupe_key(email, name, consent))
+        except (OSError, ValueError):
+            logger.warning("Recent-email filter unavailable")
+
+
+_shedder: Shedder | None = None
+_shedder_key: tuple[object, ...] | None = None
+_shedder_lock = threading.Lock()
+
+
+def get_shedder() -> Shedder:
+    """Return the process-wide shedder, rebuilt if the settings it was built from change."""
+    global _shedder, _shedder_key
+    key = (
+        str(settings.LEAD_SHED_PATH),
+        str(settings.LEAD_DEDUPE_PATH),
+        settings.LEAD_RATE_PER_MINUTE,
+        settings.LEAD_RATE_BURST,
+        settings.LEAD_DEDUPE_WINDOW_HOURS,
+    )
+    with _shedder_lock:
+        if _shedder is None or _shedder_key != key:
+            store = SheddingStore(settings.LEAD_SHED_PATH)
+            _shedder = Shedder(
+                store,
+                RateLimiter(
+                    store, settings.LEAD_RATE_PER_MINUTE, settings.LEAD_RATE_BURST
+                ),
+                RecentEmails(
+                    settings.LEAD_DEDUPE_PATH,
+                    window=settings.LEAD_DEDUPE_WINDOW_HOURS * 3600,
+                ),
+            )
+            _shedder_key = key
+            atexit.register(_shedder.counters.flush)
+        return _shedder
+
+
+def client_ip(request: HttpRequest) -> str:
+    return str(request.META.get("REMOTE_ADDR") or "unknown")
+
+
+def shed_abuse(
+    view: Callable[..., HttpResponse],
+) -> Callable[..., HttpResponse]:
+    """Rate-limit and honeypot-check POSTs before ``view`` validates or stores anything."""
+
+    def screen(request: HttpRequest) -> HttpResponse | None:
+        if request.method != "POST" or not settings.LEAD_SHED_ENABLED:
+            return None
+        shedder = get_shedder()
+        wait = shedder.limiter.retry_after(client_ip(request))
+        if wait:
+            shedder.counters.incr("rate_limited")
+            response = HttpResponse(
+                "Too many submissions. Please try again shortly.",
+                status=429,
+                content_type="text/plain",
+            )
+            response["Retry-After"] = str(max(1, round(wait)))
+            return response
+        if request.POST.get(LeadMagnetForm.HONEYPOT):
+            shedder.counters.incr("honeypot")
+            return redirect("free_guide_thanks")
+        shedder.counters.incr("passed")
+        return None
+
+    # The checks are in-memory or a single local SQLite statement, cheap enough to run
+    # on the event loop for async views.
+    if iscoroutinefunction(view):
+
+        @wraps(view)
+        async def wrapped(
+            request: HttpRequest, *args: object, **kwargs: object
+        ) -> HttpResponse:
+            shed = screen(request)
+            return shed if shed is not None else await view(request, *args, **kwargs)
+
+    else:
+
+        @wraps(view)
+        def wrapped(
+            request: HttpRequest, *args: object, **kwargs: object
+        ) -> HttpResponse:
+            shed = screen(request)
+            return shed if shed is not None else view(request, *args, **kwargs)
+
+    return wrapped
@@ -0,0 +1,169 @@
+"""Static files storage with content-versioned URLs.
+
+``collectstatic`` copies every file under a content-hashed name
+(``css/site.3f2a9c1e7b4d.css``) and records the mapping in ``staticfiles.json``. Django
+reads that manifest once, when the storage is first used in a process; on top of that
+the resolved URLs are memoized, so ``{% static %}`` is a dict lookup per asset. Because
+the hash only changes when the file's bytes do, worker restarts no longer bust browser
+or CDN caches, and every worker computes the same URLs.
+
+Files without a manifest entry (``DEBUG``, tests, or a file added since the last
+``collectstatic``) get ``?v=<content hash>`` of the source file instead of an error, so
+URLs are still versioned by content.
+"""
+
+import hashlib
+import os
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from urllib.parse import unquote, urlsplit
+
+from django.conf import settings
+from django.contrib.staticfiles import finders
+from django.contrib.staticfiles.storage import StaticFilesStorage, staticfiles_storage
+from django.template import engines
+from whitenoise.storage import CompressedManifestStaticFilesStorage
+
+from . import bundles
+
+
+@lru_cache(maxsize=512)
+def _file_digest(path: str, mtime_ns: int) -> str:
+    with open(path, "rb") as fh:
+        return hashlib.md5(fh.read(), usedforsecurity=False).hexdigest()[:12]
+
+
+def source_version(name: str) -> str | None:
+    """Content hash of a static source file found via the finders, or None."""
+    path = finders.find(name)
+    if not path:
+        return None
+    return _file_digest(path, os.stat(path).st_mtime_ns)
+
+
+class HashedStaticFilesStorage(CompressedManifestStaticFilesStorage):
+    # A missing manifest entry falls back to a ?v= URL instead of raising.
+    manifest_strict = False
+
+    def __init__(self, *args: object, **kwargs: object) -> None:
+        super().__init__(*args, **kwargs)
+        self._urls: dict[str, str] = {}
+
+    def url(self, name: str | None, force: bool = False) -> str:
+        if force or not name:
+            return str(super().url(name, force))
+        url = self._urls.get(name)
+        if url is None:
+            url = self._resolve(name)
+            if not settings.DEBUG:
+                # Source files can change under runserver; collected ones cannot.
+                self._urls[name] = url
+        return url
+
+    def save_manifest(self) -> None:
+        super().save_manifest()
+        # URLs resolved earlier in this process (e.g. by the asset build) predate it.
+        self._urls.clear()
+
+    def is_hashed(self, name: str) -> bool:
+        """Whether ``name`` has an entry in the collectstatic manifest."""
+        key = self.hash_key(self.clean_name(urlsplit(unquote(name)).path.strip()))
+        return key in self.hashed_files
+
+    def _resolve(self, name: str) -> str:
+        if not settings.DEBUG and self.is_hashed(name):
+            return str(super().url(name))
+        plain = str(StaticFilesStorage.url(self, name))
+        version = source_version(urlsplit(name).path)
+        return f"{plain}?v={version}" if version else plain
+
+
+def manifest_fingerprint() -> str:
+    """Hash of the loaded static manifest ("" when there is none, e.g. in development).
+
+    Rendered pages embed hashed asset URLs, so page caches and ETags include this.
+    """
+    return str(getattr(staticfiles_storage, "manifest_hash", "") or "")
+
+
+def manifest_modified() -> int:
+    """Mtime (seconds) of the static manifest, rewritten by each collectstatic; 0 if none."""
+    name = getattr(staticfiles_storage, "manifest_name", None)
+    if not name:
+        return 0
+    try:
+        return int(os.stat(staticfiles_storage.path(name)).st_mtime)
+    except (OSError, NotImplementedError):
+        return 0
+
+
+@dataclass
+class UnhashedReference:
+    template: str
+    line: int
+    reference: str
+    problem: str
+
+
+# Asset names passed to template tags that resolve them through the storage.
+_TAG_REF_RE = re.compile(
+    r"{%\s*(?:static|stylesheet|script|responsive_image)\s+(['\"])([^'\"]+)\1"
+)
+# Hard-coded /static/ URLs and manual ?v= cache busters bypass the manifest entirely.
+_LITERAL_RE = re.compile(
+    r"""(?:href|src|srcset|content)\s*=\s*["']?(/static/[^"'\s>]+)"""
+    r"""|url\(\s*["']?(/static/[^"')]+)"""
+    r"""|(\?v=\{\{[^}]*\}\})"""
+)
+
+
+def _project_template_files() -> list[Path]:
+    base = Path(settings.BASE_DIR).resolve()
+    files: list[Path] = []
+    for directory in engines["django"].template_dirs:
+        directory = Path(directory).resolve()
+        if directory == base or base in directory.parents:
+            files.extend(sorted(p for p in directory.rglob("*.html") if p.is_file()))
+    return files
+
+
+def find_unhashed_references(
+    files: list[Path] | None = None,
+) -> list[UnhashedReference]:
+    """Asset references in the project's templates that would not get a hashed URL.
+
+    Literal ``/static/...`` URLs and ``?v=`` query strings are always reported. Names
+    given to ``{% static %}``, ``{% stylesheet %}``, ``{% script %}`` and
+    ``{% responsive_image %}`` (after resolving bundles) must exist in the collectstatic
+    manifest or, when none has been built, in the static sources.
+    """
+    storage = staticfiles_storage
+    has_manifest = bool(getattr(storage, "hashed_files", None)) and hasattr(
+        storage, "is_hashed"
+    )
+    bundle_manifest = bundles.load_manifest()
+    found = []
+    for path in _project_template_files() if files is None else files:
+        for lineno, line in enumerate(path.read_text(encoding="utf-8").splitlines(), 1):
+            for match in _LITERAL_RE.finditer(line):
+                found.append(
+                    UnhashedReference(
+                        str(path), lineno, match.group(0), "hard-coded static URL"
+                    )
+                )
+            for match in _TAG_REF_RE.finditer(line):
+                name = match.group(2)
+                if "://" in name or name.startswith(("/", "data:")):
+                    continue
+                # Bundle names resolve to their build output (or sources before a build).
+                for asset in bundles.files_for(name, bundle_manifest):
+                    if has_manifest and not storage.is_hashed(asset):
+                        problem = "not in the staticfiles manifest"
+                    elif not has_manifest and finders.find(asset) is None:
+                        problem = "no such static file"
+                    else:
+                        continue
+                    found.append(UnhashedReference(str(path), lineno, asset, problem))
+    return found
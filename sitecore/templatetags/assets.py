@@ -0,0 +1,239 @@
+import json
+import os
+from functools import lru_cache
+from pathlib import Path
+from typing import Any
+
+from django import template
+from django.conf import settings
+from django.templatetags.static import static
+from django.utils.html import format_html, format_html_join
+from django.utils.safestring import SafeString, mark_safe
+
+from sitecore import bundles
+from sitecore.critical_css import index_path
+from sitecore.images import manifest_path
+
+register = template.Library()
+
+MIME_TYPES = {"avif": "image/avif", "webp": "image/webp"}
+
+
+@lru_cache(maxsize=4)
+def _load_manifest(path: str, mtime_ns: int) -> dict[str, Any]:
+    with open(path, encoding="utf-8") as fh:
+        data: dict[str, Any] = json.load(fh)
+    return data
+
+
+def _read_manifest(path: Path) -> dict[str, Any]:
+    try:
+        mtime_ns = os.stat(path).st_mtime_ns
+    except OSError:
+        return {}
+    return _load_manifest(str(path), mtime_ns)
+
+
+def image_manifest() -> dict[str, Any]:
+    """The build-time image manifest, reloaded only when the file changes."""
+    return _read_manifest(manifest_path())
+
+
+@lru_cache(maxsize=32)
+def _load_text(path: str, mtime_ns: int) -> str:
+    with open(path, encoding="utf-8") as fh:
+        return fh.read()
+
+
+def critical_css_for(route: str | None) -> str | None:
+    """The extracted critical CSS for a route name, or None if it was not built."""
+    entry = _read_manifest(index_path()).get(route) if route else None
+    if entry is None:
+        return None
+    path = Path(settings.ASSET_BUILD_DIR) / entry["file"]
+    try:
+        mtime_ns = os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+    return _load_text(str(path), mtime_ns)
+
+
+def _static_relative(src: str) -> str | None:
+    """'img/x.png' or '/static/img/x.png' -> 'img/x.png'; None for other URLs."""
+    prefix = "/" + settings.STATIC_URL.strip("/") + "/"
+    if src.startswith(prefix):
+        return src[len(prefix) :]
+    if "://" in src or src.startswith(("/", "data:")):
+        return None
+    return src
+
+
+@register.simple_tag
+def responsive_image(src: str, alt: str = "", **attrs: str) -> SafeString:
+    """Render ``<picture>`` with AVIF/WebP ``srcset`` sources for a static image.
+
+    ``sizes`` defaults to the image's intrinsic width; other keyword arguments (``class``,
+    ``loading``, ``fetchpriority``, ...) are copied onto the ``<img>``. Images that are
+    not in the build manifest (external URLs, or no build yet) render as a plain ``<img>``.
+    """
+    rel = _static_relative(src)
+    entry = image_manifest().get(rel) if rel else None
+    img_attrs = {"loading": "lazy", "decoding": "async", **attrs}
+    sizes = img_attrs.pop("sizes", None)
+    if entry is None:
+        return format_html(
+            '<img src="{}" alt="{}"{} />',
+            static(rel) if rel else src,
+            alt,
+            format_html_join("", ' {}="{}"', img_attrs.items()),
+        )
+    width, height = entry["width"], entry["height"]
+    sizes = sizes or f"(max-width: {width}px) 100vw, {width}px"
+    sources = format_html_join(
+        "",
+        '<source type="{}" srcset="{}" sizes="{}">',
+        (
+            (
+                MIME_TYPES[fmt],
+                ", ".join(f"{static(path)} {w}w" for w, path in variants),
+                sizes,
+            )
+            for fmt, variants in entry["variants"].items()
+            if fmt in MIME_TYPES
+        ),
+    )
+    return format_html(
+        '<picture>{}<img src="{}" alt="{}" width="{}" height="{}"{} /></picture>',
+        sources,
+        static(rel),
+        alt,
+        width,
+        height,
+        format_html_join("", ' {}="{}"', img_attrs.items()),
+    )
+
+
+@register.simple_tag
+def asset_url(src: str) -> str:
+    """Versioned URL for a static path given as 'img/x.png' or '/static/img/x.png'.
+
+    For URLs that come from settings (``LOGO_URL``); other URLs pass through unchanged.
+    """
+    rel = _static_relative(src)
+    return static(rel) if rel else src
+
+
+def bundle_files(name: str) -> list[str]:
+    """Static paths for a bundle name, from the (memoized) build manifest."""
+    return bundles.files_for(name, _read_manifest(bundles.manifest_path()))
+
+
+@register.simple_tag(takes_context=True)
+def stylesheet(context: template.Context, src: str) -> SafeString:
+    """Link a stylesheet without blocking first paint where possible.
+
+    Static names are resolved through the bundle build (minified output, or the sources
+    before a build). When there is a critical-CSS build for the current route, the subset
+    is inlined and the full file is preloaded and applied on load (with a
+    ``<noscript>`` fallback). External stylesheets (web fonts) are always loaded that
+    way. Anything else falls back to an ordinary render-blocking ``<link>``.
+    """
+    rel = _static_relative(src)
+    if rel is None:
+        return _async_link(src)
+    hrefs = [static(path) for path in bundle_files(rel)]
+    request = context.get("request")
+    match = getattr(request, "resolver_match", None)
+    critical = critical_css_for(match.url_name if match else None)
+    if critical is None:
+        return format_html_join(
+            "", '<link rel="stylesheet" href="{}">', ((h,) for h in hrefs)
+        )
+    # The CSS is build output from our own stylesheet; only guard the closing tag.
+    inline = mark_safe(critical.replace("</", "<\\/"))
+    return format_html(
+        "<style>{}</style>{}",
+        inline,
+        format_html_join("", "{}", ((_async_link(h),) for h in hrefs)),
+    )
+
+
+@register.simple_tag
+def script(src: str) -> SafeString:
+    """``<script defer>`` for a static JS bundle (or its sources before a build)."""
+    rel = _static_relative(src)
+    paths = bundle_files(rel) if rel else [src]
+    return format_html_join(
+        "",
+        '<script src="{}" defer></script>',
+        ((static(path) if rel else path,) for path in paths),
+    )
+
+
+# kind -> default label of the placeholder's button; static/js/embeds.js loads each kind.
+EMBED_KINDS = {
+    "calendly": "Show available times",
+    "tally": "Open the form",
+    "iframe": "Open the form",
+}
+
+
+# render_context key set once the embeds bundle has been linked in this render.
+_EMBED_SCRIPT_LINKED = "assets.embed_script_linked"
+
+
+@register.simple_tag(takes_context=True)
+def embed(
+    context: template.Context,
+    kind: str,
+    url: str,
+    title: str = "",
+    height: str = "900px",
+    label: str = "",
+    load: str = "visible",
+    **attrs: str,
+) -> SafeString:
+    """A placeholder that static/js/embeds.js swaps for a third-party embed.
+
+    The embed (and its script: Calendly's widget.js, Tally's embed.js) loads when the
+    placeholder scrolls into view, or only on click with ``load="click"``. Origins are
+    preconnected when it comes near the viewport or the pointer reaches it, not before.
+    The button is a link to ``url`` so the embed still works without JavaScript. Other
+    keyword arguments (``allow``) are copied onto the iframe. The first embed of a render
+    links the js/embeds.js bundle, so pages without an embed don't load it and pages
+    with several load it once. Renders nothing without a URL.
+    """
+    if kind not in EMBED_KINDS:
+        raise template.TemplateSyntaxError(
+            f"embed: unknown kind {kind!r} (expected one of {', '.join(EMBED_KINDS)})"
+        )
+    if not url:
+        return SafeString("")
+    bundle = SafeString("")
+    if not context.render_context.get(_EMBED_SCRIPT_LINKED):
+        context.render_context[_EMBED_SCRIPT_LINKED] = True
+        bundle = script("js/embeds.js")
+    return format_html(
+        '<div class="embed-facade" data-embed="{}" data-src="{}" data-title="{}" '
+        'data-load="{}"{} style="height:{}">'
+        '<a class="btn btn-primary embed-load" href="{}" target="_blank" rel="noopener">'
+        "{}</a></div>{}",
+        kind,
+        url,
+        title,
+        load,
+        format_html_join("", ' data-{}="{}"', attrs.items()),
+        height,
+        url,
+        label or EMBED_KINDS[kind],
+        bundle,
+    )
+
+
+def _async_link(href: str) -> SafeString:
+    return format_html(
+        '<link rel="preload" href="{0}" as="style" '
+        "onload=\"this.onload=null;this.rel='stylesheet'\">"
+        '<noscript><link rel="stylesheet" href="{0}"></noscript>',
+        href,
+    )
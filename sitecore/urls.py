@@ -1,31 +1,117 @@
-from django.urls import path
+from types import ModuleType
+from typing import TypedDict
+
+from django.urls import URLPattern, path
 from django.views.generic.base import RedirectView
 
-from . import views
-
-urlpatterns = [
-    path("", views.home, name="home"),
-    path("pricing/", views.pricing, name="pricing"),
-    path("book/", views.book, name="book"),
-    # New canonical routes for the Free Guide
-    path("free-guide/", views.free_guide, name="free_guide"),
-    path("free-guide/thanks/", views.free_guide_thanks, name="free_guide_thanks"),
-    # Backward-compatible redirects from old slugs
-    path(
-        "lead-magnet/", RedirectView.as_view(pattern_name="free_guide", permanent=True)
-    ),
-    path(
-        "lead-magnet/thanks/",
-        RedirectView.as_view(pattern_name="free_guide_thanks", permanent=True),
-    ),
-    path("terms/", views.terms, name="terms"),
-    path("privacy/", views.privacy, name="privacy"),
-    path("start/", views.start, name="start"),
-    # Standalone embedded forms (requested exact filenames)
-    path("gom-onboarding.html", views.gom_onboarding, name="gom_onboarding"),
-    path(
-        "smartpro-agreement.html", views.smartpro_agreement, name="smartpro_agreement"
-    ),
-    # Health check
-    path("healthz/", views.healthz, name="healthz"),
-]
+from . import api, metrics, views
+from .conditional import cache_policy
+
+
+class Policy(TypedDict):
+    public: bool
+    max_age: int
+    stateless: bool
+
+
+# Cache policies: content pages declare the template and settings they render from, so
+# their ETag/Last-Modified can be computed (and 304s answered) without rendering.
+# Pages with forms or flash messages stay private and uncached. Content pages are
+# stateless: they skip the session/CSRF/auth/messages middleware and never set cookies.
+CONTENT: Policy = {"public": True, "max_age": 300, "stateless": True}
+LEGAL: Policy = {"public": True, "max_age": 3600, "stateless": True}
+
+
+def build_urlpatterns(views: ModuleType) -> list[URLPattern]:
+    """The site's routes, served by ``views`` (sitecore.views, or sitecore.aviews)."""
+    return [
+        path(
+            "",
+            cache_policy(
+                views.home,
+                template="sitecore/home.html",
+                settings_keys=["CALENDLY_URL"],
+                **CONTENT,
+            ),
+            name="home",
+        ),
+        path(
+            "pricing/",
+            cache_policy(views.pricing, template="sitecore/pricing.html", **CONTENT),
+            name="pricing",
+        ),
+        path(
+            "book/",
+            cache_policy(
+                views.book,
+                template="sitecore/book.html",
+                settings_keys=["CALENDLY_URL"],
+                **CONTENT,
+            ),
+            name="book",
+        ),
+        # New canonical routes for the Free Guide
+        path("free-guide/", cache_policy(views.free_guide), name="free_guide"),
+        path(
+            "free-guide/thanks/",
+            cache_policy(views.free_guide_thanks),
+            name="free_guide_thanks",
+        ),
+        # Backward-compatible redirects from old slugs
+        path(
+            "lead-magnet/",
+            RedirectView.as_view(pattern_name="free_guide", permanent=True),
+        ),
+        path(
+            "lead-magnet/thanks/",
+            RedirectView.as_view(pattern_name="free_guide_thanks", permanent=True),
+        ),
+        path(
+            "terms/",
+            cache_policy(views.terms, template="sitecore/terms.html", **LEGAL),
+            name="terms",
+        ),
+        path(
+            "privacy/",
+            cache_policy(views.privacy, template="sitecore/privacy.html", **LEGAL),
+            name="privacy",
+        ),
+        path(
+            "start/",
+            cache_policy(
+                views.start,
+                template="sitecore/start.html",
+                settings_keys=["ONBOARDING_EMBED_URL"],
+                **CONTENT,
+            ),
+            name="start",
+        ),
+        # Standalone embedded forms (requested exact filenames)
+        path(
+            "gom-onboarding.html",
+            cache_policy(
+                views.gom_onboarding, template="gom-onboarding.html", **CONTENT
+            ),
+            name="gom_onboarding",
+        ),
+        path(
+            "smartpro-agreement.html",
+            cache_policy(
+                views.smartpro_agreement, template="smartpro-agreement.html", **CONTENT
+            ),
+            name="smartpro_agreement",
+        ),
+        # Incremental lead feed for CRM pulls (bearer token, keyset cursor, ETag)
+        path("api/leads/", api.leads_feed, name="api_leads"),
+        # Prometheus metrics (bearer METRICS_TOKEN; 404 without one)
+        path("metrics", metrics.metrics_view, name="metrics"),
+        # Health check
+        path(
+            "healthz/",
+            cache_policy(views.healthz, no_store=True, stateless=True),
+            name="healthz",
+        ),
+    ]
+
+
+urlpatterns = build_urlpatterns(views)
@@ -1,18 +1,18 @@
-import json
 import logging
-import urllib.request
 
 from django.conf import settings
 from django.contrib import messages
 from django.http import HttpRequest, HttpResponse
 from django.shortcuts import redirect, render
 
+from . import leads, shedding
 from .forms import LeadMagnetForm
-from .models import Lead
+from .pagecache import cache_page_response
 
 logger = logging.getLogger(__name__)
 
 
+@cache_page_response
 def home(request: HttpRequest) -> HttpResponse:
     return render(
         request,
@@ -23,10 +23,12 @@ def home(request: HttpRequest) -> HttpResponse:
     )
 
 
+@cache_page_response
 def pricing(request: HttpRequest) -> HttpResponse:
     return render(request, "sitecore/pricing.html")
 
 
+@cache_page_response
 def book(request: HttpRequest) -> HttpResponse:
     return render(
         request,
@@ -37,32 +39,7 @@ def book(request: HttpRequest) -> HttpResponse:
     )
 
 
-def _subscribe_to_getresponse(name: str, email: str) -> bool:
-    api_key = settings.GETRESPONSE_API_KEY
-    list_id = settings.GETRESPONSE_LIST_ID
-    if not api_key or not list_id:
-        logger.warning("GetResponse not configured; skipping API call")
-        return False
-    # Minimal direct API call using HTTP request. In production, use official SDK or requests.
-    url = "https://api.getresponse.com/v3/contacts"
-    payload = {
-        "email": email,
-        "name": name or "",
-        "campaign": {"campaignId": list_id},
-        "dayOfCycle": 0,
-    }
-    data = json.dumps(payload).encode("utf-8")
-    req = urllib.request.Request(url, data=data, method="POST")
-    req.add_header("Content-Type", "application/json")
-    req.add_header("X-Auth-Token", f"api-key {api_key}")
-    try:
-        with urllib.request.urlopen(req, timeout=10) as resp:
-            return 200 <= int(resp.status) < 300
-    except Exception as e:
-        logger.error("GetResponse subscription failed: %s", e)
-        return False
-
-
+@shedding.shed_abuse
 def lead_magnet(request: HttpRequest) -> HttpResponse:
     if request.method == "POST":
         form = LeadMagnetForm(request.POST)
@@ -70,21 +47,23 @@ def lead_magnet(request: HttpRequest) -> HttpResponse:
             name = form.cleaned_data["name"]
             email = form.cleaned_data["email"]
             consent = form.cleaned_data["consent"]
-            # Save locally
-            Lead.objects.get_or_create(
-                email=email, defaults={"name": name, "consent": consent}
-            )
-            # Attempt subscription
-            subscribed = _subscribe_to_getresponse(name, email)
-            if subscribed:
-                messages.success(
-                    request, "Check your inbox! Your free guide is on its way."
-                )
+            # Upsert the lead and queue its GetResponse subscription in one transaction;
+            # `manage.py drain_outbox` delivers it so this request never waits on the API.
+            # The same submission repeated within the dedupe window is only thanked again.
+            if settings.LEAD_SHED_ENABLED:
+                shedder = shedding.get_shedder()
+                normalized = leads.normalize_email(email)
+                if shedder.seen_recently(normalized, name, consent):
+                    shedder.counters.incr("duplicate")
+                else:
+                    leads.submit(name, email, consent)
+                    shedder.remember(normalized, name, consent)
             else:
-                messages.info(
-                    request,
-                    "Thanks! We saved your email. We will send the free guide shortly.",
-                )
+                leads.submit(name, email, consent)
+            messages.success(
+                request,
+                "Thanks! Check your inbox shortly. Your free guide is on its way.",
+            )
             return redirect("free_guide_thanks")
     else:
         form = LeadMagnetForm()
@@ -106,14 +85,17 @@ def free_guide_thanks(request: HttpRequest) -> HttpResponse:
     return lead_thanks(request)
 
 
+@cache_page_response
 def terms(request: HttpRequest) -> HttpResponse:
     return render(request, "sitecore/terms.html")
 
 
+@cache_page_response
 def privacy(request: HttpRequest) -> HttpResponse:
     return render(request, "sitecore/privacy.html")
 
 
+@cache_page_response
 def start(request: HttpRequest) -> HttpResponse:
     """Post-payment onboarding form embed page.
     If ONBOARDING_EMBED_URL is provided, we render an iframe; otherwise show instructions.
@@ -127,11 +109,13 @@ def start(request: HttpRequest) -> HttpResponse:
     )
 
 
+@cache_page_response
 def gom_onboarding(request: HttpRequest) -> HttpResponse:
     """Serve the standalone onboarding form at /gom-onboarding.html (exact filename in URL)."""
     return render(request, "gom-onboarding.html")
 
 
+@cache_page_response
 def smartpro_agreement(request: HttpRequest) -> HttpResponse:
     """Serve the standalone agreement page at /smartpro-agreement.html (exact filename in URL).
     We'll replace its contents when the embed code is provided.
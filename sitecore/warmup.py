@@ -0,0 +1,270 @@
+"""Worker warm-up: pay the first request's one-off costs before accepting traffic.
+
+Passenger starts and stops workers often. Without warm-up, the first request a new
+worker serves also builds the URL resolvers, compiles every template it touches,
+loads the static manifest, reads the asset build manifests and opens (and tunes) the
+database connection. ``warm_up`` does all of that up front. With
+``WARMUP_ON_START=True`` it runs from ``wsgi.py``/``passenger_wsgi.py`` right after
+the application is created, so Passenger hands the worker traffic only once it is
+warm. A failing step is logged and skipped; warm-up never stops a worker from
+starting.
+
+``manage.py startup_profile`` measures the effect.
+"""
+
+import inspect
+import json
+import logging
+import os
+import re
+import subprocess
+import sys
+import tempfile
+import time
+from collections.abc import Callable
+from dataclasses import dataclass, field
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.db import connection
+from django.template import engines
+from django.templatetags.static import static
+from django.urls import (
+    NoReverseMatch,
+    URLPattern,
+    URLResolver,
+    get_resolver,
+    reverse,
+)
+
+from . import bundles, views
+from .conditional import CachePolicy, template_dependencies
+
+logger = logging.getLogger(__name__)
+
+_TEMPLATE_NAME_RE = re.compile(r"""["']([\w./-]+\.html)["']""")
+
+
+@dataclass
+class WarmupReport:
+    steps: dict[str, float] = field(default_factory=dict)  # step -> seconds
+    counts: dict[str, int] = field(default_factory=dict)
+    errors: dict[str, str] = field(default_factory=dict)
+
+    @property
+    def seconds(self) -> float:
+        return sum(self.steps.values())
+
+
+def view_templates() -> list[str]:
+    """Templates named in ``sitecore.views`` or in a route's cache policy."""
+    names = set(_TEMPLATE_NAME_RE.findall(inspect.getsource(views)))
+    for _, pattern in _patterns(get_resolver().url_patterns):
+        policy: CachePolicy | None = getattr(pattern.callback, "cache_policy", None)
+        if policy is not None and policy.template:
+            names.add(policy.template)
+    return sorted(names)
+
+
+def _patterns(
+    patterns: list[URLPattern | URLResolver], namespace: str = ""
+) -> list[tuple[str, URLPattern]]:
+    """(namespaced view name, pattern) for every pattern, including admin's."""
+    found = []
+    for pattern in patterns:
+        if isinstance(pattern, URLResolver):
+            inner = (
+                f"{namespace}{pattern.namespace}:" if pattern.namespace else namespace
+            )
+            found.extend(_patterns(pattern.url_patterns, inner))
+        else:
+            found.append(
+                (f"{namespace}{pattern.name}" if pattern.name else "", pattern)
+            )
+    return found
+
+
+def _warm_urls() -> int:
+    # reverse() populates the resolvers' reverse dicts, resolve() their match state.
+    resolver = get_resolver()
+    names = 0
+    for name, pattern in _patterns(resolver.url_patterns):
+        if name and not pattern.pattern.converters:
+            try:
+                path = reverse(name)
+            except NoReverseMatch:
+                continue  # regex patterns with groups (e.g. admin's app_list)
+            resolver.resolve(path)
+            names += 1
+    return names
+
+
+def _warm_templates() -> int:
+    engine = engines["django"]
+    compiled: set[str] = set()
+    for name in view_templates():
+        engine.get_template(name)
+        # Parents and includes are otherwise compiled during the first render.
+        compiled.update(t.origin.name for t in template_dependencies(name))
+    return len(compiled)
+
+
+def _warm_static() -> int:
+    from .templatetags import assets
+
+    # Touching the storage loads staticfiles.json; static() fills its URL memo.
+    getattr(staticfiles_storage, "hashed_files", None)
+    manifest = assets._read_manifest(bundles.manifest_path())
+    names = {
+        path for name in bundles.BUNDLES for path in bundles.files_for(name, manifest)
+    }
+    for name in names:
+        static(name)
+    assets.asset_url(settings.LOGO_URL)
+    assets.image_manifest()
+    from .critical_css import html_routes
+
+    for route in html_routes():
+        assets.critical_css_for(route)
+    return len(names)
+
+
+def _warm_database() -> int:
+    connection.ensure_connection()  # runs sitecore.db.configure_sqlite
+    return 1
+
+
+STEPS: dict[str, Callable[[], int]] = {
+    "urls": _warm_urls,
+    "templates": _warm_templates,
+    "static": _warm_static,
+    "database": _warm_database,
+}
+
+
+def warm_up() -> WarmupReport:
+    report = WarmupReport()
+    for name, step in STEPS.items():
+        started = time.perf_counter()
+        try:
+            report.counts[name] = step()
+        except Exception as e:
+            logger.exception("Warm-up step %r failed", name)
+            report.errors[name] = f"{e.__class__.__name__}: {e}"
+        report.steps[name] = time.perf_counter() - started
+    return report
+
+
+def warm_up_if_enabled() -> WarmupReport | None:
+    """Called by the WSGI entry points; does nothing unless ``WARMUP_ON_START``."""
+    if not getattr(settings, "WARMUP_ON_START", False):
+        return None
+    report = warm_up()
+    logger.info(
+        "Worker warm-up took %.0f ms (%s)",
+        report.seconds * 1000,
+        ", ".join(f"{k} {v * 1000:.0f} ms" for k, v in report.steps.items()),
+    )
+    return report
+
+
+# --- startup profiling (manage.py startup_profile) ---------------------------------
+
+# Runs in a fresh interpreter under ``-X importtime``. Only the standard library is
+# imported before the first clock reading, so every Django/project import is counted.
+_PROFILE_CHILD = """
+import io, json, sys, time
+from wsgiref.util import setup_testing_defaults
+
+phases = {}
+started = mark = time.perf_counter()
+
+def lap(name):
+    global mark
+    now = time.perf_counter()
+    phases[name] = now - mark
+    mark = now
+
+from django.core.wsgi import get_wsgi_application
+lap("import django")
+application = get_wsgi_application()
+lap("django setup")
+from django.conf import settings
+if %(warm)r:
+    from sitecore.warmup import warm_up
+    for step, seconds in warm_up().steps.items():
+        phases["warm-up: " + step] = seconds
+    mark = time.perf_counter()
+host = next(
+    (h.lstrip(".") for h in settings.ALLOWED_HOSTS if h.lstrip(".") and h != "*"),
+    "localhost",
+)
+statuses = []
+for name in ("first request", "second request"):
+    environ = {"PATH_INFO": %(path)r, "HTTP_HOST": host, "wsgi.errors": io.StringIO()}
+    setup_testing_defaults(environ)
+    environ["SERVER_NAME"] = host
+    response = application(environ, lambda status, headers: statuses.append(status))
+    b"".join(response)
+    response.close()
+    lap(name)
+print(json.dumps({"phases": phases, "statuses": statuses}))
+"""
+
+
+@dataclass
+class StartupProfile:
+    warm: bool
+    phases: dict[str, float] = field(default_factory=dict)  # phase -> seconds
+    imports: dict[str, float] = field(default_factory=dict)  # package -> self seconds
+    statuses: list[str] = field(default_factory=list)
+
+    @property
+    def to_first_response(self) -> float:
+        return sum(v for k, v in self.phases.items() if k != "second request")
+
+
+def parse_importtime(stderr: str) -> dict[str, float]:
+    """Self time in seconds per top-level package from ``-X importtime`` output."""
+    totals: dict[str, float] = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        self_us, _, module = (part.strip() for part in line[12:].split("|"))
+        if not self_us.isdigit():
+            continue  # the header line
+        package = module.split(".")[0]
+        totals[package] = totals.get(package, 0.0) + int(self_us) / 1e6
+    return totals
+
+
+def profile_startup(warm: bool, path: str = "/") -> StartupProfile:
+    """Start a fresh interpreter like a new Passenger worker and time each phase."""
+    code = _PROFILE_CHILD % {"warm": warm, "path": path}
+    with tempfile.TemporaryDirectory() as runtime:
+        env = {
+            **os.environ,
+            # Not settings.SETTINGS_MODULE, which is None while override_settings is active.
+            "DJANGO_SETTINGS_MODULE": os.environ["DJANGO_SETTINGS_MODULE"],
+            # Keep the child's metrics and shedding files out of the live ones.
+            "RUNTIME_DIR": runtime,
+            "WARMUP_ON_START": "False",
+        }
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", code],
+            cwd=settings.BASE_DIR,
+            env=env,
+            capture_output=True,
+            text=True,
+            check=False,
+        )
+    if result.returncode != 0:
+        tail = result.stderr.strip().splitlines()[-1:] or ["no output"]
+        raise RuntimeError(f"startup profile child failed: {tail[0]}")
+    data = json.loads(result.stdout.strip().splitlines()[-1])
+    return StartupProfile(
+        warm=warm,
+        phases=data["phases"],
+        imports=parse_importtime(result.stderr),
+        statuses=data["statuses"],
+    )
@@ -0,0 +1,125 @@
+// Lazy third-party embeds: swaps {% embed %} placeholders (sitecore/templatetags/assets.py)
+// for the real Calendly widget, Tally form or iframe when they scroll into view or are
+// clicked, and preconnects to their origins only when that is about to happen.
+(function(){
+  var SCRIPTS = {
+    calendly: 'https://assets.calendly.com/assets/external/widget.js',
+    tally: 'https://tally.so/widgets/embed.js'
+  };
+  var ORIGINS = {
+    calendly: ['https://assets.calendly.com', 'https://calendly.com'],
+    tally: ['https://tally.so']
+  };
+  var hinted = {};
+  var scripts = {};
+
+  function origins(el){
+    if(ORIGINS[el.dataset.embed]){ return ORIGINS[el.dataset.embed]; }
+    try { return [new URL(el.dataset.src, location.href).origin]; } catch(e){ return []; }
+  }
+
+  function preconnect(el){
+    origins(el).forEach(function(origin){
+      if(hinted[origin] || origin === location.origin){ return; }
+      hinted[origin] = true;
+      var link = document.createElement('link');
+      link.rel = 'preconnect';
+      link.href = origin;
+      link.crossOrigin = '';
+      document.head.appendChild(link);
+    });
+  }
+
+  // Runs done() once src has loaded, adding the script on first use.
+  function script(src, done){
+    var entry = scripts[src];
+    if(entry && entry.loaded){ done(); return; }
+    if(entry){ entry.waiting.push(done); return; }
+    entry = scripts[src] = { loaded: false, waiting: [done] };
+    var tag = document.createElement('script');
+    tag.src = src;
+    tag.async = true;
+    tag.onload = function(){
+      entry.loaded = true;
+      entry.waiting.forEach(function(fn){ fn(); });
+    };
+    document.head.appendChild(tag);
+  }
+
+  function frame(el){
+    var f = document.createElement('iframe');
+    f.title = el.dataset.title || '';
+    if(el.dataset.allow){ f.setAttribute('allow', el.dataset.allow); }
+    f.style.width = '100%';
+    f.style.height = '100%';
+    f.style.border = '0';
+    return f;
+  }
+
+  var LOADERS = {
+    calendly: function(el){
+      script(SCRIPTS.calendly, function(){
+        el.textContent = '';
+        window.Calendly.initInlineWidget({ url: el.dataset.src, parentElement: el });
+      });
+    },
+    tally: function(el){
+      var f = frame(el);
+      f.setAttribute('data-tally-src', el.dataset.src);
+      el.replaceChildren(f);
+      script(SCRIPTS.tally, function(){
+        if(window.Tally){ window.Tally.loadEmbeds(); }
+      });
+    },
+    iframe: function(el){
+      var f = frame(el);
+      f.src = el.dataset.src;
+      el.replaceChildren(f);
+    }
+  };
+
+  function load(el){
+    if(el.dataset.loaded){ return; }
+    el.dataset.loaded = '1';
+    preconnect(el);
+    LOADERS[el.dataset.embed](el);
+  }
+
+  var facades = document.querySelectorAll('.embed-facade[data-embed]');
+  if(!facades.length){ return; }
+  var observe = 'IntersectionObserver' in window;
+  function watch(margin, action){
+    return new IntersectionObserver(function(entries, observer){
+      entries.forEach(function(entry){
+        if(entry.isIntersecting){
+          observer.unobserve(entry.target);
+          action(entry.target);
+        }
+      });
+    }, { rootMargin: margin });
+  }
+  var near = observe && watch('1200px 0px', preconnect);
+  var visible = observe && watch('200px 0px', load);
+
+  facades.forEach(function(el){
+    // A page linking this script twice (e.g. from an included template) binds once.
+    if(el.dataset.bound){ return; }
+    el.dataset.bound = '1';
+    el.addEventListener('pointerenter', function(){ preconnect(el); });
+    el.addEventListener('focusin', function(){ preconnect(el); });
+    el.addEventListener('click', function(e){
+      if(e.target.closest && e.target.closest('.embed-load')){
+        e.preventDefault();
+        load(el);
+      }
+    });
+    if(el.dataset.load === 'click'){
+      if(near){ near.observe(el); }
+    } else if(visible){
+      near.observe(el);
+      visible.observe(el);
+    } else {
+      load(el);
+    }
+  });
+})();
@@ -0,0 +1,7 @@
+// Dismiss buttons on flash messages (base.html).
+document.addEventListener('click', function (e) {
+  if (e.target && e.target.classList && e.target.classList.contains('msg-close')) {
+    var parent = e.target.closest('.msg');
+    if (parent) parent.remove();
+  }
+});
@@ -0,0 +1,33 @@
+// Theme toggle: applies the saved or ?theme= choice and wires #theme-toggle.
+(function(){
+  var KEY = 'gom_theme';
+  var THEMES = { midnight: 'midnight', editorial: 'editorial' };
+  function apply(theme){
+    if(theme === THEMES.editorial){
+      document.documentElement.setAttribute('data-theme', 'editorial');
+      setToggleLabel('Light');
+    } else {
+      document.documentElement.setAttribute('data-theme', 'midnight');
+      setToggleLabel('Dark');
+    }
+  }
+  function setToggleLabel(current){
+    var btn = document.getElementById('theme-toggle');
+    if(btn){ btn.textContent = 'Theme: ' + current; }
+  }
+  function getParamTheme(){
+    var m = location.search.match(/[?&]theme=([a-zA-Z]+)/);
+    return m ? m[1].toLowerCase() : null;
+  }
+  var initial = localStorage.getItem(KEY) || getParamTheme() || THEMES.midnight;
+  if(initial !== THEMES.editorial && initial !== THEMES.midnight){ initial = THEMES.midnight; }
+  apply(initial);
+  var btn = document.getElementById('theme-toggle');
+  if(btn){
+    btn.addEventListener('click', function(){
+      var next = (localStorage.getItem(KEY) || initial) === THEMES.editorial ? THEMES.midnight : THEMES.editorial;
+      localStorage.setItem(KEY, next);
+      apply(next);
+    });
+  }
+})();
@@ -0,0 +1,56 @@
+import os
+
+import django
+import pytest
+
+# Ensure Django is set up for pytest without pytest-django
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "GOMWebProjectPt1.settings")
+django.setup()
+
+from django.apps import apps  # noqa: E402
+from django.test.utils import (  # noqa: E402
+    setup_databases,
+    setup_test_environment,
+    teardown_databases,
+    teardown_test_environment,
+)
+
+
+@pytest.fixture(scope="session")
+def _django_test_db():
+    """Create the test database once per session (never touches db.sqlite3)."""
+    setup_test_environment()
+    old_config = setup_databases(verbosity=0, interactive=False)
+    yield
+    teardown_databases(old_config, verbosity=0)
+    teardown_test_environment()
+
+
+@pytest.fixture
+def db(_django_test_db):
+    """Give a test access to the database and wipe sitecore tables afterwards."""
+    yield
+    for model in apps.get_app_config("sitecore").get_models():
+        model.objects.all().delete()
+
+
+@pytest.fixture(autouse=True)
+def _isolated_runtime_state(tmp_path):
+    """Fresh rate limits, recent-email filter, metrics, profiles and caches per test."""
+    from django.conf import settings
+    from django.test import override_settings
+
+    from sitecore import pagecache
+
+    # Pages rendered by an earlier test would skip the rendering a test measures.
+    pagecache.page_cache.clear()
+    caches = {"default": {**settings.CACHES["default"]}}
+    caches["default"]["LOCATION"] = str(tmp_path / "cache.sqlite3")
+    with override_settings(
+        LEAD_SHED_PATH=tmp_path / "shedding.sqlite3",
+        LEAD_DEDUPE_PATH=tmp_path / "recent-emails.bloom",
+        METRICS_DIR=tmp_path / "metrics",
+        PROFILE_DIR=tmp_path / "profiles",
+        CACHES=caches,
+    ):
+        yield
@@ -0,0 +1,98 @@
+import datetime
+
+import pytest
+from django.db import connection
+from django.test import Client, override_settings
+from django.utils import timezone
+
+from sitecore import api
+from sitecore.models import Lead
+
+AUTH = {"HTTP_AUTHORIZATION": "Bearer s3cret"}
+
+
+@pytest.fixture
+def feed(db):
+    with override_settings(LEADS_API_TOKENS=["s3cret"], LEADS_API_SETTLE_SECONDS=0):
+        yield Client()
+
+
+def _leads(n, created_at):
+    Lead.objects.bulk_create(
+        Lead(email=f"lead{i}@example.com", consent=True) for i in range(n)
+    )
+    # Equal timestamps make the id tie-breaker do the work.
+    Lead.objects.update(created_at=created_at)
+
+
+def test_requires_a_configured_bearer_token(feed):
+    assert feed.get("/api/leads/").status_code == 401
+    bad = feed.get("/api/leads/", HTTP_AUTHORIZATION="Bearer nope")
+    assert bad.status_code == 401
+    assert bad["WWW-Authenticate"].startswith("Bearer")
+    with override_settings(LEADS_API_TOKENS=[]):
+        assert feed.get("/api/leads/", **AUTH).status_code == 401
+
+
+def test_cursor_pages_through_ties_then_only_new_leads(feed):
+    _leads(5, timezone.now() - datetime.timedelta(minutes=1))
+
+    first = feed.get("/api/leads/", {"limit": 3, "fields": "id,email"}, **AUTH).json()
+    assert [set(r) for r in first["results"]] == [{"id", "email"}] * 3
+    second = feed.get(
+        "/api/leads/", {"limit": 3, "cursor": first["next"]}, **AUTH
+    ).json()
+    emails = [r["email"] for r in first["results"] + second["results"]]
+    assert emails == [f"lead{i}@example.com" for i in range(5)]
+
+    idle = feed.get("/api/leads/", {"cursor": second["next"]}, **AUTH).json()
+    assert idle == {"results": [], "next": second["next"]}
+
+    Lead.objects.create(email="new@example.com")
+    Lead.objects.filter(email="new@example.com").update(
+        created_at=timezone.now() - datetime.timedelta(seconds=1)
+    )
+    fresh = feed.get("/api/leads/", {"cursor": second["next"]}, **AUTH).json()
+    assert [r["email"] for r in fresh["results"]] == ["new@example.com"]
+
+
+def test_unchanged_page_is_a_304(feed):
+    _leads(2, timezone.now() - datetime.timedelta(minutes=1))
+    response = feed.get("/api/leads/", **AUTH)
+    etag = response["ETag"]
+
+    again = feed.get("/api/leads/", HTTP_IF_NONE_MATCH=etag, **AUTH)
+    assert again.status_code == 304
+
+    Lead.objects.create(email="late@example.com")
+    Lead.objects.filter(email="late@example.com").update(
+        created_at=timezone.now() - datetime.timedelta(seconds=1)
+    )
+    assert feed.get("/api/leads/", HTTP_IF_NONE_MATCH=etag, **AUTH).status_code == 200
+
+
+def test_recent_leads_wait_for_the_settle_window(feed):
+    Lead.objects.create(email="now@example.com")
+    with override_settings(LEADS_API_SETTLE_SECONDS=60):
+        assert feed.get("/api/leads/", **AUTH).json()["results"] == []
+
+
+@pytest.mark.parametrize(
+    "params", [{"cursor": "!!"}, {"fields": "password"}, {"limit": "0"}]
+)
+def test_bad_parameters_are_400(feed, params):
+    assert feed.get("/api/leads/", params, **AUTH).status_code == 400
+
+
+def test_cursor_query_uses_the_composite_index(db):
+    cursor = api.encode_cursor(timezone.now(), 10)
+    created_at, pk = api.decode_cursor(cursor)
+    assert pk == 10
+    queryset = Lead.objects.filter(created_at__gte=created_at).order_by(
+        "created_at", "pk"
+    )
+    sql, params = queryset.values_list("created_at", "pk").query.sql_with_params()
+    with connection.cursor() as cur:
+        cur.execute(f"EXPLAIN QUERY PLAN {sql}", params)
+        plan = " ".join(str(row) for row in cur.fetchall())
+    assert "sitecore_lead_created_idx" in plan
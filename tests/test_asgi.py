@@ -0,0 +1,213 @@
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from django.conf import settings
+from django.test import AsyncClient, override_settings
+from django.utils.module_loading import import_string
+
+from sitecore import getresponse, outbox
+from sitecore.circuitbreaker import BreakerStore, CircuitBreaker
+from sitecore.getresponse import (
+    AdaptiveTimeout,
+    AsyncGetResponseClient,
+    GetResponseError,
+)
+from sitecore.models import Lead, OutboxMessage
+
+
+class _SlowStubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        server = self.server
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        server.requests.append(json.loads(body))
+        server.peers.add(self.client_address)
+        server.answering.wait(5)  # cleared: the API stops answering
+        time.sleep(server.delay)
+        status = server.statuses.pop(0) if server.statuses else 202
+        self.send_response(status)
+        if server.chunked:
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+            self.wfile.write(b"2\r\n{}\r\n0\r\n\r\n")
+        else:
+            self.send_header("Content-Length", "2")
+            self.end_headers()
+            self.wfile.write(b"{}")
+
+    def log_message(self, *args):
+        pass
+
+
+class _StubServer(ThreadingHTTPServer):
+    # The default backlog of 5 drops simultaneous connects, which then wait out a 1 s
+    # SYN retransmit.
+    request_queue_size = 128
+
+
+@pytest.fixture
+def stub():
+    server = _StubServer(("127.0.0.1", 0), _SlowStubHandler)
+    server.requests, server.peers, server.statuses = [], set(), []
+    server.delay, server.chunked = 0.0, False
+    server.answering = threading.Event()
+    server.answering.set()
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.answering.set()
+    server.shutdown()
+    server.server_close()
+
+
+def _url(stub):
+    host, port = stub.server_address
+    return f"http://{host}:{port}/v3"
+
+
+def test_async_client_keeps_connection_alive_and_maps_statuses(stub, tmp_path):
+    breaker = CircuitBreaker(
+        "getresponse", BreakerStore(tmp_path / "breaker.sqlite3"), failure_threshold=1
+    )
+    client = AsyncGetResponseClient("key", "LIST", _url(stub), breaker=breaker)
+    stub.statuses = [202, 409, 202, 500]
+
+    async def run():
+        await client.subscribe("Ada", "ada@example.com")
+        await client.subscribe("Ada", "ada@example.com")  # 409: already a contact
+        stub.chunked = True
+        await client.subscribe("Grace", "grace@example.com")
+        with pytest.raises(GetResponseError, match="HTTP 500"):
+            await client.subscribe("Linus", "linus@example.com")
+        await client.close()
+
+    asyncio.run(run())
+
+    assert len(stub.peers) == 1
+    assert stub.requests[0] == {
+        "email": "ada@example.com",
+        "name": "Ada",
+        "campaign": {"campaignId": "LIST"},
+        "dayOfCycle": 0,
+    }
+    assert not breaker.allow()
+
+
+def test_async_client_overlaps_slow_requests(stub):
+    stub.delay = 0.2
+    client = AsyncGetResponseClient("key", "LIST", _url(stub), concurrency=50)
+
+    async def run():
+        started = time.perf_counter()
+        await asyncio.gather(
+            *(client.subscribe("", f"lead{i}@example.com") for i in range(30))
+        )
+        elapsed = time.perf_counter() - started
+        await client.close()
+        return elapsed
+
+    elapsed = asyncio.run(run())
+
+    assert len(stub.requests) == 30
+    assert elapsed < 2.0  # 30 sequential calls would take 6 s
+
+
+def test_async_client_widens_the_timeout_until_the_api_answers(stub):
+    timeout = AdaptiveTimeout(minimum=0.05, maximum=2)
+    for _ in range(20):
+        timeout.observe(0.001)  # warmed up on a fast API
+    client = AsyncGetResponseClient("key", "LIST", _url(stub), timeout=timeout)
+
+    async def run():
+        stub.answering.clear()
+        widened = []
+        for _ in range(3):
+            with pytest.raises(GetResponseError):
+                await client.subscribe("", "slow@example.com")
+            widened.append(timeout.current)
+        stub.answering.set()
+        await client.subscribe("", "back@example.com")
+        await client.close()
+        return widened
+
+    assert asyncio.run(run()) == [0.1, 0.2, 0.4]
+    assert timeout.current < 0.4  # an answered call resumes the estimate
+
+
+def test_every_middleware_runs_natively_under_asgi():
+    # A sync-only middleware would funnel each ASGI request through one thread.
+    for path in settings.MIDDLEWARE:
+        assert getattr(import_string(path), "async_capable", False), path
+
+
+@override_settings(ROOT_URLCONF="sitecore.aurls")
+def test_asgi_lead_post_delivers_on_the_event_loop(db, stub, tmp_path):
+    stub.delay = 0.1
+
+    async def run():
+        client = AsyncClient()
+        response = await client.post(
+            "/free-guide/",
+            {"name": "Test User", "email": "Lead@Example.com", "consent": True},
+        )
+        # The redirect does not wait for GetResponse.
+        delivering = list(outbox._in_flight)
+        await asyncio.gather(*delivering)
+        await getresponse.get_async_client().close()
+        return response, delivering
+
+    with override_settings(
+        GETRESPONSE_API_KEY="key",
+        GETRESPONSE_LIST_ID="LIST",
+        GETRESPONSE_API_URL=_url(stub),
+        GETRESPONSE_BREAKER_PATH=tmp_path / "breaker.sqlite3",
+    ):
+        response, delivering = asyncio.run(run())
+
+    assert response.status_code == 302
+    assert response["Location"] == "/free-guide/thanks/"
+    assert len(delivering) == 1
+    assert stub.requests[0]["email"] == "lead@example.com"
+    assert Lead.objects.get().synced_at is not None
+    message = OutboxMessage.objects.get()
+    assert message.status == OutboxMessage.Status.SENT
+    assert message.attempts == 1
+    assert outbox.drain().processed == 0
+
+
+@override_settings(ROOT_URLCONF="sitecore.aurls", OUTBOX_DELIVER_ON_SUBMIT=False)
+def test_asgi_lead_post_without_immediate_delivery_leaves_outbox(db):
+    async def run():
+        return await AsyncClient().post(
+            "/free-guide/",
+            {"name": "Test User", "email": "lead@example.com", "consent": True},
+        )
+
+    assert asyncio.run(run()).status_code == 302
+    assert not outbox._in_flight
+    assert OutboxMessage.objects.get().status == OutboxMessage.Status.PENDING
+
+
+@override_settings(ROOT_URLCONF="sitecore.aurls")
+def test_asgi_content_pages_keep_cache_headers(db):
+    async def run():
+        client = AsyncClient()
+        first = await client.get("/pricing/")
+        again = await client.get("/pricing/", headers={"If-None-Match": first["ETag"]})
+        form = await client.get("/free-guide/")
+        return first, again, form
+
+    first, again, form = asyncio.run(run())
+
+    assert first.status_code == 200
+    assert "Server-Timing" in first
+    assert first["Permissions-Policy"] == "payment=*"
+    assert again.status_code == 304
+    assert form.status_code == 200
+    assert b'name="csrfmiddlewaretoken"' in form.content
@@ -0,0 +1,53 @@
+import os
+
+import pytest
+
+from sitecore import benchmark
+
+
+def test_harness_covers_every_route(db):
+    with benchmark.benchmark_settings() as stub:
+        report = benchmark.run_benchmarks(requests=3, warmup=1)
+
+    assert set(benchmark.route_requests()) | {"free_guide_post", "outbox_drain"} == set(
+        report.routes
+    )
+    for name, result in report.routes.items():
+        assert result.statuses <= {200, 301, 302}, name
+        assert len(result.latencies) == 3, name
+    assert report.routes["free_guide_post"].statuses == {302}
+    assert stub.contacts == 4  # warm-up and measured submissions all delivered
+
+
+def test_compare_flags_only_real_slowdowns():
+    report = benchmark.BenchmarkReport("wsgi", 4)
+    report.routes["home"] = benchmark.RouteResult("home", [0.001] * 4, 0.004)
+    report.routes["pricing"] = benchmark.RouteResult("pricing", [0.010] * 4, 0.04)
+    baseline = {
+        "routes": {
+            "home": {"p50_ms": 0.5, "p95_ms": 0.5},  # within the 1 ms slack
+            "pricing": {"p50_ms": 2.0, "p95_ms": 2.0},
+        }
+    }
+
+    regressions = benchmark.compare(report, baseline, threshold=0.5, slack_ms=1.0)
+
+    assert [(r.route, r.metric) for r in regressions] == [
+        ("pricing", "p50_ms"),
+        ("pricing", "p95_ms"),
+    ]
+
+
+@pytest.mark.benchmark
+def test_no_latency_regressions_against_baseline(db):
+    baseline = benchmark.load_baseline()
+    if not baseline:
+        pytest.skip(
+            "no benchmarks/baseline.json; run manage.py benchmark --update-baseline"
+        )
+    with benchmark.benchmark_settings():
+        report = benchmark.run_benchmarks(requests=baseline.get("requests", 200))
+
+    threshold = float(os.getenv("BENCHMARK_THRESHOLD", "0.5"))
+    regressions = benchmark.compare(report, baseline, threshold=threshold)
+    assert not regressions, "\n".join(map(str, regressions))
@@ -0,0 +1,69 @@
+import json
+import re
+import shutil
+
+import pytest
+from django.conf import settings
+from django.template import Context, Template
+from django.test import override_settings
+
+from sitecore import bundles
+from sitecore.critical_css import render_route
+
+
+@pytest.fixture
+def build_dir():
+    path = settings.STATICFILES_DIRS[0] / "build" / "test-tmp"
+    with override_settings(ASSET_BUILD_DIR=path):
+        yield path
+    shutil.rmtree(path, ignore_errors=True)
+
+
+def test_minify_css_keeps_strings_and_significant_spaces():
+    css = """
+    /* header */
+    .a :hover , .b > .c {
+      width: calc(100% - 2px);
+      font-family: "Segoe  UI", sans-serif;
+    }
+    """
+    assert bundles.minify_css(css) == (
+        '.a :hover,.b>.c{width:calc(100% - 2px);font-family:"Segoe  UI",sans-serif}'
+    )
+
+
+def test_minify_js_strips_comments_but_not_literals():
+    js = """
+    // leading comment
+    var s = 'a  // not a comment';   /* block */
+    var r = /[/]\\/x/g;
+    var half = total / 2; // trailing
+    """
+    assert bundles.minify_js(js) == (
+        "var s = 'a  // not a comment';\nvar r = /[/]\\/x/g;\nvar half = total / 2;"
+    )
+
+
+def test_script_tag_links_sources_until_built(build_dir):
+    html = Template("{% load assets %}{% script 'js/site.js' %}").render(Context())
+    assert re.findall(r'src="/static/([^"?]+)', html) == [
+        "js/theme.js",
+        "js/messages.js",
+    ]
+    assert html.count(" defer>") == 2
+
+
+def test_pages_link_built_bundles_instead_of_inline_scripts(build_dir):
+    result = bundles.build_bundles()
+    manifest = json.loads((build_dir / "bundles.json").read_text())
+    assert manifest["js/site.js"]["output"] == "build/test-tmp/js/site.js"
+    assert all(b.bytes < b.source_bytes for b in result.bundles)
+
+    html = render_route("pricing")
+    assert '<script src="/static/build/test-tmp/js/site.js?v=' in html
+    assert 'href="/static/build/test-tmp/css/site.css?v=' in html
+    assert "<script>" not in html
+
+    pricing = next(p for p in bundles.page_report() if p.route == "pricing")
+    assert pricing.html_after < pricing.html_before
+    assert pricing.assets_after < pricing.assets_before
@@ -0,0 +1,117 @@
+import multiprocessing
+import time
+
+from django.core.cache import cache
+from django.test import Client
+
+from sitecore import pagecache, views
+from sitecore.benchmark import run_cache_benchmarks
+from sitecore.cache import SQLiteCache
+
+
+def _cache(tmp_path, **options):
+    return SQLiteCache(str(tmp_path / "cache.sqlite3"), {"OPTIONS": options})
+
+
+def test_get_set_add_and_incr(tmp_path):
+    c = _cache(tmp_path)
+    c.set("page", {"html": "<p>"})
+    c.set("count", 1)
+    c.set("ratio", 0.5)
+
+    assert c.get("page") == {"html": "<p>"}
+    assert c.get_many(["page", "count", "missing"]) == {
+        "page": {"html": "<p>"},
+        "count": 1,
+    }
+    assert not c.add("count", 10)
+    assert c.add("new", True)
+    assert c.get("new") is True
+    assert c.incr("count", 4) == 5
+    assert c.incr("ratio") == 1.5  # pickled floats take the locked path
+    assert c.decr("count") == 4
+    assert c.delete("page")
+    assert not c.has_key("page")
+
+
+def test_expired_entries_are_misses_and_can_be_added_over(tmp_path):
+    c = _cache(tmp_path)
+    c.set("soon", "x", 0.05)
+    c.set("later", "y", 60)
+    assert c.touch("later", None)
+    time.sleep(0.1)
+
+    assert c.get("soon", "gone") == "gone"
+    assert not c.touch("soon")
+    assert c.add("soon", "again")
+    assert c.get("soon") == "again"
+    assert c.get("later") == "y"
+
+
+def test_least_recently_used_entries_are_culled(tmp_path, monkeypatch):
+    monkeypatch.setattr("sitecore.cache.TOUCH_INTERVAL", 0)
+    c = _cache(tmp_path, MAX_ENTRIES=3, CULL_FREQUENCY=3, CULL_EVERY=1)
+    for key in ("a", "b", "c"):
+        c.set(key, key)
+    c.get("a")  # now more recent than b and c
+    c.set("d", "d")
+
+    assert c.get_many(["a", "b", "c", "d"]) == {"a": "a", "c": "c", "d": "d"}
+
+
+def _incr(path, barrier):
+    c = SQLiteCache(path, {})
+    barrier.wait()
+    for _ in range(100):
+        c.incr("hits")
+
+
+def test_increments_from_several_processes_are_not_lost(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    SQLiteCache(path, {}).set("hits", 0)
+    ctx = multiprocessing.get_context("fork")
+    barrier = ctx.Barrier(4)
+    procs = [ctx.Process(target=_incr, args=(path, barrier)) for _ in range(4)]
+    for proc in procs:
+        proc.start()
+    for proc in procs:
+        proc.join()
+
+    assert SQLiteCache(path, {}).get("hits") == 400
+
+
+def _boom(*args, **kwargs):
+    raise AssertionError("rendered again")
+
+
+def test_new_worker_reuses_pages_rendered_by_another(monkeypatch):
+    pagecache.page_cache.clear()
+    first = Client().get("/pricing/")
+    pagecache.page_cache.clear()  # as if served by a different process
+    monkeypatch.setattr(views, "render", _boom)
+
+    again = Client().get("/pricing/")
+
+    assert again.content == first.content
+    assert len(pagecache.page_cache) == 1
+    assert any(key.startswith(":1:page:") for key in _keys())
+    pagecache.page_cache.clear()
+
+
+def _keys():
+    conn = cache._connect()
+    return [key for (key,) in conn.execute("SELECT key FROM entry")]
+
+
+def test_cache_benchmark_reports_which_backends_are_shared():
+    results = {
+        r.backend: r
+        for r in run_cache_benchmarks(
+            operations=20, value_bytes=64, processes=2, increments=20
+        )
+    }
+
+    assert set(results) == {"locmem", "filebased", "sqlite"}
+    assert not results["locmem"].shared
+    assert results["sqlite"].counted == results["sqlite"].expected == 40
+    assert all(m > 0 for r in results.values() for m in r.micros.values())
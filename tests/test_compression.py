@@ -0,0 +1,85 @@
+import gzip
+
+import pytest
+from django.http import HttpResponse, StreamingHttpResponse
+from django.test import Client, RequestFactory
+
+from sitecore import compression
+from sitecore.benchmark import run_compression_benchmarks
+from sitecore.compression import compress_response, compressed_cache, negotiate
+
+
+@pytest.fixture(autouse=True)
+def _empty_cache():
+    compressed_cache.clear()
+    yield
+    compressed_cache.clear()
+
+
+def test_negotiate_honours_q_values_and_wildcards(monkeypatch):
+    monkeypatch.setattr(compression, "available_encodings", lambda: ("br", "gzip"))
+
+    assert negotiate("gzip, deflate, br") == "br"
+    assert negotiate("br;q=0, gzip;q=0.5") == "gzip"
+    assert negotiate("identity") is None
+    assert negotiate("*") == "br"
+    assert negotiate("*, br;q=0") == "gzip"
+    assert negotiate("gzip;q=0") is None
+    assert negotiate("") is None
+
+
+def test_pages_are_gzipped_once_and_served_from_the_memo(db):
+    client = Client(headers={"Accept-Encoding": "gzip, deflate"})
+    plain = Client().get("/terms/")
+    first = client.get("/terms/")
+    second = client.get("/terms/")
+
+    assert first["Content-Encoding"] == "gzip"
+    assert gzip.decompress(first.content) == plain.content
+    assert first["Content-Length"] == str(len(first.content))
+    assert len(first.content) < len(plain.content) / 2
+    assert "Accept-Encoding" in first["Vary"]
+    assert "Accept-Encoding" in plain["Vary"]
+    assert first["ETag"] == "W/" + plain["ETag"]
+    assert second.content == first.content
+    assert compressed_cache.hits == 1
+    assert len(compressed_cache) == 1
+
+    again = client.get("/terms/", headers={"If-None-Match": first["ETag"]})
+    assert again.status_code == 304
+    assert again["Vary"] == first["Vary"]
+    assert again["ETag"] == first["ETag"]
+    # Without a negotiated encoding the 304 keeps the 200's strong ETag.
+    plain_again = Client().get("/terms/", headers={"If-None-Match": plain["ETag"]})
+    assert plain_again.status_code == 304
+    assert plain_again["Vary"] == plain["Vary"]
+    assert plain_again["ETag"] == plain["ETag"]
+
+
+def test_private_pages_are_compressed_but_not_memoized(db):
+    response = Client(headers={"Accept-Encoding": "gzip"}).get("/free-guide/")
+
+    assert response["Content-Encoding"] == "gzip"
+    assert b"csrfmiddlewaretoken" in gzip.decompress(response.content)
+    assert len(compressed_cache) == 0
+
+
+def test_small_encoded_streaming_and_binary_bodies_are_left_alone():
+    request = RequestFactory().get("/", headers={"Accept-Encoding": "gzip"})
+    big = b"<p>hello</p>" * 100
+    small = HttpResponse(b"ok", content_type="text/plain")
+    encoded = HttpResponse(big, headers={"Content-Encoding": "br"})
+    binary = HttpResponse(big, content_type="image/png")
+    streaming = StreamingHttpResponse(iter([big]))
+
+    for response in (small, encoded, binary, streaming):
+        assert not compress_response(request, response).has_header("Vary")
+    assert compress_response(request, HttpResponse(big))["Content-Encoding"] == "gzip"
+
+
+def test_compression_benchmark_reports_bytes_saved_and_cpu_time(db):
+    results = run_compression_benchmarks(rounds=2, routes=["terms"])
+
+    assert {r.route for r in results} == {"terms"}
+    assert ("gzip", 6) in {(r.encoding, r.level) for r in results}
+    assert all(r.saved > 0.5 and r.micros > r.memoized_micros for r in results)
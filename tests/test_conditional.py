@@ -0,0 +1,80 @@
+import time
+
+from django.test import Client, override_settings
+from django.utils.http import http_date
+
+from sitecore import conditional, views
+from sitecore.conditional import template_dependencies
+
+
+def test_content_page_emits_validators_and_policy():
+    resp = Client().get("/pricing/")
+    assert resp.status_code == 200
+    assert resp["ETag"].startswith('"')
+    assert "Last-Modified" in resp
+    assert "public" in resp["Cache-Control"]
+    assert "max-age=300" in resp["Cache-Control"]
+
+
+def test_if_none_match_returns_304_without_rendering(monkeypatch):
+    client = Client()
+    etag = client.get("/terms/")["ETag"]
+
+    def _boom(request):
+        raise AssertionError("view must not run for a matching validator")
+
+    monkeypatch.setattr(views, "render", _boom)
+    resp = client.get("/terms/", HTTP_IF_NONE_MATCH=etag)
+    assert resp.status_code == 304
+    assert resp["ETag"] == etag
+    assert resp.content == b""
+
+
+def test_if_modified_since_returns_304():
+    client = Client()
+    last_modified = client.get("/privacy/")["Last-Modified"]
+    resp = client.get("/privacy/", HTTP_IF_MODIFIED_SINCE=last_modified)
+    assert resp.status_code == 304
+
+
+def test_etag_changes_with_settings_the_view_reads():
+    client = Client()
+    before = client.get("/book/")["ETag"]
+    with override_settings(CALENDLY_URL="https://calendly.com/someone-else"):
+        assert client.get("/book/")["ETag"] != before
+    # pricing does not read CALENDLY_URL
+    pricing = client.get("/pricing/")["ETag"]
+    with override_settings(CALENDLY_URL="https://calendly.com/someone-else"):
+        assert client.get("/pricing/")["ETag"] == pricing
+
+
+def test_last_modified_comes_from_the_inputs_files(monkeypatch):
+    client = Client()
+    last_modified = client.get("/book/")["Last-Modified"]
+    # Any worker, restarted or not, derives the same value from the same files.
+    conditional._validator_cache.clear()
+    assert client.get("/book/")["Last-Modified"] == last_modified
+
+    # A settings or code change ships with a newer .env / source file.
+    later = int(time.time()) + 60
+    monkeypatch.setattr(conditional, "code_modified", lambda: later)
+    with override_settings(CALENDLY_URL="https://calendly.com/someone-else"):
+        resp = client.get("/book/", HTTP_IF_MODIFIED_SINCE=last_modified)
+    assert resp.status_code == 200
+    assert b"calendly.com/someone-else" in resp.content
+    assert resp["Last-Modified"] == http_date(later)
+
+
+def test_form_and_health_routes_are_not_cached():
+    client = Client()
+    form = client.get("/free-guide/")
+    assert "ETag" not in form
+    assert "private" in form["Cache-Control"]
+    assert "no-store" in client.get("/healthz/")["Cache-Control"]
+
+
+def test_template_dependencies_follow_extends():
+    names = [
+        t.origin.template_name for t in template_dependencies("sitecore/home.html")
+    ]
+    assert names == ["sitecore/home.html", "sitecore/base.html"]
@@ -0,0 +1,71 @@
+import json
+import shutil
+
+import pytest
+from django.conf import settings
+from django.test import override_settings
+
+from sitecore import critical_css
+
+CSS = """
+/* comment */
+:root { --brand: #4b6bfb; }
+@font-face { font-family: X; src: url(x.woff2); }
+.hero h1, .unused h1 { font-size: 48px; }
+.btn:hover { color: red; }
+#missing { color: blue; }
+html[data-theme='editorial'] .hero { color: #000; }
+@keyframes pulse { from { opacity: 0; } to { opacity: 1; } }
+@keyframes spin { to { transform: rotate(1turn); } }
+.card { animation: pulse 1s; }
+@media (max-width: 980px) { .hero { padding: 0; } .pricing-grid { gap: 0; } }
+"""
+
+HTML = """<html><body>
+<section class="hero"><h1>Hi</h1><a class="btn card">Go</a></section>
+</body></html>"""
+
+
+@pytest.fixture
+def build_dir():
+    path = settings.STATICFILES_DIRS[0] / "build" / "test-tmp"
+    with override_settings(ASSET_BUILD_DIR=path):
+        yield path
+    shutil.rmtree(path, ignore_errors=True)
+
+
+def test_extract_keeps_only_rules_used_by_the_markup():
+    out = critical_css.extract(CSS, HTML)
+    assert ":root{" in out
+    assert "@font-face{" in out
+    assert ".hero h1{font-size:48px}" in out  # unused selector dropped from the list
+    assert ".btn:hover{" in out
+    assert "#missing" not in out
+    assert "html[data-theme='editorial'] .hero{" in out  # set by script at runtime
+    assert "@keyframes pulse" in out and "spin" not in out
+    assert "@media (max-width:980px){.hero{padding:0}}" in out
+
+
+def test_build_writes_per_route_subsets_and_reuses_them(build_dir):
+    result = critical_css.build_critical_css()
+    index = json.loads((build_dir / "critical.json").read_text())
+    assert {"home", "pricing", "free_guide"} <= set(index)
+    assert "gom_onboarding" not in index  # standalone page with its own styles
+    assert all(size < result.stylesheet_bytes for size in result.pages.values())
+    assert (
+        ".msg-close" in (build_dir / "critical" / "free_guide_thanks.css").read_text()
+    )
+    again = critical_css.build_critical_css()
+    assert again.extracted == 0 and again.reused == len(index)
+
+
+def test_stylesheet_tag_inlines_critical_css_and_defers_the_full_file(build_dir):
+    html = critical_css.render_route("pricing")
+    assert '<link rel="stylesheet" href="/static/css/site.css' in html
+
+    critical_css.build_critical_css()
+    html = critical_css.render_route("pricing")
+    assert "<style>:root{" in html
+    assert '<link rel="preload" href="/static/css/site.css' in html
+    assert '<noscript><link rel="stylesheet" href="/static/css/site.css' in html
+    assert 'rel="preload" href="https://fonts.googleapis.com' in html
@@ -0,0 +1,19 @@
+from django.db import connection
+
+from sitecore.db import measure_contention
+
+
+def test_new_connections_get_the_sqlite_pragmas(db):
+    with connection.cursor() as cursor:
+        cursor.execute("PRAGMA busy_timeout")
+        assert cursor.fetchone()[0] == 20000
+        cursor.execute("PRAGMA synchronous")
+        assert cursor.fetchone()[0] == 1  # NORMAL
+
+
+def test_concurrent_lead_writes_from_several_processes_never_fail(tmp_path):
+    report = measure_contention(
+        str(tmp_path / "contention.sqlite3"), workers=4, writes=25
+    )
+    assert report.errors == 0
+    assert len(report.latencies) == 100
@@ -0,0 +1,69 @@
+import pytest
+from django.template import Context, Template, TemplateSyntaxError
+from django.test import Client, override_settings
+
+THIRD_PARTY_SCRIPTS = ("assets.calendly.com", "tally.so/widgets")
+
+
+def _render(source, **context):
+    return Template("{% load assets %}" + source).render(Context(context))
+
+
+def test_embed_renders_a_placeholder_linking_to_the_embed():
+    html = _render(
+        "{% embed 'iframe' url title='Intake' height='600px' allow='camera' %}",
+        url="https://forms.example.com/f?a=1&b=2",
+    )
+
+    assert html.startswith(
+        '<div class="embed-facade" data-embed="iframe" '
+        'data-src="https://forms.example.com/f?a=1&amp;b=2" data-title="Intake" '
+        'data-load="visible" data-allow="camera" style="height:600px">'
+        '<a class="btn btn-primary embed-load" '
+        'href="https://forms.example.com/f?a=1&amp;b=2" target="_blank" rel="noopener">'
+        "Open the form</a></div>"
+    )
+    assert '<script src="/static/js/embeds.js?v=' in html
+    assert "<iframe" not in html
+
+
+def test_several_embeds_link_the_script_once():
+    html = _render(
+        "{% embed 'calendly' url %}{% embed 'tally' url %}",
+        url="https://forms.example.com/f",
+    )
+
+    assert html.count('data-embed="') == 2
+    assert html.count("js/embeds.js") == 1
+
+
+def test_embed_without_url_renders_nothing_and_rejects_unknown_kinds():
+    assert _render("{% embed 'calendly' url %}", url="") == ""
+    with pytest.raises(TemplateSyntaxError, match="unknown kind 'youtube'"):
+        _render("{% embed 'youtube' 'https://youtube.com/x' %}")
+
+
+@override_settings(
+    CALENDLY_URL="https://calendly.com/great-owl",
+    ONBOARDING_EMBED_URL="https://tally.so/r/abc",
+)
+@pytest.mark.parametrize(
+    "path, kind",
+    [
+        ("/", "calendly"),
+        ("/book/", "calendly"),
+        ("/start/", "iframe"),
+        ("/gom-onboarding.html", "tally"),
+        ("/smartpro-agreement.html", "tally"),
+    ],
+)
+def test_pages_load_no_third_party_embed_up_front(db, path, kind):
+    html = Client().get(path).content.decode()
+
+    assert f'data-embed="{kind}"' in html
+    assert "<iframe" not in html
+    assert not any(script in html for script in THIRD_PARTY_SCRIPTS)
+
+
+def test_pages_without_embeds_do_not_load_the_embed_script(db):
+    assert "js/embeds.js" not in Client().get("/pricing/").content.decode()
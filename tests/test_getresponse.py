@@ -0,0 +1,153 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from sitecore.circuitbreaker import BreakerStore, CircuitBreaker
+from sitecore.getresponse import (
+    AdaptiveTimeout,
+    CircuitOpenError,
+    GetResponseClient,
+    GetResponseError,
+)
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        server = self.server
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        server.requests.append(
+            (self.path, self.headers["X-Auth-Token"], json.loads(body))
+        )
+        server.peers.add(self.client_address)
+        server.answering.wait(5)  # cleared: the API stops answering
+        status = server.statuses.pop(0) if server.statuses else 202
+        self.send_response(status)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def stub():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _StubHandler)
+    server.requests, server.peers, server.statuses = [], set(), []
+    server.answering = threading.Event()
+    server.answering.set()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.answering.set()
+    server.shutdown()
+    server.server_close()
+
+
+def _client(stub, breaker=None, timeout=None):
+    host, port = stub.server_address
+    return GetResponseClient(
+        "key", "LIST", f"http://{host}:{port}/v3", breaker=breaker, timeout=timeout
+    )
+
+
+def _breaker(tmp_path, **kwargs):
+    kwargs.setdefault("failure_threshold", 2)
+    kwargs.setdefault("reset_timeout", 60)
+    return CircuitBreaker(
+        "getresponse", BreakerStore(tmp_path / "breaker.sqlite3"), **kwargs
+    )
+
+
+def test_subscribe_reuses_keepalive_connection(stub):
+    client = _client(stub)
+    client.subscribe("Ann", "ann@example.com")
+    client.subscribe("Bob", "bob@example.com")
+    assert [r[0] for r in stub.requests] == ["/v3/contacts", "/v3/contacts"]
+    assert stub.requests[0][1] == "api-key key"
+    assert stub.requests[0][2]["campaign"] == {"campaignId": "LIST"}
+    assert len(stub.peers) == 1
+
+
+def test_conflict_counts_as_success_and_errors_raise(stub):
+    client = _client(stub)
+    stub.statuses[:] = [409, 400]
+    client.subscribe("", "dup@example.com")
+    with pytest.raises(GetResponseError):
+        client.subscribe("", "bad@example.com")
+
+
+def test_breaker_opens_and_is_shared_across_processes(stub, tmp_path):
+    client = _client(stub, breaker=_breaker(tmp_path))
+    stub.statuses[:] = [503, 503]
+    for _ in range(2):
+        with pytest.raises(GetResponseError):
+            client.subscribe("", "x@example.com")
+    with pytest.raises(CircuitOpenError):
+        client.subscribe("", "x@example.com")
+    assert len(stub.requests) == 2
+
+    # A second worker with its own in-memory state reads the shared store and fails fast.
+    other = _client(stub, breaker=_breaker(tmp_path))
+    started = time.perf_counter()
+    with pytest.raises(CircuitOpenError):
+        other.subscribe("", "x@example.com")
+    assert time.perf_counter() - started < 0.05
+    assert len(stub.requests) == 2
+
+
+def test_half_open_probe_closes_breaker(stub, tmp_path):
+    breaker = _breaker(tmp_path, reset_timeout=0.01)
+    client = _client(stub, breaker=breaker)
+    stub.statuses[:] = [503, 503]
+    for _ in range(2):
+        with pytest.raises(GetResponseError):
+            client.subscribe("", "x@example.com")
+    time.sleep(0.02)
+    client.subscribe("", "x@example.com")
+    assert breaker.store.load("getresponse").failures == 0
+
+
+def test_adaptive_timeout_tracks_latency():
+    timeout = AdaptiveTimeout(minimum=0.5, maximum=10)
+    assert timeout.current == 10
+    for _ in range(20):
+        timeout.observe(0.1)
+    assert timeout.current == 0.5
+    for _ in range(20):
+        timeout.observe(2.0)
+    assert 2.0 <= timeout.current < 10
+
+
+def test_adaptive_timeout_backs_off_on_timeouts():
+    timeout = AdaptiveTimeout(minimum=0.5, maximum=10)
+    for _ in range(20):
+        timeout.observe(0.1)
+    timeout.backoff()
+    assert timeout.current == 1.0
+    for _ in range(5):
+        timeout.backoff()
+    assert timeout.current == 10
+    timeout.observe(0.1)  # an answered call resumes the estimate
+    assert timeout.current < 10
+
+
+def test_timeouts_widen_the_timeout_until_the_api_answers(stub):
+    timeout = AdaptiveTimeout(minimum=0.05, maximum=2)
+    for _ in range(20):
+        timeout.observe(0.001)  # warmed up on a fast API
+    client = _client(stub, timeout=timeout)
+    assert timeout.current == 0.05
+
+    stub.answering.clear()
+    for expected in (0.1, 0.2, 0.4):
+        with pytest.raises(GetResponseError):
+            client.subscribe("", "slow@example.com")
+        assert timeout.current == expected
+    stub.answering.set()
+    client.subscribe("", "back@example.com")
+    assert timeout.current < 0.4  # an answered call resumes the estimate
@@ -0,0 +1,55 @@
+import json
+import shutil
+
+import pytest
+from django.conf import settings
+from django.template import Context, Template
+from django.test import override_settings
+
+from sitecore import images
+
+
+@pytest.fixture
+def build_dir():
+    # The build dir must sit inside the static source dir; use a throwaway subfolder.
+    path = settings.STATICFILES_DIRS[0] / "build" / "test-tmp"
+    with override_settings(ASSET_BUILD_DIR=path):
+        yield path
+    shutil.rmtree(path, ignore_errors=True)
+
+
+def test_build_dedupes_identical_sources_and_records_dimensions(build_dir):
+    result = images.build_images()
+    manifest = json.loads((build_dir / "images.json").read_text())
+    hero, robot = manifest["img/hero-owl.png"], manifest["img/robot owl.png"]
+    assert hero == robot
+    assert (hero["width"], hero["height"]) == (1024, 1024)
+    assert ("img/robot owl.png", "img/hero-owl.png") in result.duplicates
+    widths = [w for w, _ in hero["variants"]["webp"]]
+    assert widths[-1] == 1024 and widths == sorted(widths)
+    assert all(
+        (settings.STATICFILES_DIRS[0] / p).exists() for _, p in hero["variants"]["webp"]
+    )
+
+    again = images.build_images()
+    assert again.generated == 0
+
+
+def test_responsive_image_tag_renders_picture(build_dir):
+    images.build_images()
+    html = Template(
+        "{% load assets %}{% responsive_image 'img/hero-owl.png' alt='Owl' class='hero-owl' %}"
+    ).render(Context())
+    assert html.startswith("<picture>")
+    assert 'type="image/webp"' in html
+    assert "1024w" in html
+    assert 'width="1024" height="1024"' in html
+    assert 'class="hero-owl"' in html
+    assert 'loading="lazy"' in html
+
+
+def test_responsive_image_tag_falls_back_for_unknown_or_external_images(build_dir):
+    html = Template(
+        "{% load assets %}{% responsive_image 'https://cdn.example.com/x.png' alt='X' %}"
+    ).render(Context())
+    assert html.startswith('<img src="https://cdn.example.com/x.png"')
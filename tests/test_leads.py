@@ -0,0 +1,58 @@
+import time
+
+import pytest
+from django.db import IntegrityError, transaction
+
+from sitecore import leads
+from sitecore.models import Lead, OutboxMessage
+
+
+def test_ingest_normalizes_and_upserts_by_email(db):
+    leads.ingest("Ada", " Ada@Example.COM", True)
+    leads.ingest("", "ada@example.com", True)
+    leads.ingest("Ada L.", "ADA@example.com", True)
+    lead = Lead.objects.get()
+    assert (lead.email, lead.name) == ("ada@example.com", "Ada L.")
+    assert OutboxMessage.objects.count() == 3
+
+
+def test_blank_name_never_overwrites_a_stored_one(db):
+    leads.ingest("Grace", "grace@example.com", True)
+    leads.ingest("", "Grace@example.com", True)
+    assert Lead.objects.get().name == "Grace"
+
+
+def test_case_variants_cannot_be_inserted_around_the_service(db):
+    Lead.objects.create(email="linus@example.com")
+    with pytest.raises(IntegrityError), transaction.atomic():
+        Lead.objects.create(email="Linus@Example.com")
+
+
+def test_batch_coalesces_duplicate_addresses(db):
+    written = leads.ingest_many(
+        [
+            leads.Submission("A", "a@example.com", True),
+            leads.Submission("", "A@EXAMPLE.com", True),
+            leads.Submission("B", "b@example.com", True),
+        ]
+    )
+    assert written == 2
+    assert dict(Lead.objects.values_list("email", "name")) == {
+        "a@example.com": "A",
+        "b@example.com": "B",
+    }
+
+
+def test_write_behind_flushes_full_batches_from_a_background_thread(db):
+    buffer = leads.WriteBehindBuffer(max_rows=3, max_delay=30)
+    for i in range(3):
+        buffer.submit(leads.Submission("", f"user{i}@example.com", True))
+    deadline = time.monotonic() + 5
+    while Lead.objects.count() < 3 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert Lead.objects.count() == 3
+    assert buffer.batches == 1
+
+    buffer.submit(leads.Submission("", "late@example.com", True))
+    assert buffer.flush() == 1
+    assert Lead.objects.filter(email="late@example.com").exists()
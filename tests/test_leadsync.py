@@ -0,0 +1,72 @@
+import time
+
+import pytest
+
+from sitecore import getresponse, leadsync
+from sitecore.models import Lead
+
+
+def _leads(n):
+    Lead.objects.bulk_create(
+        Lead(email=f"lead{i}@example.com", consent=True) for i in range(n)
+    )
+
+
+def test_sync_leads_pushes_unsynced_and_marks_them(db, monkeypatch, tmp_path):
+    _leads(25)
+    Lead.objects.filter(email="lead0@example.com").update(synced_at="2025-01-01T00:00Z")
+    pushed = []
+    monkeypatch.setattr(
+        getresponse, "subscribe", lambda name, email: pushed.append(email)
+    )
+    checkpoint = leadsync.Checkpoint(tmp_path / "cp.json")
+
+    stats = leadsync.sync_leads(
+        workers=4, rps=1000, batch_size=10, checkpoint=checkpoint
+    )
+
+    assert stats.synced == 24
+    assert "lead0@example.com" not in pushed
+    assert not Lead.objects.filter(synced_at__isnull=True).exists()
+    assert not checkpoint.path.exists()  # a completed run leaves nothing to resume
+
+
+def test_failures_are_recorded_and_retried_next_run(db, monkeypatch):
+    _leads(3)
+
+    def _flaky(name, email):
+        if email == "lead1@example.com":
+            raise getresponse.GetResponseError("HTTP 400")
+
+    monkeypatch.setattr(getresponse, "subscribe", _flaky)
+    stats = leadsync.sync_leads(workers=2, rps=1000)
+    assert (stats.synced, stats.failed) == (2, 1)
+    assert Lead.objects.get(email="lead1@example.com").sync_error == "HTTP 400"
+
+
+def test_circuit_open_stops_run_and_checkpoint_resumes(db, monkeypatch, tmp_path):
+    _leads(6)
+    ids = list(Lead.objects.order_by("id").values_list("id", flat=True))
+
+    def _down_after_third(name, email):
+        if int(email[4]) >= 3:
+            raise getresponse.CircuitOpenError(30)
+
+    monkeypatch.setattr(getresponse, "subscribe", _down_after_third)
+    checkpoint = leadsync.Checkpoint(tmp_path / "cp.json")
+    with pytest.raises(getresponse.CircuitOpenError):
+        leadsync.sync_leads(workers=1, rps=1000, batch_size=6, checkpoint=checkpoint)
+    assert checkpoint.load() == ids[2]
+    assert Lead.objects.filter(synced_at__isnull=True).count() == 3
+
+    monkeypatch.setattr(getresponse, "subscribe", lambda name, email: None)
+    stats = leadsync.sync_leads(workers=1, rps=1000, checkpoint=checkpoint)
+    assert stats.synced == 3
+
+
+def test_rate_limiter_bounds_throughput():
+    limiter = leadsync.RateLimiter(rate=200, burst=1)
+    started = time.monotonic()
+    for _ in range(21):
+        limiter.acquire()
+    assert time.monotonic() - started >= 0.09
@@ -0,0 +1,102 @@
+import multiprocessing
+import os
+import re
+import time
+
+from django.test import Client, override_settings
+
+from sitecore import metrics, shedding
+from sitecore.models import Lead
+
+
+def _child(directory):
+    metrics.Registry(directory).inc("http_request_db_queries_total", {"route": "x"}, 2)
+
+
+def test_values_from_exited_processes_are_summed_and_folded(tmp_path):
+    ctx = multiprocessing.get_context("fork")
+    for _ in range(2):
+        proc = ctx.Process(target=_child, args=(tmp_path,))
+        proc.start()
+        proc.join()
+    registry = metrics.Registry(tmp_path)
+    registry.inc("http_request_db_queries_total", {"route": "x"}, 1)
+
+    samples = registry.collect()
+
+    assert samples['http_request_db_queries_total{route="x"}'] == 5
+    # Only this process's file is left; the others went into the archive.
+    assert [p.name for p in tmp_path.glob("values-*.bin")] == [
+        f"values-{os.getpid()}.bin"
+    ]
+    assert registry.collect() == samples
+
+
+def test_value_file_grows_and_reopens(tmp_path):
+    path = tmp_path / "values-1.bin"
+    values = metrics.ValueFile(path)
+    for i in range(3000):  # well past the initial 64 KiB
+        values.add(f"sample_{i}{{}}", i)
+    reopened = metrics.ValueFile(path)
+    reopened.add("sample_7{}", 1)
+    assert metrics.read_values(path)["sample_7{}"] == 8
+    assert len(metrics.read_values(path)) == 3000
+
+
+def test_histogram_exposition_is_cumulative(tmp_path):
+    registry = metrics.Registry(tmp_path)
+    for seconds in (0.001, 0.02, 0.02, 20):
+        registry.observe("http_request_duration_seconds", {"route": "home"}, seconds)
+
+    text = metrics.render_prometheus(registry.collect())
+
+    assert "# TYPE http_request_duration_seconds histogram" in text
+    assert 'http_request_duration_seconds_bucket{route="home",le="0.005"} 1' in text
+    assert 'http_request_duration_seconds_bucket{route="home",le="0.025"} 3' in text
+    assert 'http_request_duration_seconds_bucket{route="home",le="10.0"} 3' in text
+    assert 'http_request_duration_seconds_bucket{route="home",le="+Inf"} 4' in text
+    assert 'http_request_duration_seconds_count{route="home"} 4' in text
+
+
+def test_requests_get_server_timing_and_show_up_in_metrics(db):
+    client = Client()
+    page = client.get("/pricing/")
+    assert re.search(r"total;dur=[\d.]+, tpl;dur=[\d.]+", page["Server-Timing"])
+
+    client.post("/free-guide/", {"email": "a@example.com", "consent": True})
+    assert Lead.objects.exists()
+    shedding.get_shedder().counters.flush()
+
+    with override_settings(METRICS_TOKEN="t0ken"):
+        text = client.get(
+            "/metrics", HTTP_AUTHORIZATION="Bearer t0ken"
+        ).content.decode()
+    assert (
+        'http_request_duration_seconds_count{method="GET",route="pricing",status="2xx"} 1'
+        in text
+    )
+    assert re.search(r'http_request_db_queries_total\{route="free_guide"\} [1-9]', text)
+    assert 'http_request_template_seconds_total{route="pricing"}' in text
+    assert 'lead_shed_total{outcome="passed"} 1' in text
+
+
+def test_metrics_endpoint_access():
+    client = Client(REMOTE_ADDR="203.0.113.9")
+    assert client.get("/metrics").status_code == 404
+    # Behind a same-host proxy every visitor looks local: no token, no endpoint.
+    assert Client(REMOTE_ADDR="127.0.0.1").get("/metrics").status_code == 404
+    with override_settings(METRICS_TOKEN="t0ken"):
+        assert client.get("/metrics").status_code == 404
+        ok = client.get("/metrics", HTTP_AUTHORIZATION="Bearer t0ken")
+    assert ok.status_code == 200
+    assert ok["Content-Type"].startswith("text/plain; version=0.0.4")
+
+
+def test_recording_overhead_is_small(tmp_path):
+    registry = metrics.Registry(tmp_path)
+    labels = {"route": "home", "method": "GET", "status": "2xx"}
+    registry.observe("http_request_duration_seconds", labels, 0.01)
+    started = time.perf_counter()
+    for _ in range(2000):
+        registry.observe("http_request_duration_seconds", labels, 0.01)
+    assert (time.perf_counter() - started) / 2000 < 0.0001
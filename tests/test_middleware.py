@@ -1,5 +1,5 @@
 from django.http import HttpResponse
-from django.test import RequestFactory
+from django.test import Client, RequestFactory, override_settings
 
 from sitecore.middleware import PermissionsPolicyMiddleware
 
@@ -15,3 +15,45 @@ def test_permissions_policy_headers_present():
     response = middleware(request)
     assert response["Permissions-Policy"] == "payment=*"
     assert response["Feature-Policy"] == "payment *"
+
+
+def test_stateless_pages_skip_session_csrf_and_messages(db):
+    client = Client()
+    client.cookies["sessionid"] = "some-admin-session"
+    response = client.get("/pricing/")
+
+    assert response.status_code == 200
+    assert not hasattr(response.wsgi_request, "session")
+    assert not hasattr(response.wsgi_request, "user")
+    assert response.wsgi_request.resolver_match.url_name == "pricing"
+    assert not response.cookies
+    # Only compression varies the response (sitecore.compression), never the cookies.
+    assert response["Vary"] == "Accept-Encoding"
+    assert response["Cache-Control"] == "public, max-age=300"
+    assert response["Content-Length"] == str(len(response.content))
+    # Header-only middleware still apply.
+    assert response["X-Frame-Options"] == "DENY"
+    assert response["Permissions-Policy"] == "payment=*"
+
+
+def test_pending_flash_message_takes_the_full_stack(db):
+    client = Client()
+    client.post(
+        "/free-guide/", {"name": "Ada", "email": "ada@example.com", "consent": True}
+    )
+    response = client.get("/pricing/")
+
+    assert hasattr(response.wsgi_request, "session")
+    assert b"Your free guide is on its way" in response.content
+    assert "private" in response["Cache-Control"]
+    # Once shown, the message cookie is cleared and the fast path applies again.
+    assert not hasattr(client.get("/pricing/").wsgi_request, "session")
+
+
+def test_forms_and_posts_keep_the_full_stack(db):
+    client = Client()
+    assert hasattr(client.get("/free-guide/").wsgi_request, "session")
+    with override_settings(STATELESS_FAST_PATH=False):
+        assert hasattr(client.get("/pricing/").wsgi_request, "session")
+    # Missing slash: CommonMiddleware still redirects.
+    assert client.get("/pricing").status_code == 301
@@ -0,0 +1,94 @@
+from datetime import timedelta
+
+from django.test import Client
+from django.utils import timezone
+
+from sitecore import getresponse, outbox
+from sitecore.models import Lead, OutboxMessage
+
+
+def _post_lead(email="lead@example.com"):
+    return Client().post(
+        "/free-guide/", {"name": "Test User", "email": email, "consent": True}
+    )
+
+
+def test_lead_post_enqueues_without_calling_api(db, monkeypatch):
+    def _fail(*args, **kwargs):
+        raise AssertionError("the request path must not call GetResponse")
+
+    monkeypatch.setattr(getresponse, "subscribe", _fail)
+    resp = _post_lead()
+    assert resp.status_code == 302
+    assert Lead.objects.filter(email="lead@example.com").exists()
+    message = OutboxMessage.objects.get()
+    assert message.kind == OutboxMessage.KIND_GETRESPONSE_SUBSCRIBE
+    assert message.payload == {"name": "Test User", "email": "lead@example.com"}
+    assert message.status == OutboxMessage.Status.PENDING
+
+
+def test_drain_marks_sent(db, monkeypatch):
+    delivered = []
+    monkeypatch.setattr(
+        getresponse, "subscribe", lambda name, email: delivered.append(email)
+    )
+    _post_lead()
+    result = outbox.drain()
+    assert result.sent == 1
+    assert delivered == ["lead@example.com"]
+    assert OutboxMessage.objects.get().status == OutboxMessage.Status.SENT
+
+
+def test_drain_retries_with_backoff_then_dead_letters(db, monkeypatch):
+    def _down(name, email):
+        raise getresponse.GetResponseError("HTTP 503")
+
+    monkeypatch.setattr(getresponse, "subscribe", _down)
+    _post_lead()
+
+    result = outbox.drain(max_attempts=2)
+    message = OutboxMessage.objects.get()
+    assert result.retried == 1
+    assert message.status == OutboxMessage.Status.PENDING
+    assert message.next_attempt_at > timezone.now()
+    assert message.last_error == "HTTP 503"
+
+    # Not due yet: nothing is picked up.
+    assert outbox.drain(max_attempts=2).processed == 0
+
+    OutboxMessage.objects.update(next_attempt_at=timezone.now() - timedelta(seconds=1))
+    result = outbox.drain(max_attempts=2)
+    assert result.dead == 1
+    message.refresh_from_db()
+    assert message.status == OutboxMessage.Status.DEAD
+    assert message.attempts == 2
+
+
+def test_permanent_rejection_dead_letters_on_the_first_attempt(db, monkeypatch):
+    def _reject(name, email):
+        raise getresponse.GetResponseError("GetResponse returned HTTP 422", 422)
+
+    monkeypatch.setattr(getresponse, "subscribe", _reject)
+    _post_lead()
+    result = outbox.drain()
+    assert (result.dead, result.retried) == (1, 0)
+    message = OutboxMessage.objects.get()
+    assert message.status == OutboxMessage.Status.DEAD
+    assert message.attempts == 1
+    assert message.last_error == "GetResponse returned HTTP 422"
+
+
+def test_rate_limited_delivery_is_retried(db, monkeypatch):
+    def _limited(name, email):
+        raise getresponse.GetResponseError("GetResponse returned HTTP 429", 429)
+
+    monkeypatch.setattr(getresponse, "subscribe", _limited)
+    _post_lead()
+    assert outbox.drain().retried == 1
+    assert OutboxMessage.objects.get().status == OutboxMessage.Status.PENDING
+
+
+def test_backoff_grows_and_is_capped():
+    assert 24 <= outbox.backoff_delay(1) <= 36
+    assert 48 <= outbox.backoff_delay(2) <= 72
+    assert outbox.backoff_delay(50) <= outbox.BACKOFF_MAX * 1.2
@@ -0,0 +1,114 @@
+from unittest import mock
+
+import pytest
+from django.contrib.messages.storage.fallback import FallbackStorage
+from django.http import HttpResponse
+from django.middleware.csrf import get_token
+from django.test import Client, RequestFactory, override_settings
+
+from sitecore import pagecache
+from sitecore.pagecache import CachedPage, PageCache, cache_page_response
+
+
+@pytest.fixture(autouse=True)
+def _empty_cache():
+    pagecache.page_cache.clear()
+    yield
+    pagecache.page_cache.clear()
+
+
+def _counting_view(calls, csrf=False):
+    @cache_page_response
+    def view(request):
+        calls.append(request.path)
+        if csrf:
+            get_token(request)
+        return HttpResponse(f"render {len(calls)}", content_type="text/html")
+
+    return view
+
+
+def test_second_hit_is_served_from_cache():
+    calls = []
+    view = _counting_view(calls)
+    rf = RequestFactory()
+    first = view(rf.get("/pricing/"))
+    second = view(rf.get("/pricing/"))
+    assert calls == ["/pricing/"]
+    assert second.content == first.content
+    assert second["Content-Type"] == "text/html"
+
+
+def test_post_and_csrf_pages_bypass_cache():
+    calls = []
+    view = _counting_view(calls, csrf=True)
+    rf = RequestFactory()
+    view(rf.get("/x/"))
+    view(rf.get("/x/"))
+    view(rf.post("/x/"))
+    assert len(calls) == 3
+
+
+def test_pending_messages_bypass_cache():
+    calls = []
+    view = _counting_view(calls)
+    request = RequestFactory().get("/")
+    request.session = {}
+    request._messages = FallbackStorage(request)
+    request._messages.add(20, "hello")
+    view(request)
+    view(request)
+    assert len(calls) == 2
+
+
+def test_static_manifest_is_part_of_the_key():
+    calls = []
+    view = _counting_view(calls)
+    rf = RequestFactory()
+    view(rf.get("/"))
+    with mock.patch(
+        "sitecore.pagecache.manifest_fingerprint", return_value="next-deploy"
+    ):
+        view(rf.get("/"))
+    assert len(calls) == 2
+
+
+def test_code_version_is_part_of_the_key():
+    calls = []
+    view = _counting_view(calls)
+    rf = RequestFactory()
+    view(rf.get("/"))
+    with mock.patch("sitecore.pagecache.code_fingerprint", return_value="next-build"):
+        view(rf.get("/"))
+    assert len(calls) == 2
+
+
+def test_shared_page_is_not_served_after_a_settings_change():
+    with override_settings(CALENDLY_URL="https://calendly.com/old"):
+        assert b"calendly.com/old" in Client().get("/").content
+    pagecache.page_cache.clear()  # a new worker, started after the .env change
+    with override_settings(CALENDLY_URL="https://calendly.com/new"):
+        content = Client().get("/").content
+    assert b"calendly.com/new" in content
+    assert b"calendly.com/old" not in content
+
+
+def test_lru_is_bounded_by_entries_and_bytes():
+    cache = PageCache(max_entries=2, max_bytes=10)
+    cache.set(("a",), CachedPage(b"1234", 200, ()))
+    cache.set(("b",), CachedPage(b"1234", 200, ()))
+    cache.get(("a",))
+    cache.set(("c",), CachedPage(b"1234", 200, ()))
+    assert cache.get(("b",)) is None
+    assert cache.get(("a",)) is not None
+    cache.set(("d",), CachedPage(b"123456789", 200, ()))
+    assert len(cache) == 1
+
+
+def test_home_page_cached_end_to_end():
+    client = Client()
+    first = client.get("/")
+    assert first.status_code == 200
+    assert len(pagecache.page_cache) == 1
+    assert client.get("/").content == first.content
+    assert pagecache.page_cache.hits == 1
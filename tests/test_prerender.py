@@ -0,0 +1,52 @@
+import gzip
+import json
+
+from django.conf import settings
+from django.http import HttpResponse
+from django.test import RequestFactory, override_settings
+from whitenoise.middleware import WhiteNoiseMiddleware
+
+from sitecore.prerender import prerender, prerenderable_paths
+
+
+def test_only_content_routes_are_prerendered():
+    paths = prerenderable_paths()
+    assert "/" in paths
+    assert "/gom-onboarding.html" in paths
+    assert "/free-guide/" not in paths
+    assert "/free-guide/thanks/" not in paths
+    assert "/healthz/" not in paths
+
+
+def test_prerendered_files_are_not_under_the_public_static_root():
+    static_root = settings.STATIC_ROOT.resolve()
+    assert static_root not in settings.PRERENDER_DIR.resolve().parents
+    assert settings.PRERENDER_ROOT.parent == settings.PRERENDER_DIR
+
+
+def test_prerender_writes_pages_siblings_and_manifest(tmp_path):
+    root = tmp_path / "pages"
+    pages = prerender(root)
+    html = (root / "pricing" / "index.html").read_bytes()
+    assert b"Transparent Pricing" in html
+    assert gzip.decompress((root / "pricing" / "index.html.gz").read_bytes()) == html
+    assert (root / "index.html").exists()
+    assert (root / "gom-onboarding.html").exists()
+    manifest = json.loads((tmp_path / "pages.manifest.json").read_text())
+    assert len(manifest["pages"]) == len(pages)
+    assert {p["path"] for p in manifest["pages"]} == set(prerenderable_paths())
+
+
+def test_whitenoise_serves_prerendered_pages_at_site_root(tmp_path):
+    root = tmp_path / "pages"
+    prerender(root)
+
+    def _django(request):
+        return HttpResponse("dynamic")
+
+    with override_settings(WHITENOISE_ROOT=root, WHITENOISE_INDEX_FILE=True):
+        middleware = WhiteNoiseMiddleware(_django)
+    rf = RequestFactory()
+    served = middleware(rf.get("/terms/", HTTP_ACCEPT_ENCODING="gzip"))
+    assert served["Content-Encoding"] == "gzip"
+    assert middleware(rf.get("/free-guide/")).content == b"dynamic"
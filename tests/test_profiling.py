@@ -0,0 +1,116 @@
+import asyncio
+import time
+from collections import Counter
+from io import StringIO
+
+from django.conf import settings
+from django.core.management import call_command
+from django.http import HttpResponse
+from django.test import RequestFactory, override_settings
+from django.urls import resolve
+
+from sitecore import profiling
+from sitecore.profiling import ProfilingMiddleware, hot_functions, load_profiles
+
+
+def _busy(seconds):
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        pass
+
+
+def _slow_view(request):
+    _busy(0.05)
+    return HttpResponse("ok")
+
+
+def _request(**headers):
+    request = RequestFactory().get("/pricing/", headers=headers)
+    request.resolver_match = resolve("/pricing/")
+    return request
+
+
+def _profiles():
+    return sorted(settings.PROFILE_DIR.glob("*/*.folded"))
+
+
+@override_settings(PROFILE_SAMPLE_RATE=1, PROFILE_INTERVAL_MS=1)
+def test_sampled_request_writes_collapsed_stacks_for_its_route():
+    response = ProfilingMiddleware(_slow_view)(_request())
+
+    assert response.content == b"ok"
+    [path] = _profiles()
+    assert path.parent.name == "pricing"
+    lines = path.read_text().splitlines()
+    stack, count = lines[0].rsplit(" ", 1)
+    assert int(count) >= 1
+    # Rooted just below the middleware, with paths relative to the project.
+    assert stack.startswith("tests/test_profiling.py:_slow_view;")
+    assert any("tests/test_profiling.py:_busy" in line for line in lines)
+
+
+@override_settings(PROFILE_SAMPLE_RATE=0, PROFILE_INTERVAL_MS=1)
+def test_only_requests_with_a_valid_token_are_profiled_when_sampling_is_off():
+    middleware = ProfilingMiddleware(_slow_view)
+    middleware(_request())
+    middleware(_request(**{"X-Profile-Token": "forged"}))
+    assert not _profiles()
+
+    middleware(_request(**{"X-Profile-Token": profiling.issue_token()}))
+    assert len(_profiles()) == 1
+
+
+@override_settings(PROFILE_SAMPLE_RATE=1, PROFILE_INTERVAL_MS=1)
+def test_async_requests_are_sampled_while_their_coroutine_runs():
+    async def view(request):
+        await asyncio.sleep(0.02)  # not sampled: the loop is idle
+        _busy(0.05)
+        return HttpResponse("ok")
+
+    asyncio.run(ProfilingMiddleware(view)(_request()))
+
+    [path] = _profiles()
+    assert "view" in path.read_text()
+    assert "select" not in path.read_text()
+
+
+@override_settings(PROFILE_MAX_FILES=3)
+def test_only_the_newest_profiles_are_kept(tmp_path):
+    for i in range(5):
+        profiling.write_profile(tmp_path, f"route{i % 2}", Counter({"a;b": 1}), 0.01)
+
+    assert len(list(tmp_path.glob("*/*.folded"))) == 3
+
+
+def test_report_ranks_hot_functions_across_requests(tmp_path):
+    counts = Counter(
+        {"views:lead_magnet;render;Template.render": 6, "views:lead_magnet;save": 2}
+    )
+    for _ in range(2):
+        profiling.write_profile(tmp_path, "free_guide", counts, 0.01)
+    profiling.write_profile(tmp_path, "pricing", Counter({"views:pricing": 1}), 0.01)
+
+    profiles = load_profiles(tmp_path, ["free_guide"])
+    requests, merged = profiles["free_guide"]
+
+    assert list(profiles) == ["free_guide"]
+    assert requests == 2
+    assert [(f.name, f.own, f.total) for f in hot_functions(merged, 3)] == [
+        ("Template.render", 12, 12),
+        ("save", 4, 4),
+        ("views:lead_magnet", 0, 16),
+    ]
+
+    with override_settings(PROFILE_DIR=tmp_path):
+        out = StringIO()
+        call_command("profile_report", "--folded", tmp_path / "all.folded", stdout=out)
+    assert "free_guide: 2 requests, 16 samples" in out.getvalue()
+    assert " 75.0%   75.0%  Template.render" in out.getvalue()
+    assert "views:pricing 1\n" in (tmp_path / "all.folded").read_text()
+
+
+def test_token_command_issues_a_usable_token():
+    out = StringIO()
+    call_command("profile_report", "--token", stdout=out)
+    token = out.getvalue().splitlines()[0].split(": ", 1)[1]
+    assert profiling._valid_token(token)
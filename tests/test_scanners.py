@@ -0,0 +1,66 @@
+from django.db import connection
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from sitecore import metrics
+from sitecore.scanners import PrefixTrie, get_rules
+
+
+def test_prefix_trie_returns_the_shortest_stored_prefix():
+    trie = PrefixTrie(["/wp", "/wp-admin", "/.git"])
+
+    assert trie.match("/wp-admin/setup.php") == "/wp"
+    assert trie.match("/.git") == "/.git"
+    assert trie.match("/.gi") is None
+    assert trie.match("/pricing/") is None
+
+
+def test_probes_get_a_small_cacheable_404_without_sessions_or_queries(db):
+    client = Client()
+    with CaptureQueriesContext(connection) as queries:
+        responses = [
+            client.get(path)
+            for path in ("/wp-login.php", "/WP-Admin/install.php", "/.env", "/x/y.aspx")
+        ]
+        post = client.post("/xmlrpc.php", "<xml/>", content_type="text/xml")
+
+    assert len(queries) == 0
+    for response in [*responses, post]:
+        assert response.status_code == 404
+        assert response.content == b"Not Found\n"
+        assert response["Cache-Control"] == "public, max-age=86400"
+        assert not hasattr(response.wsgi_request, "session")
+        assert response.wsgi_request.resolver_match is None
+    samples = metrics.registry().collect()
+    assert samples['scanner_rejects_total{rule="path:/wp-login.php"}'] == 1
+    assert samples['scanner_rejects_total{rule="prefix:/wp-admin"}'] == 1
+    assert samples['scanner_rejects_total{rule="suffix:.aspx"}'] == 1
+
+
+def test_real_routes_are_never_rejected(db):
+    client = Client()
+    with override_settings(
+        SCANNER_BLOCK_SUFFIXES=[".html"], SCANNER_BLOCK_PREFIXES=["/admin", "/static"]
+    ):
+        assert client.get("/gom-onboarding.html").status_code == 200
+        assert client.get("/admin/login/").status_code == 200
+        assert get_rules().rejects("/static/css/site.css") is None
+        assert get_rules().rejects("/other.html") == "suffix:.html"
+
+
+def test_unlisted_paths_still_get_the_site_404(db):
+    response = Client().get("/no-such-page/")
+
+    assert response.status_code == 404
+    assert response.content != b"Not Found\n"
+
+
+@override_settings(SCANNER_REJECT_STATUS=410)
+def test_status_is_configurable_and_middleware_can_be_disabled(db):
+    client = Client()
+    assert client.get("/.git/config").status_code == 410
+    assert client.get("/.git/config").content == b"Gone\n"
+    with override_settings(SCANNER_REJECT_ENABLED=False):
+        response = client.get("/.git/config")
+    assert response.status_code == 404
+    assert response.content != b"Not Found\n"
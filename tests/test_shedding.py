@@ -0,0 +1,106 @@
+import io
+import time
+
+from django.core.management import call_command
+from django.test import Client, override_settings
+
+from sitecore import shedding
+from sitecore.models import Lead, OutboxMessage
+
+
+def _post(client, email="lead@example.com", **extra):
+    data = {"name": "Test User", "email": email, "consent": True, **extra}
+    return client.post("/free-guide/", data)
+
+
+def test_token_bucket_is_shared_through_the_store(tmp_path):
+    store = shedding.SheddingStore(tmp_path / "s.sqlite3")
+    # Two limiters stand in for two worker processes.
+    first = shedding.RateLimiter(store, per_minute=60, burst=2)
+    second = shedding.RateLimiter(
+        shedding.SheddingStore(tmp_path / "s.sqlite3"), per_minute=60, burst=2
+    )
+
+    assert first.retry_after("1.2.3.4") == 0
+    assert second.retry_after("1.2.3.4") == 0
+    wait = first.retry_after("1.2.3.4")
+    assert 0 < wait <= 1
+    assert second.retry_after("1.2.3.4") > 0
+    assert first.retry_after("5.6.7.8") == 0  # other addresses are unaffected
+
+
+def test_rejections_are_served_from_memory(tmp_path):
+    limiter = shedding.RateLimiter(
+        shedding.SheddingStore(tmp_path / "s.sqlite3"), per_minute=1, burst=1
+    )
+    limiter.retry_after("ip")
+    limiter.retry_after("ip")
+    limiter.store = None  # any store access would now fail
+
+    started = time.perf_counter()
+    for _ in range(1000):
+        assert limiter.retry_after("ip") > 0
+    assert (time.perf_counter() - started) / 1000 < 0.0001
+
+
+def test_recent_emails_remember_across_instances_and_expire(tmp_path, monkeypatch):
+    clock = [1_000_000.0]
+    monkeypatch.setattr(shedding.time, "time", lambda: clock[0])
+    recent = shedding.RecentEmails(tmp_path / "r.bloom", window=100, bits=1 << 16)
+    recent.add("a@example.com")
+
+    other = shedding.RecentEmails(tmp_path / "r.bloom", window=100, bits=1 << 16)
+    assert "a@example.com" in other
+    assert "b@example.com" not in other
+    clock[0] += 100  # still in the previous generation
+    assert "a@example.com" in other
+    clock[0] += 100
+    other.add("c@example.com")  # starts a new generation over the oldest one
+    assert "a@example.com" not in other
+
+
+def test_flood_is_shed_with_429(db):
+    client = Client()
+    with override_settings(LEAD_RATE_BURST=2, LEAD_RATE_PER_MINUTE=1):
+        assert _post(client, "a@example.com").status_code == 302
+        assert _post(client, "b@example.com").status_code == 302
+        shed = _post(client, "c@example.com")
+    assert shed.status_code == 429
+    assert int(shed["Retry-After"]) >= 1
+    assert Lead.objects.count() == 2
+
+
+def test_honeypot_and_repeat_submissions_skip_the_database(db):
+    client = Client()
+    assert _post(client, "bot@example.com", website="http://spam").status_code == 302
+    assert not Lead.objects.exists()
+
+    assert _post(client, "Lead@Example.com").status_code == 302
+    assert _post(client, "lead@example.com").status_code == 302
+    assert Lead.objects.count() == 1
+    assert OutboxMessage.objects.count() == 1
+
+    shedding.get_shedder().counters.flush()
+    out = io.StringIO()
+    call_command("shedding_stats", stdout=out)
+    lines = dict(line.split() for line in out.getvalue().splitlines()[:4])
+    assert lines == {
+        "rate_limited": "0",
+        "honeypot": "1",
+        "passed": "2",
+        "duplicate": "1",
+    }
+
+
+def test_resubmission_with_a_corrected_name_updates_the_lead(db):
+    client = Client()
+    assert _post(client, name="Lee").status_code == 302
+    assert _post(client, name="Leigh").status_code == 302
+    assert Lead.objects.get().name == "Leigh"
+
+
+def test_honeypot_still_rejected_when_shedding_is_off(db):
+    with override_settings(LEAD_SHED_ENABLED=False):
+        response = _post(Client(), website="filled")
+    assert response.status_code == 200
+    assert not Lead.objects.exists()
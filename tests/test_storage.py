@@ -0,0 +1,49 @@
+import hashlib
+
+from django.conf import settings
+from django.core.management import call_command
+from django.http import HttpResponse
+from django.templatetags.static import static
+from django.test import RequestFactory, override_settings
+
+from sitecore.middleware import StaticFilesMiddleware
+from sitecore.storage import find_unhashed_references
+
+
+def test_unmanifested_files_are_versioned_by_content():
+    source = settings.STATICFILES_DIRS[0] / "css" / "site.css"
+    digest = hashlib.md5(source.read_bytes(), usedforsecurity=False).hexdigest()[:12]
+    assert static("css/site.css") == f"/static/css/site.css?v={digest}"
+    assert static("css/missing.css") == "/static/css/missing.css"
+
+
+def test_collected_files_get_hashed_names_cached_immutably_for_a_year(tmp_path):
+    with override_settings(STATIC_ROOT=tmp_path, DEBUG=False):
+        call_command(
+            "collectstatic", interactive=False, verbosity=0, skip_asset_build=True
+        )
+        url = static("css/site.css")
+        assert url.startswith("/static/css/site.") and "?" not in url
+        middleware = StaticFilesMiddleware(lambda request: HttpResponse())
+        rf = RequestFactory()
+        hashed = middleware(rf.get(url))
+        plain = middleware(rf.get("/static/css/site.css"))
+    assert hashed["Cache-Control"] == "max-age=31536000, public, immutable"
+    assert "immutable" not in plain["Cache-Control"]
+
+
+def test_check_flags_hard_coded_and_unknown_assets(tmp_path):
+    template = tmp_path / "page.html"
+    template.write_text(
+        "{% load static %}\n"
+        "<link href=\"{% static 'css/site.css' %}\">\n"
+        '<img src="/static/img/logo.png">\n'
+        "<script src=\"{% static 'js/nope.js' %}?v={{ STATIC_VERSION }}\"></script>\n"
+    )
+    problems = find_unhashed_references([template])
+    assert [(p.line, p.problem) for p in problems] == [
+        (3, "hard-coded static URL"),
+        (4, "hard-coded static URL"),
+        (4, "no such static file"),
+    ]
+    assert find_unhashed_references() == []
@@ -0,0 +1,67 @@
+from django.core.management import call_command
+from django.test import override_settings
+
+from sitecore import warmup
+
+
+def test_view_templates_cover_every_page():
+    names = warmup.view_templates()
+
+    assert {
+        "sitecore/home.html",
+        "sitecore/lead_magnet.html",
+        "gom-onboarding.html",
+    } <= set(names)
+
+
+def test_warm_up_runs_every_step():
+    report = warmup.warm_up()
+
+    assert report.errors == {}
+    assert set(report.steps) == set(warmup.STEPS)
+    # Admin URLs are namespaced; they must be reversed as admin:<name>.
+    assert report.counts["urls"] > 10
+    # base.html is compiled as a parent even though no view names it.
+    assert report.counts["templates"] > len(warmup.view_templates())
+
+
+def test_failing_step_is_reported_not_raised(monkeypatch):
+    def broken():
+        raise OSError("manifest missing")
+
+    monkeypatch.setitem(warmup.STEPS, "static", broken)
+
+    report = warmup.warm_up()
+
+    assert report.errors == {"static": "OSError: manifest missing"}
+    assert "database" in report.counts
+
+
+def test_warm_up_is_opt_in():
+    with override_settings(WARMUP_ON_START=False):
+        assert warmup.warm_up_if_enabled() is None
+    with override_settings(WARMUP_ON_START=True):
+        assert warmup.warm_up_if_enabled().errors == {}
+
+
+def test_parse_importtime_sums_self_time_per_package():
+    stderr = "\n".join(
+        [
+            "import time: self [us] | cumulative | imported package",
+            "import time:       120 |        120 |   django.utils",
+            "import time:        80 |        200 | django",
+            "import time:        50 |         50 |     sitecore.views",
+            "Traceback (not an importtime line)",
+        ]
+    )
+
+    assert warmup.parse_importtime(stderr) == {"django": 0.0002, "sitecore": 0.00005}
+
+
+def test_startup_profile_command(capsys):
+    call_command("startup_profile", "--runs", "1", "--top", "3")
+
+    out = capsys.readouterr().out
+    assert "warm-up: templates" in out
+    assert "to first response" in out
+    assert "200 OK" in out